@@ -1,26 +1,9 @@
 import streamlit as st
-import pandas as pd
 import locale
-import logging
-import sys
-from google.cloud import bigquery
-from ortools.sat.python import cp_model
-from datetime import date, timedelta, datetime
-import plotly.express as px
-import vertexai
-from vertexai.generative_models import GenerativeModel, Tool, FunctionDeclaration, Content, Part
-import traceback
-import random
-import math
 import difflib
 import os
-import google.auth
-from natsort import natsorted
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.image import MIMEImage
-import uuid
+import time
+from datetime import date, timedelta, datetime
 
 # Sayfa Ayarları
 st.set_page_config(layout="wide", page_title="Akıllı Üretim Planlama Platformu")
@@ -41,28 +24,12 @@ except Exception as e:
     st.error("Konfigürasyon dosyası (.streamlit/secrets.toml) eksik veya hatalı.")
     st.stop()
 
-# BigQuery Tablo Tanımları (Dinamik)
+# BigQuery veri kümesi (tablo adları planlama.veri'de tanımlıdır)
 DATASET = "uretim_planlama"
-BIGQUERY_GOREVLER_TABLE = f"{PROJECT_ID}.{DATASET}.gorevler"
-BIGQUERY_KAYNAKLAR_TABLE = f"{PROJECT_ID}.{DATASET}.kaynaklar"
-BIGQUERY_TEZGAHLAR_TABLE = f"{PROJECT_ID}.{DATASET}.tezgahlar"
-BIGQUERY_SABLON_ANA_TABLE = f"{PROJECT_ID}.{DATASET}.sablon_ana"
-BIGQUERY_SABLONLAR_TABLE = f"{PROJECT_ID}.{DATASET}.uretim_sablonlari"
-BIGQUERY_KURALLAR_GRUP_TABLE = f"{PROJECT_ID}.{DATASET}.kurallar_manuel_gruplar"
-BIGQUERY_KURALLAR_KISIT_TABLE = f"{PROJECT_ID}.{DATASET}.kurallar_kaynak_kisitlari"
-BIGQUERY_KURALLAR_SABIT_BASLANGIC_TABLE = f"{PROJECT_ID}.{DATASET}.kurallar_sabit_baslangic"
-
-BATCHABLE_KAYNAKLAR = ["Satınalma", "Kesimhane", "Tasarım"]
-
-STEP_GROUP_MAPPING = {
-    "Hammadde Tedariği": "Genel Satınalma",
-    "Platine ve Silindir Malzemeleri Temini": "Genel Satınalma",
-    "Malzeme Sipariş": "Genel Satınalma",
-    "Kesim Operasyonu": "Genel Kesim",
-    "Kesim Süreci": "Genel Kesim",
-    "Tasarım Süreci": "Tasarım Çizim",
-    "Onay Süreci": "Tasarım Onay"
-}
+
+# Veri deposu: "bigquery" (varsayılan) veya BigQuery'siz çalışma için "yerel" (Parquet)
+VERI_DEPOSU_TURU = st.secrets.get("veri", {}).get("depo", "bigquery")
+YEREL_VERI_DIZINI = st.secrets.get("veri", {}).get("yerel_dizin", "veri")
 
 # İlgili Kişiler (Demo veya Genel Yapı)
 AMIR_MAIL_LISTESI = {
@@ -106,6 +73,22 @@ if not is_logged_in():
     show_login_form()
     st.stop()
 
+# Giriş ekranı yalnızca Streamlit'i yükler. Çözücü (ortools), grafik (plotly), AI (vertexai)
+# ve BigQuery modülleri ilgili özellik ilk çalıştığında fonksiyon içinde içe aktarılır.
+import pandas as pd
+from planlama.arkaplan import PlanlamaIsi
+from planlama.onbellek import plan_anahtari, plan_onbellegi
+from planlama.paylasim import PLAN_ALANI, OturumKatmani, PaylasilanVeri
+from planlama.depolama import VeriDeposu, BigQueryVeriDeposu, YerelVeriDeposu, ArtimliTablo
+from planlama.kurallar import KuralDeposu, yazma_istatistikleri
+from planlama.denetim import AracBellegi, ozet_farki, ozet_metni, plan_imzasi, plan_ozeti, soru_odagi
+from planlama.rapor import SmtpGonderici, haftalik_raporlari_gonder
+from planlama.sezgisel import SEZGISEL_DURUM
+from planlama.telemetri import performans_gecmisi
+from planlama.veri import (GOREVLER_TABLE, KAYNAKLAR_TABLE, TEZGAHLAR_TABLE, SABLON_ANA_TABLE, SABLONLAR_TABLE,
+                           KURALLAR_GRUP_TABLE, KURALLAR_KISIT_TABLE, KURALLAR_SABIT_BASLANGIC_TABLE,
+                           gorevleri_hazirla, kaynak_kisitlari_listesi, sabit_kurallar_listesi, manuel_gruplar_listesi)
+
 # --- YERELLEŞTİRME VE STİL ---
 try:
     locale.setlocale(locale.LC_TIME, 'tr_TR.UTF-8')
@@ -124,26 +107,44 @@ st.markdown("""
 # --- BAĞLANTI VE AI KURULUMU ---
 # --------------------------------------------------------------------------
 @st.cache_resource
-def init_connections():
+def gcp_kimlik_bilgileri():
+    import google.auth
+
     # Öncelik: Streamlit Secrets (Cloud Deploy için)
     # İkincil: Yerel credentials.json dosyası (Geliştirme için)
-    credentials = None
-    
-    # 1. Yöntem: Secrets içinde JSON varsa
+    # Hiçbiri yoksa None döner; istemciler varsayılan kimlik bilgilerini kullanır
     if "gcp_service_account" in st.secrets:
         service_account_info = st.secrets["gcp_service_account"]
-        credentials = google.auth.credentials.Credentials.from_service_account_info(service_account_info)
-    
-    # 2. Yöntem: Yerel dosya varsa
-    elif os.path.exists('credentials.json'):
+        return google.auth.credentials.Credentials.from_service_account_info(service_account_info)
+    if os.path.exists('credentials.json'):
         credentials, _ = google.auth.load_credentials_from_file('credentials.json')
+        return credentials
+    return None
+
+@st.cache_resource
+def init_veri_deposu():
+    # Yerel depoda BigQuery istemcisi oluşturulmaz, google.cloud.bigquery de yüklenmez
+    if VERI_DEPOSU_TURU == "yerel":
+        return YerelVeriDeposu(YEREL_VERI_DIZINI)
+    from google.cloud import bigquery
+
+    credentials = gcp_kimlik_bilgileri()
+    bq_client = bigquery.Client(project=PROJECT_ID, credentials=credentials) if credentials else bigquery.Client(project=PROJECT_ID)
+    return BigQueryVeriDeposu(bq_client, PROJECT_ID, DATASET)
+
+veri_deposu = init_veri_deposu()
+
+@st.cache_resource
+def gemini_modeli():
+    # Vertex AI yalnızca AI süpervizör ilk kez çalıştığında yüklenir
+    import vertexai
+    from vertexai.generative_models import GenerativeModel, Tool, FunctionDeclaration
 
+    credentials = gcp_kimlik_bilgileri()
     if credentials:
-        bq_client = bigquery.Client(project=PROJECT_ID, credentials=credentials)
         vertexai.init(project=PROJECT_ID, location="europe-west1", credentials=credentials)
     else:
         # Default credentials (eğer ortam değişkenleri ayarlıysa)
-        bq_client = bigquery.Client(project=PROJECT_ID)
         vertexai.init(project=PROJECT_ID, location="europe-west1")
 
     # Gemini AI Araç Tanımları
@@ -153,7 +154,7 @@ def init_connections():
     a_kaynak_ayarla = FunctionDeclaration(name="kaynak_kullanilabilirlik_ayarla", description="Bir kaynağın belirli bir tarih aralığındaki kapasitesini ayarlar.", parameters={"type": "object", "properties": {"kaynak_adi": {"type": "string"}, "baslangic_tarihi": {"type": "string"}, "bitis_tarihi": {"type": "string"}, "yeni_kapasite": {"type": "number"}}, "required": ["kaynak_adi", "baslangic_tarihi", "bitis_tarihi", "yeni_kapasite"]})
     a_plan_hesapla = FunctionDeclaration(name="plani_hesapla_ve_goster", description="Tüm projeler için en uygun üretim planını hesaplar.", parameters={"type": "object", "properties": {}})
     a_proje_sil = FunctionDeclaration(name="projeyi_sil", description="Bir projeyi ve tüm adımlarını veritabanından siler.", parameters={"type": "object", "properties": {"proje_adi": {"type": "string"}}, "required": ["proje_adi"]})
-    a_plan_analiz = FunctionDeclaration(name="plani_analiz_et", description="Mevcut plan hakkında soruları cevaplar.", parameters={"type": "object", "properties": {"soru": {"type": "string"}}, "required": ["soru"]})
+    a_plan_analiz = FunctionDeclaration(name="plani_analiz_et", description="Mevcut plan hakkında soruları cevaplar; soruda adı geçen proje ve kaynaklara odaklanır.", parameters={"type": "object", "properties": {"soru": {"type": "string"}}, "required": ["soru"]})
     a_plan_guncelle = FunctionDeclaration(name="plani_guncelle_ve_yeniden_hesapla", description="Sahadan gelen bilgilere göre planı günceller.", parameters={"type": "object", "properties": {"adimid": {"type": "string"}, "yeni_durum": {"type": "string"}, "gun_farki": {"type": "number"}}, "required": ["adimid", "yeni_durum"]})
     a_adim_getir = FunctionDeclaration(name="adim_bilgisi_getir", description="Proje ve adım adından adım ID'sini bulur.", parameters={"type": "object", "properties": {"proje_adi": {"type": "string"}, "adim_adi": {"type": "string"}}, "required": ["proje_adi", "adim_adi"]})
 
@@ -161,21 +162,37 @@ def init_connections():
     
     # Model Güvenliği
     model = GenerativeModel(model_name="gemini-2.0-flash", tools=[alet_cantasi])
-    return bq_client, model
+    return model
 
-bq_client, gemini_model = init_connections()
+@st.cache_resource
+def artimli_tablo(_depo, tablo, anahtar):
+    # Tüm oturumlar tablonun aynı bellek kopyasını paylaşır; süresi dolan okumalar yalnızca değişiklikleri çeker
+    return ArtimliTablo(_depo, tablo, anahtar)
 
 # --------------------------------------------------------------------------
 # --- DATABASE YARDIMCI FONKSİYONLAR ---
 # --------------------------------------------------------------------------
 
+@st.cache_resource
+def kural_depolari(_depo):
+    # Kural düzenlemeleri tüm oturumlar için ortak tamponda birleştirilip delta olarak yazılır
+    return {
+        KURALLAR_KISIT_TABLE: KuralDeposu(_depo, KURALLAR_KISIT_TABLE, 'kural_id'),
+        KURALLAR_SABIT_BASLANGIC_TABLE: KuralDeposu(_depo, KURALLAR_SABIT_BASLANGIC_TABLE, 'kural_id', imza_disi=['eklenme_tarihi']),
+        KURALLAR_GRUP_TABLE: KuralDeposu(_depo, KURALLAR_GRUP_TABLE, 'grup_id'),
+    }
+
+def _kurallari_kaydet(tablo, kurallar):
+    # Önceki düzenlemeler yazılamıyorsa yenileri tampona eklenmez; çağıran düzenlemeyi geri alır
+    depo = kural_depolari(veri_deposu)[tablo]
+    hata = depo.yazma_hatasi()
+    if hata:
+        raise RuntimeError(f"Önceki kural düzenlemeleri henüz yazılamadı, yeniden deneniyor ({hata})")
+    depo.esitle(kurallar)
+
 def get_kaynak_kisitlari_from_bq():
     try:
-        query = f"SELECT * FROM `{BIGQUERY_KURALLAR_KISIT_TABLE}`"
-        df = bq_client.query(query).to_dataframe()
-        df['baslangic_tarihi'] = pd.to_datetime(df['baslangic_tarihi']).dt.strftime('%Y-%m-%d')
-        df['bitis_tarihi'] = pd.to_datetime(df['bitis_tarihi']).dt.strftime('%Y-%m-%d')
-        return df.to_dict('records')
+        return kaynak_kisitlari_listesi(kural_depolari(veri_deposu)[KURALLAR_KISIT_TABLE].kayitlar())
     except Exception as e:
         if "Not found" in str(e): return []
         st.error(f"DB Read Error: {e}")
@@ -183,15 +200,12 @@ def get_kaynak_kisitlari_from_bq():
 
 def save_kaynak_kisitlari_to_bq(kisitlar_listesi):
     try:
-        if not kisitlar_listesi:
-            bq_client.query(f"DELETE FROM `{BIGQUERY_KURALLAR_KISIT_TABLE}` WHERE true").result()
-            return True
         df = pd.DataFrame(kisitlar_listesi)
-        df['kural_id'] = [str(uuid.uuid4()) for _ in range(len(df))]
-        df['baslangic_tarihi'] = pd.to_datetime(df['baslangic_tarihi']).dt.date
-        df['bitis_tarihi'] = pd.to_datetime(df['bitis_tarihi']).dt.date
-        job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
-        bq_client.load_table_from_dataframe(df, BIGQUERY_KURALLAR_KISIT_TABLE, job_config=job_config).result()
+        if not df.empty:
+            df['baslangic_tarihi'] = pd.to_datetime(df['baslangic_tarihi']).dt.date
+            df['bitis_tarihi'] = pd.to_datetime(df['bitis_tarihi']).dt.date
+        _kurallari_kaydet(KURALLAR_KISIT_TABLE, [[r] for r in df.to_dict('records')])
+        st.session_state.veri_katmani.yayinla('kaynak_kisitlari', get_kaynak_kisitlari_from_bq())
         return True
     except Exception as e:
         st.error(f"DB Save Error: {e}")
@@ -199,28 +213,23 @@ def save_kaynak_kisitlari_to_bq(kisitlar_listesi):
 
 def get_sabit_baslangic_kurallari_from_bq():
     try:
-        query = f"SELECT * FROM `{BIGQUERY_KURALLAR_SABIT_BASLANGIC_TABLE}`"
-        df = bq_client.query(query).to_dataframe()
-        df['sabit_baslangic_tarihi'] = pd.to_datetime(df['sabit_baslangic_tarihi']).dt.strftime('%Y-%m-%d')
-        return df.to_dict('records')
+        return sabit_kurallar_listesi(kural_depolari(veri_deposu)[KURALLAR_SABIT_BASLANGIC_TABLE].kayitlar())
     except Exception as e:
         if "Not found" in str(e): return []
         return []
 
 def save_sabit_baslangic_kurallari_to_bq(kurallar_listesi):
     try:
-        if not kurallar_listesi:
-            bq_client.query(f"DELETE FROM `{BIGQUERY_KURALLAR_SABIT_BASLANGIC_TABLE}` WHERE true").result()
-            return True
         df = pd.DataFrame(kurallar_listesi)
-        if 'kural_id' not in df.columns or df['kural_id'].isnull().any():
-             df['kural_id'] = [row.get('kural_id') or str(uuid.uuid4()) for _, row in df.iterrows()]
-        df['sabit_baslangic_tarihi'] = pd.to_datetime(df['sabit_baslangic_tarihi']).dt.date
-        df['eklenme_tarihi'] = pd.to_datetime(datetime.now())
+        if not df.empty:
+            df['sabit_baslangic_tarihi'] = pd.to_datetime(df['sabit_baslangic_tarihi']).dt.date
+            # Yalnızca yeni kurallar eklenme zamanı alır; mevcut kurallar depoda olduğu gibi kalır
+            eklenme = df['eklenme_tarihi'] if 'eklenme_tarihi' in df.columns else pd.Series(pd.NaT, index=df.index)
+            df['eklenme_tarihi'] = pd.to_datetime(eklenme).fillna(pd.to_datetime(datetime.now()))
         bq_columns = ['kural_id', 'adimid', 'projeadi', 'adimadi', 'sabit_baslangic_tarihi', 'eklenme_tarihi']
         df_to_load = df[[col for col in bq_columns if col in df.columns]]
-        job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
-        bq_client.load_table_from_dataframe(df_to_load, BIGQUERY_KURALLAR_SABIT_BASLANGIC_TABLE, job_config=job_config).result()
+        _kurallari_kaydet(KURALLAR_SABIT_BASLANGIC_TABLE, [[r] for r in df_to_load.to_dict('records')])
+        st.session_state.veri_katmani.yayinla('sabit_baslangic_kurallari', get_sabit_baslangic_kurallari_from_bq())
         return True
     except Exception as e:
         st.error(f"DB Save Error: {e}")
@@ -228,103 +237,109 @@ def save_sabit_baslangic_kurallari_to_bq(kurallar_listesi):
 
 def get_manual_groups_from_bq():
     try:
-        query = f"SELECT grup_id, adim_id FROM `{BIGQUERY_KURALLAR_GRUP_TABLE}` ORDER BY grup_id"
-        df = bq_client.query(query).to_dataframe()
-        if df.empty: return []
-        return df.groupby('grup_id')['adim_id'].apply(list).tolist()
+        return manuel_gruplar_listesi(kural_depolari(veri_deposu)[KURALLAR_GRUP_TABLE].kayitlar())
     except Exception: return []
 
 def save_manual_groups_to_bq(gruplar_listesi):
     try:
-        if not gruplar_listesi:
-            bq_client.query(f"DELETE FROM `{BIGQUERY_KURALLAR_GRUP_TABLE}` WHERE true").result()
-            return True
-        rows_to_insert = []
-        for group in gruplar_listesi:
-            grup_id = str(uuid.uuid4())
-            for adim_id in group:
-                rows_to_insert.append({'grup_id': grup_id, 'adim_id': adim_id})
-        if not rows_to_insert: return True
-        df = pd.DataFrame(rows_to_insert)
-        job_config = bigquery.LoadJobConfig(write_disposition="WRITE_TRUNCATE")
-        bq_client.load_table_from_dataframe(df, BIGQUERY_KURALLAR_GRUP_TABLE, job_config=job_config).result()
+        # Gruplar içerikleriyle eşleştirilir; değişmeyen grupların grup_id'si korunur
+        kurallar = [[{'adim_id': adim_id} for adim_id in group] for group in gruplar_listesi]
+        _kurallari_kaydet(KURALLAR_GRUP_TABLE, kurallar)
+        st.session_state.veri_katmani.yayinla('manual_groups', get_manual_groups_from_bq())
         return True
     except Exception as e:
         st.error(f"DB Save Error: {e}")
         return False
 
+def _paylasilan_kurallari_oku():
+    # Başka süreçlerin yazdığı kurallar için tablolar yeniden okunur; yayınlanan değerler
+    # de aynı dönüştürücülerden geldiği için yalnızca gerçekten değişen alanlar yeni sürüm alır
+    for depo in kural_depolari(veri_deposu).values():
+        try:
+            depo.yeniden_oku()
+        except Exception:
+            # Okunamayan (ör. henüz oluşturulmamış) tablo bellekteki haliyle kalır
+            pass
+    return {
+        "manual_groups": get_manual_groups_from_bq(),
+        "kaynak_kisitlari": get_kaynak_kisitlari_from_bq(),
+        "sabit_baslangic_kurallari": get_sabit_baslangic_kurallari_from_bq(),
+    }
+
+@st.cache_resource
+def paylasilan_veri(_depo):
+    # Kurallar ve son ortak plan tüm oturumlarca tek kopya olarak okunur; oturumlar yalnızca
+    # gördükleri sürümü ve kendi düzenlemelerini tutar. Kaydedilen her kural yeni sürüm yayınlar;
+    # depodaki kurallar KURAL_YENILEME_SN aralıklarla yeniden okunur.
+    return PaylasilanVeri(_paylasilan_kurallari_oku)
+
 # --------------------------------------------------------------------------
 # --- SESSION STATE YÖNETİMİ ---
 # --------------------------------------------------------------------------
 if 'new_project_steps' not in st.session_state: st.session_state.new_project_steps = []
-if 'plan_df' not in st.session_state: st.session_state.plan_df = None
+# Kurallar ve plan veri_katmani üzerinden okunur; editable_df yalnızca plan düzenlenirken kopyalanır
+if 'veri_katmani' not in st.session_state: st.session_state.veri_katmani = OturumKatmani(paylasilan_veri(veri_deposu))
 if 'editable_df' not in st.session_state: st.session_state.editable_df = None
 if 'chat_messages' not in st.session_state: st.session_state.chat_messages = [{"role": "assistant", "content": "Merhaba! Mevcut planı analiz edebilir veya satış teklifi fizibilitesi yapabilirim."}]
 if 'edit_mode' not in st.session_state: st.session_state.edit_mode = False
-if 'kaynak_kisitlari' not in st.session_state: st.session_state.kaynak_kisitlari = []
 if 'fizibilite_sepeti' not in st.session_state: st.session_state.fizibilite_sepeti = []
 if 'toplu_analiz_sonucu' not in st.session_state: st.session_state.toplu_analiz_sonucu = ""
+if 'fizibilite_tablosu' not in st.session_state: st.session_state.fizibilite_tablosu = None
 if 'ai_supervisor_report' not in st.session_state: st.session_state.ai_supervisor_report = None
-if 'manual_groups' not in st.session_state: st.session_state.manual_groups = []
-if 'sabit_baslangic_kurallari' not in st.session_state: st.session_state.sabit_baslangic_kurallari = []
+if 'kayan_ufuk_hafta' not in st.session_state: st.session_state.kayan_ufuk_hafta = 0
 if 'fizibilite_manual_groups' not in st.session_state: st.session_state.fizibilite_manual_groups = []
 if 'template_steps_to_load' not in st.session_state: st.session_state.template_steps_to_load = []
 if 'current_template_step_index' not in st.session_state: st.session_state.current_template_step_index = 0
 if 'admin_password_correct' not in st.session_state: st.session_state.admin_password_correct = False
-if 'rules_loaded' not in st.session_state:
-    st.session_state.manual_groups = get_manual_groups_from_bq()
-    st.session_state.kaynak_kisitlari = get_kaynak_kisitlari_from_bq()
-    st.session_state.sabit_baslangic_kurallari = get_sabit_baslangic_kurallari_from_bq()
-    st.session_state.rules_loaded = True
+if 'plan_isi' not in st.session_state: st.session_state.plan_isi = None
+if 'arac_bellegi' not in st.session_state: st.session_state.arac_bellegi = AracBellegi()
+if 'ai_oncelikleri' not in st.session_state: st.session_state.ai_oncelikleri = {}
+if 'ai_denetimi_bekliyor' not in st.session_state: st.session_state.ai_denetimi_bekliyor = False
+
+def _oturum_verisi(alan):
+    # Oturumun düzenlemesi varsa o, yoksa paylaşılan görüntüdeki değer (yerinde değiştirilmez)
+    return st.session_state.veri_katmani.oku(alan)
 
 # --------------------------------------------------------------------------
 # --- DATA FETCHING FONKSİYONLARI ---
 # --------------------------------------------------------------------------
 @st.cache_data(ttl=300)
-def get_all_projects_df(_client: bigquery.Client):
+def get_all_projects_df(_depo: VeriDeposu):
     try:
-        query = f"SELECT * FROM `{BIGQUERY_GOREVLER_TABLE}`"
-        df = _client.query(query).to_dataframe()
-        for col in ['projebaslangictarihi', 'projebitistarihi']:
-            if col in df.columns: df[col] = pd.to_datetime(df[col], errors='coerce')
-        return df
+        return gorevleri_hazirla(artimli_tablo(_depo, GOREVLER_TABLE, 'adimid').yenile())
     except Exception as e:
         return pd.DataFrame()
 
 @st.cache_data(ttl=300)
-def get_distinct_values(_client: bigquery.Client, column_name):
+def get_distinct_values(_depo: VeriDeposu, column_name):
+    # Görev tablosunun bellekteki kopyasından türetilir; ayrıca sorgu atılmaz
     try:
-        query = f"SELECT DISTINCT {column_name} FROM `{BIGQUERY_GOREVLER_TABLE}` WHERE {column_name} IS NOT NULL ORDER BY {column_name}"
-        df = _client.query(query).to_dataframe()
-        return df[column_name].tolist()
+        df = get_all_projects_df(_depo)
+        return sorted(df[column_name].dropna().unique().tolist())
     except Exception: return []
 
 @st.cache_data(ttl=300)
-def get_kaynaklar_df(_client: bigquery.Client):
+def get_kaynaklar_df(_depo: VeriDeposu):
     try:
-        query = f"SELECT kaynakadi, kapasite FROM `{BIGQUERY_KAYNAKLAR_TABLE}`"
-        return _client.query(query).to_dataframe()
+        return _depo.oku(KAYNAKLAR_TABLE, ['kaynakadi', 'kapasite'])
     except Exception: return pd.DataFrame()
 
 @st.cache_data(ttl=300)
-def get_tezgahlar_df(_client: bigquery.Client):
+def get_tezgahlar_df(_depo: VeriDeposu):
     try:
-        query = f"SELECT tezgahadi, kaynakadi FROM `{BIGQUERY_TEZGAHLAR_TABLE}`"
-        return _client.query(query).to_dataframe()
+        return _depo.oku(TEZGAHLAR_TABLE, ['tezgahadi', 'kaynakadi'])
     except Exception: return pd.DataFrame()
 
 @st.cache_data(ttl=60)
-def get_sablon_ana_df(_client: bigquery.Client):
+def get_sablon_ana_df(_depo: VeriDeposu):
     try:
-        query = f"SELECT * FROM `{BIGQUERY_SABLON_ANA_TABLE}`"
-        return _client.query(query).to_dataframe()
+        return _depo.oku(SABLON_ANA_TABLE)
     except Exception: return pd.DataFrame()
 
 @st.cache_data(ttl=60)
-def get_uretim_sablonlari_df(_client: bigquery.Client):
+def get_uretim_sablonlari_df(_depo: VeriDeposu):
     try:
-        query = f"SELECT * FROM `{BIGQUERY_SABLONLAR_TABLE}`"
-        return _client.query(query).to_dataframe()
+        return _depo.oku(SABLONLAR_TABLE)
     except Exception: return pd.DataFrame()
 
 # --------------------------------------------------------------------------
@@ -369,62 +384,261 @@ def add_step_callback():
             st.success("Tüm adımlar eklendi!")
 
 def dinamik_kisitlari_kaldir(kaynak_adi: str = None):
-    if 'kaynak_kisitlari' not in st.session_state or not st.session_state.kaynak_kisitlari:
+    if not _oturum_verisi('kaynak_kisitlari'):
         return "Aktif kural yok."
     
+    kisitlar = st.session_state.veri_katmani.duzenle('kaynak_kisitlari')
+    onceki = list(kisitlar)
     if kaynak_adi:
-        st.session_state.kaynak_kisitlari = [k for k in st.session_state.kaynak_kisitlari if k.get('kaynak_adi', '').lower() != kaynak_adi.lower()]
+        degisen_kaynaklar = [kaynak_adi]
+        kisitlar[:] = [k for k in kisitlar if k.get('kaynak_adi', '').lower() != kaynak_adi.lower()]
     else:
-        st.session_state.kaynak_kisitlari.clear()
+        degisen_kaynaklar = [k.get('kaynak_adi', '') for k in kisitlar]
+        kisitlar.clear()
 
-    if save_kaynak_kisitlari_to_bq(st.session_state.kaynak_kisitlari):
-         return plani_hesapla_ve_goster()
+    if save_kaynak_kisitlari_to_bq(kisitlar):
+         return plani_hesapla_ve_goster(degisen_kaynaklar=degisen_kaynaklar)
     else:
+        kisitlar[:] = onceki
         return "DB Hatası."
 
 def kaynak_kullanilabilirlik_ayarla(kaynak_adi: str, baslangic_tarihi: str, bitis_tarihi: str, yeni_kapasite: int):
     yeni_kisit = {"kaynak_adi": kaynak_adi, "baslangic_tarihi": baslangic_tarihi, "bitis_tarihi": bitis_tarihi, "yeni_kapasite": yeni_kapasite}
-    if yeni_kisit not in st.session_state.get('kaynak_kisitlari', []):
-        st.session_state.kaynak_kisitlari.append(yeni_kisit)
-        if not save_kaynak_kisitlari_to_bq(st.session_state.kaynak_kisitlari):
-            st.session_state.kaynak_kisitlari.pop()
+    if yeni_kisit not in _oturum_verisi('kaynak_kisitlari'):
+        kisitlar = st.session_state.veri_katmani.duzenle('kaynak_kisitlari')
+        kisitlar.append(yeni_kisit)
+        if not save_kaynak_kisitlari_to_bq(kisitlar):
+            kisitlar.pop()
             return "DB Kayıt Hatası."
-    return plani_hesapla_ve_goster()
+    return plani_hesapla_ve_goster(degisen_kaynaklar=[kaynak_adi])
+
+def _oturum_gorevleri():
+    # AI süpervizörün denediği öncelikler yalnızca bu oturumun planlarına uygulanır
+    gorevler_df = get_all_projects_df(veri_deposu)
+    oncelikler = st.session_state.get('ai_oncelikleri')
+    if oncelikler and not gorevler_df.empty:
+        gorevler_df = gorevler_df.copy()
+        degisen = gorevler_df['projeadi'].isin(oncelikler)
+        gorevler_df.loc[degisen, 'proje_onceligi'] = gorevler_df.loc[degisen, 'projeadi'].map(oncelikler)
+    return gorevler_df
+
+def _plan_girdileri(degisen_adimlar=None, degisen_kaynaklar=None):
+    # Optimizasyon girdileri betik iş parçacığında toplanır; arka plan işi session_state'e dokunmaz
+    gorevler_df = _oturum_gorevleri()
+    if gorevler_df.empty:
+        return None
+    katman = st.session_state.veri_katmani
+    manual_groups = katman.oku('manual_groups')
+
+    # Önceki plan varsa sıcak başlatılır; değişiklik biliniyorsa yalnızca etkilenen adımlar çözülür
+    onceki_plan_df = katman.oku(PLAN_ALANI)
+    serbest_adimlar = None
+    if onceki_plan_df is not None and not onceki_plan_df.empty and (degisen_adimlar or degisen_kaynaklar):
+        from planlama.optimizasyon import etkilenen_adimlari_bul
+        serbest_adimlar = etkilenen_adimlari_bul(gorevler_df, degisen_adimlar, degisen_kaynaklar, manual_groups)
+    return {
+        "gorevler_df": gorevler_df,
+        "kaynaklar_df": get_kaynaklar_df(veri_deposu),
+        "tezgahlar_df": get_tezgahlar_df(veri_deposu),
+        "manual_groups": manual_groups,
+        "sabit_kurallar": katman.oku('sabit_baslangic_kurallari'),
+        "kaynak_kisitlari": katman.oku('kaynak_kisitlari'),
+        "onceki_plan_df": onceki_plan_df,
+        "serbest_adimlar": serbest_adimlar,
+        # 0 kayan ufuk modunu kapatır; tüm gelecek tam ayrıntıyla çözülür
+        "kayan_ufuk_hafta": st.session_state.get('kayan_ufuk_hafta') or None,
+        # Ortak girdilerle (oturuma özel kural ya da AI önceliği olmadan) bulunan plan, girdilerin
+        # okunduğu sürümden sonra kural değişmediyse tüm oturumlara yayınlanır
+        "dayanak": None if katman.ozel_alanlar() - {PLAN_ALANI} or st.session_state.get('ai_oncelikleri') else katman.surum,
+    }
+
+def _plani_coz(g, ara_cozum=None, durdur=None):
+    from planlama.optimizasyon import hesapla_ve_optimize_et
+
+    plan_df, toplam_ceza, durum = hesapla_ve_optimize_et(
+        g["gorevler_df"], g["kaynaklar_df"], g["tezgahlar_df"],
+        manual_start_groups=g["manual_groups"], sabit_baslangic_kurallari=g["sabit_kurallar"], kaynak_kisitlari=g["kaynak_kisitlari"],
+        onceki_plan_df=g["onceki_plan_df"], serbest_adimlar=g["serbest_adimlar"], ara_cozum=ara_cozum, durdur=durdur,
+        kayan_ufuk_hafta=g["kayan_ufuk_hafta"]
+    )
+    if plan_df is None and g["serbest_adimlar"] is not None and not (durdur is not None and durdur.is_set()):
+        # Sabitlenen adımlar yeni durumla çelişiyorsa tüm plan ipuçlarıyla yeniden çözülür
+        plan_df, toplam_ceza, durum = hesapla_ve_optimize_et(
+            g["gorevler_df"], g["kaynaklar_df"], g["tezgahlar_df"],
+            manual_start_groups=g["manual_groups"], sabit_baslangic_kurallari=g["sabit_kurallar"], kaynak_kisitlari=g["kaynak_kisitlari"],
+            onceki_plan_df=g["onceki_plan_df"], ara_cozum=ara_cozum, durdur=durdur, kayan_ufuk_hafta=g["kayan_ufuk_hafta"]
+        )
+    return plan_df, toplam_ceza, durum
+
+def _plan_girdi_anahtari(g):
+    # Oturum içi plan belleğinin anahtarı; disk önbelleğiyle aynı içerik özeti kullanılır
+    return plan_anahtari(g["gorevler_df"], g["kaynaklar_df"], g["tezgahlar_df"], g["manual_groups"], g["sabit_kurallar"],
+                         g["kaynak_kisitlari"], {"plan_baslangic": date.today(), "kayan_ufuk_hafta": g["kayan_ufuk_hafta"]},
+                         g["onceki_plan_df"], g["serbest_adimlar"])
+
+def _plan_saklanabilir(sonuc):
+    return sonuc[0] is not None and sonuc[2] != SEZGISEL_DURUM
+
+def _plan_sonucunu_uygula(plan_df, toplam_ceza, durum, dayanak=None):
+    if plan_df is None:
+        return f"Plan hesaplanamadı (Durum: {durum})."
+    katman = st.session_state.veri_katmani
+    if dayanak is None or durum == SEZGISEL_DURUM or katman.yayinla(PLAN_ALANI, plan_df, dayanak) is None:
+        katman.ayarla(PLAN_ALANI, plan_df)
+    st.session_state.editable_df = None
+    if durum == SEZGISEL_DURUM:
+        asan = int((plan_df['Tolerans Aşımı'] > 0).sum()) if 'Tolerans Aşımı' in plan_df.columns else 0
+        return (f"Çözücü plan bulamadı, öncelik listesi planı kullanıldı. Toplam Ceza: {toplam_ceza:.0f}"
+                + (f" ({asan} adım tolerans süresini aşıyor)" if asan else ""))
+    return f"Plan hesaplandı. Durum: {durum}, Toplam Ceza: {toplam_ceza:.0f}"
+
+def plani_hesapla_ve_goster(degisen_adimlar=None, degisen_kaynaklar=None):
+    girdiler = _plan_girdileri(degisen_adimlar, degisen_kaynaklar)
+    if girdiler is None:
+        return "Planlanacak görev bulunamadı."
+    # Aynı girdilerle (ör. geri alınan bir öncelik değişikliğiyle) oturumda bulunan plan yeniden çözülmez
+    sonuc = st.session_state.arac_bellegi.calistir(
+        "plan", {"girdi": _plan_girdi_anahtari(girdiler)}, lambda: _plani_coz(girdiler), saklanabilir=_plan_saklanabilir)
+    return _plan_sonucunu_uygula(*sonuc, dayanak=girdiler["dayanak"])
+
+def hizli_onizleme():
+    """Çözücüyü beklemeden öncelik listesi planını oturuma yükler."""
+    from planlama.optimizasyon import hizli_plan
+
+    g = _plan_girdileri()
+    if g is None:
+        return "Planlanacak görev bulunamadı."
+    return _plan_sonucunu_uygula(*hizli_plan(
+        g["gorevler_df"], g["kaynaklar_df"], g["tezgahlar_df"], manual_start_groups=g["manual_groups"],
+        sabit_baslangic_kurallari=g["sabit_kurallar"], kaynak_kisitlari=g["kaynak_kisitlari"]))
+
+def plani_arka_planda_baslat(degisen_adimlar=None, degisen_kaynaklar=None):
+    """Optimizasyonu arka plan işi olarak başlatır; ilerleme plan_isi_paneli ile izlenir."""
+    isi = st.session_state.get('plan_isi')
+    if isi is not None and not isi.bitti:
+        return "Devam eden bir planlama işi var."
+    girdiler = _plan_girdileri(degisen_adimlar, degisen_kaynaklar)
+    if girdiler is None:
+        return "Planlanacak görev bulunamadı."
+    st.session_state.plan_isi = PlanlamaIsi(_plani_coz, girdiler)
+    st.session_state.plan_isi_anahtari = _plan_girdi_anahtari(girdiler)
+    st.session_state.plan_isi_dayanagi = girdiler["dayanak"]
+    return "Planlama arka planda başlatıldı."
+
+def plan_isini_sonlandir():
+    # Biten işin sonucu oturuma aktarılır; iş bitmediyse None döner
+    isi = st.session_state.get('plan_isi')
+    if isi is None or not isi.bitti:
+        return None
+    st.session_state.plan_isi = None
+    sonuc = isi.sonuc()
+    if _plan_saklanabilir(sonuc) and not isi.durduruldu:
+        st.session_state.arac_bellegi.kaydet("plan", {"girdi": st.session_state.get('plan_isi_anahtari')}, sonuc)
+    # Erken durdurulan aramanın planı yalnızca bu oturumda kalır
+    dayanak = None if isi.durduruldu else st.session_state.get('plan_isi_dayanagi')
+    return _plan_sonucunu_uygula(*sonuc, dayanak=dayanak)
+
+def gecikme_tablosu(plan_df, gorevler_df):
+    if plan_df is None or plan_df.empty or gorevler_df.empty:
+        return pd.DataFrame()
+    bitis = plan_df.groupby('Proje Adı')['Bitiş'].max()
+    termin = gorevler_df.groupby('projeadi')['projebitistarihi'].first().reindex(bitis.index)
+    tablo = pd.DataFrame({'Planlanan Bitiş': bitis, 'Termin': termin})
+    tablo['Gecikme (Gün)'] = (tablo['Planlanan Bitiş'] - tablo['Termin']).dt.days.clip(lower=0)
+    return tablo[tablo['Gecikme (Gün)'] > 0].sort_values('Gecikme (Gün)', ascending=False)
+
+@st.fragment(run_every=1)
+def plan_isi_paneli():
+    isi = st.session_state.get('plan_isi')
+    if isi is None:
+        return
+    if isi.bitti:
+        st.toast(plan_isini_sonlandir())
+        st.rerun()
+    anlik = isi.anlik_durum()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Geçen Süre", f"{anlik['gecen_sn']:.0f} sn")
+    c2.metric("Bulunan Çözüm", anlik['cozum_sayisi'])
+    c3.metric("En İyi Ceza", "-" if anlik['hedef'] is None else f"{anlik['hedef']:.0f}")
+    c4.metric("Alt Sınır", "-" if anlik['sinir'] is None else f"{anlik['sinir']:.0f}")
+    if st.button("⏹️ Durdur ve En İyi Planı Kullan", disabled=isi.durduruldu):
+        isi.durdur()
+    if anlik['plan_df'] is not None:
+        st.plotly_chart(create_enhanced_gantt_chart(anlik['plan_df']), use_container_width=True)
+        st.dataframe(gecikme_tablosu(anlik['plan_df'], get_all_projects_df(veri_deposu)), use_container_width=True)
+
+def _sepet_adaylari():
+    # Sepetteki her teklif, gorevler şemasında kendi adım tablosuna çevrilir
+    adaylar = {}
+    for i, teklif in enumerate(st.session_state.get('fizibilite_sepeti', [])):
+        ad = teklif.get('proje_adi') or f"Teklif {i + 1}"
+        adimlar = pd.DataFrame(teklif.get('adimlar', []))
+        if adimlar.empty:
+            continue
+        adimlar['projeadi'] = ad
+        adimlar['adimid'] = [f"FZB-{i + 1}-{k + 1}" for k in range(len(adimlar))]
+        adimlar['projebaslangictarihi'] = pd.to_datetime(teklif.get('baslangic_tarihi', date.today()))
+        adimlar['projebitistarihi'] = pd.to_datetime(teklif.get('termin'))
+        adaylar[ad] = adimlar
+    return adaylar
+
+def fizibilite_sepetini_degerlendir():
+    """Sepetteki tüm teklifleri mevcut planı sabit tutarak tek seferde değerlendirir."""
+    adaylar = _sepet_adaylari()
+    if not adaylar:
+        return "Sepette değerlendirilecek teklif yok."
+    if _oturum_verisi(PLAN_ALANI) is None:
+        sonuc = plani_hesapla_ve_goster()
+        if _oturum_verisi(PLAN_ALANI) is None:
+            return sonuc
+    from planlama.fizibilite import toplu_fizibilite
+
+    st.session_state.fizibilite_tablosu = toplu_fizibilite(
+        adaylar, _oturum_verisi(PLAN_ALANI), get_kaynaklar_df(veri_deposu),
+        kaynak_kisitlari=_oturum_verisi('kaynak_kisitlari'),
+        manual_start_groups=st.session_state.get('fizibilite_manual_groups', []))
+    uygun = int(st.session_state.fizibilite_tablosu['Uygun'].sum())
+    return f"{len(adaylar)} teklif değerlendirildi, {uygun} tanesi termininde teslim edilebilir."
 
 def clear_template_loading_state():
     st.session_state.template_steps_to_load = []
     st.session_state.current_template_step_index = 0
 
 def haftalik_raporlari_olustur_ve_gonder(test_email=None):
+    from planlama.optimizasyon import _surec_havuzu, hesapla_ve_optimize_et
+
     try:
         is_test = bool(test_email)
         mode = "TEST" if is_test else "GERÇEK"
+        olcumler = {}
         
-        df_gorevler = get_all_projects_df(bq_client)
-        df_kaynaklar = get_kaynaklar_df(bq_client)
-        df_tezgahlar = get_tezgahlar_df(bq_client)
+        df_gorevler = get_all_projects_df(veri_deposu)
+        df_kaynaklar = get_kaynaklar_df(veri_deposu)
+        df_tezgahlar = get_tezgahlar_df(veri_deposu)
         
+        # Plan tüm birimler için bir kez hesaplanır
+        t0 = time.perf_counter()
         plan_df, _, _ = hesapla_ve_optimize_et(
             df_gorevler, df_kaynaklar, df_tezgahlar,
-            manual_start_groups=st.session_state.get('manual_groups', []),
-            sabit_baslangic_kurallari=st.session_state.get('sabit_baslangic_kurallari', [])
+            manual_start_groups=_oturum_verisi('manual_groups'),
+            sabit_baslangic_kurallari=_oturum_verisi('sabit_baslangic_kurallari'),
+            kaynak_kisitlari=_oturum_verisi('kaynak_kisitlari')
         )
+        olcumler['plan_sn'] = time.perf_counter() - t0
 
         if plan_df is None or plan_df.empty:
             return "Plan hesaplanamadı."
 
-        bugun = pd.to_datetime(date.today())
-        hafta_basi = bugun.floor('D') - pd.to_timedelta(bugun.weekday(), unit='D')
-        hafta_sonu = hafta_basi + pd.to_timedelta(6, unit='D')
-        
-        gantt_end_range = bugun + pd.to_timedelta(21, unit='D')
-        
-        for birim, amir_mail in AMIR_MAIL_LISTESI.items():
-            # (Raporlama mantığı ve email gönderme kodu buraya gelecek - kod kısaltıldı)
-            # Not: smtp.login kısmında EMAIL_SENDER ve EMAIL_PASSWORD değişkenlerini kullanın.
-            pass
-            
-        return f"{mode} raporları gönderildi."
+        gonderici = SmtpGonderici(SMTP_SERVER, SMTP_PORT, EMAIL_SENDER, EMAIL_PASSWORD)
+        sonuclar = haftalik_raporlari_gonder(
+            plan_df, AMIR_MAIL_LISTESI, CC_MAIL_LISTESI, EMAIL_SENDER, gonderici, date.today(),
+            test_email=test_email, havuz=_surec_havuzu(), olcumler=olcumler)
+        st.session_state.rapor_olcumleri = olcumler
+        hatalar = {birim: hata for birim, hata in sonuclar.items() if hata}
+        sureler = ", ".join(f"{k}: {v:.1f}" for k, v in olcumler.items() if k.endswith('_sn'))
+        if hatalar:
+            return f"{mode} raporları kısmen gönderildi; gönderilemeyenler: {', '.join(hatalar)} ({sureler})"
+        return f"{mode} raporları gönderildi. ({sureler})"
     except Exception as e:
         return f"Hata: {e}"
 
@@ -432,33 +646,103 @@ def haftalik_raporlari_olustur_ve_gonder(test_email=None):
 # --- OPTİMİZASYON VE AI FONKSİYONLARI ---
 # --------------------------------------------------------------------------
 
+def adim_bilgisi_getir(proje_adi: str, adim_adi: str):
+    df = _oturum_gorevleri()
+    eslesen = df[(df['projeadi'] == proje_adi) & (df['AdimAdi'] == adim_adi)]
+    if eslesen.empty:
+        benzer = difflib.get_close_matches(adim_adi, df.loc[df['projeadi'] == proje_adi, 'AdimAdi'].tolist(), n=3)
+        return f"Adım bulunamadı. Benzer adımlar: {', '.join(benzer)}" if benzer else "Adım bulunamadı."
+    return f"Adım ID: {eslesen['adimid'].iloc[0]}"
+
+def plani_analiz_et(soru: str):
+    # Model soruyu plan özeti üzerinden cevaplar; tüm plan tablosu gönderilmez. Soruda proje ya da
+    # kaynak adı geçiyorsa özet onlara daraltılır, geçmiyorsa genel özet döner
+    plan_df = _oturum_verisi(PLAN_ALANI)
+    if plan_df is None or plan_df.empty:
+        return "Henüz hesaplanmış plan yok."
+    return ozet_metni(plan_ozeti(plan_df, _oturum_gorevleri(), get_kaynaklar_df(veri_deposu),
+                                 odak=soru_odagi(soru, plan_df)))
+
+def proje_onceligini_degistir(proje_adi: str, yeni_oncelik: int):
+    gorevler_df = get_all_projects_df(veri_deposu)
+    proje = gorevler_df[gorevler_df['projeadi'] == proje_adi]
+    if proje.empty:
+        return "Proje bulunamadı."
+    oncelikler = dict(st.session_state.ai_oncelikleri)
+    if int(yeni_oncelik) == proje['proje_onceligi'].iloc[0]:
+        oncelikler.pop(proje_adi, None)
+    else:
+        oncelikler[proje_adi] = int(yeni_oncelik)
+    if oncelikler == st.session_state.ai_oncelikleri:
+        return "Öncelik zaten bu değerde, plan değişmedi."
+    st.session_state.ai_oncelikleri = oncelikler
+    return plani_hesapla_ve_goster()
+
+AI_ARACLARI = {
+    "plani_hesapla_ve_goster": plani_hesapla_ve_goster,
+    "plani_analiz_et": plani_analiz_et,
+    "adim_bilgisi_getir": adim_bilgisi_getir,
+    "kaynak_kullanilabilirlik_ayarla": kaynak_kullanilabilirlik_ayarla,
+    "dinamik_kisitlari_kaldir": dinamik_kisitlari_kaldir,
+    "proje_onceligini_degistir": proje_onceligini_degistir,
+}
+# Sonucu yalnızca argümanlara ve mevcut plana bağlı araçlar; plan değişmedikçe tekrar çalıştırılmaz
+SALT_OKUNUR_ARACLAR = {"plani_analiz_et", "adim_bilgisi_getir"}
+
+def _ai_araci_calistir(ad, argumanlar):
+    fonksiyon = AI_ARACLARI.get(ad)
+    if fonksiyon is None:
+        return f"'{ad}' aracı bu ekranda kullanılamıyor."
+    if ad in SALT_OKUNUR_ARACLAR:
+        durum = plan_imzasi(_oturum_verisi(PLAN_ALANI))
+        return st.session_state.arac_bellegi.calistir(ad, argumanlar, lambda: fonksiyon(**argumanlar), durum=durum)
+    # Yeniden planlayan araçlar plani_hesapla_ve_goster içinde girdi özetine göre bellekten döner
+    return fonksiyon(**argumanlar)
+
 def yapay_zeka_denetiminde_plan_olustur():
+    """
+    İlk planı arka plan işi olarak başlatır. İlerleme plan_isi_paneli ile izlenir; iş bitince
+    panel uygulamayı yeniden çalıştırır ve denetim ai_denetimini_surdur ile devam eder.
+    """
     st.session_state.ai_supervisor_report = None
+    st.session_state.ai_oncelikleri = {}
+    if get_all_projects_df(veri_deposu).empty:
+        st.error("Veri Hatası: planlanacak görev bulunamadı.")
+        return
+    st.toast(plani_arka_planda_baslat())
+    st.session_state.ai_denetimi_bekliyor = st.session_state.plan_isi is not None
+
+def ai_denetimini_surdur():
+    # Arka plandaki ilk plan bittiyse (plan_isini_sonlandir oturuma aktardıysa) denetim döngüsü çalışır
+    if not st.session_state.ai_denetimi_bekliyor or st.session_state.plan_isi is not None:
+        return
+    st.session_state.ai_denetimi_bekliyor = False
     MAX_ATTEMPTS = 5
+    # Bir denemede modelin art arda yapabileceği araç çağrısı turu
+    ARAC_TUR_SINIRI = 4
     
     with st.status("🤖 AI Süpervizör Devrede...", expanded=True) as status:
         try:
-            status.write("Veriler analiz ediliyor...")
-            gorevler_df = get_all_projects_df(bq_client)
-            if gorevler_df.empty:
-                status.update(label="Veri Hatası", state="error")
+            if _oturum_verisi(PLAN_ALANI) is None:
+                status.update(label="Plan hesaplanamadı", state="error")
                 return
 
-            proje_hedefleri = gorevler_df[['projeadi', 'projebitistarihi', 'proje_onceligi']].drop_duplicates().to_string()
-            chat = gemini_model.start_chat()
-            
-            plani_hesapla_ve_goster()
+            from vertexai.generative_models import Part
+            chat = gemini_modeli().start_chat()
             
+            onceki_ozet = None
             for i in range(MAX_ATTEMPTS):
                 attempt = i + 1
                 status.write(f"**DENEME {attempt}/{MAX_ATTEMPTS}:** Plan analiz ediliyor...")
                 
-                mevcut_plan_df = st.session_state.plan_df
-                plan_ozeti_csv = mevcut_plan_df.to_csv()
+                # Tüm plan yerine gecikme, kritik yol ve darboğaz özeti ile önceki denemeye göre fark gönderilir
+                ozet = plan_ozeti(_oturum_verisi(PLAN_ALANI), _oturum_gorevleri(), get_kaynaklar_df(veri_deposu))
+                plan_ozeti_json = ozet_metni(ozet, ozet_farki(onceki_ozet, ozet))
+                onceki_ozet = ozet
                 
                 prompt = f"""
                 Sen bir üretim planlama süpervizörüsün.
-                HEDEFLER:\n{proje_hedefleri}\n\nMEVCUT PLAN:\n{plan_ozeti_csv}
+                MEVCUT PLAN ÖZETİ (JSON):\n{plan_ozeti_json}
                 Görevlerin:
                 1. Gecikmeleri analiz et.
                 2. Gerekirse 'proje_onceligini_degistir' ile müdahale et.
@@ -466,35 +750,77 @@ def yapay_zeka_denetiminde_plan_olustur():
                 """
                 
                 response = chat.send_message(prompt)
-                # ... (AI Yanıt İşleme Kodu - Orijinal koddaki gibi)
+                onaylandi = False
+                for _ in range(ARAC_TUR_SINIRI):
+                    cagrilar = response.candidates[0].function_calls
+                    if not cagrilar:
+                        break
+                    yanitlar = []
+                    for cagri in cagrilar:
+                        argumanlar = dict(cagri.args)
+                        if cagri.name == "plan_sonucunu_onayla_ve_sun":
+                            st.session_state.ai_supervisor_report = argumanlar.get("onay_yorumu", "")
+                            onaylandi = True
+                            continue
+                        status.write(f"🔧 {cagri.name}: {argumanlar}")
+                        sonuc = _ai_araci_calistir(cagri.name, argumanlar)
+                        yanitlar.append(Part.from_function_response(name=cagri.name, response={"sonuc": str(sonuc)}))
+                    if onaylandi or not yanitlar:
+                        break
+                    response = chat.send_message(yanitlar)
+                if onaylandi:
+                    status.update(label="✅ Plan onaylandı", state="complete")
+                    return
                 
         except Exception as e:
             st.error(f"AI Hatası: {e}")
 
-def hesapla_ve_optimize_et(df_input: pd.DataFrame, kaynaklar_df_full: pd.DataFrame, tezgahlar_df_full: pd.DataFrame, simulasyon_modu=False, manual_start_groups=None, sabit_baslangic_kurallari=None):
-    """
-    Google OR-Tools Optimizasyon Motoru
-    """
-    try:
-        df = df_input.copy()
-        # ... (Veri temizleme adımları)
-        
-        model = cp_model.CpModel()
-        # ... (Model kurma, kısıt ekleme, OR-Tools mantığı)
-        # Orijinal koddaki optimizasyon mantığının aynısı buraya gelecek.
-        
-        # Basitleştirilmiş dönüş (Placeholder):
-        return pd.DataFrame(), 0, "OPTIMAL" 
-    except Exception as e:
-        return None, 0, None
+@st.cache_data(max_entries=32, show_spinner=False)
+def _gantt_figuru(plan_surumu, date_range_start, date_range_end, _plan_df):
+    # Figürler plan sürümü ve görüntülenen aralığa göre saklanır; her yeniden çalıştırmada çizilmez
+    from planlama.gantt import gantt_figuru
+    return gantt_figuru(_plan_df, date_range_start, date_range_end)
 
 def create_enhanced_gantt_chart(plan_df, editable_df=None, date_range_start=None, date_range_end=None):
-    # Plotly Gantt Chart oluşturma kodu
     if plan_df is None or plan_df.empty:
+        import plotly.express as px
         return px.timeline(title="Veri Yok")
-    
-    fig = px.timeline(plan_df, x_start="Başlangıç", x_end="Bitiş", y="Proje Adı", color="Kaynak")
-    return fig
+    return _gantt_figuru(plan_imzasi(plan_df), date_range_start, date_range_end, plan_df)
+
+ASAMA_ADLARI = {"taslak_sn": "Kayan Ufuk Taslağı", "temizleme_sn": "Veri Temizleme", "birlestirme_sn": "Toplu Birleştirme",
+                "sezgisel_sn": "Sezgisel Plan", "model_kurma_sn": "Model Kurma", "cozum_sn": "Çözüm",
+                "cikarma_sn": "Sonuç Çıkarma", "uzak_ufuk_sn": "Uzak Ufuk"}
+
+def performans_gecmisi_paneli():
+    """Çözücü çalıştırmalarının aşama sürelerini, model boyutunu ve boşluğu zamana ve girdi boyutuna göre çizer."""
+    gecmis = performans_gecmisi.oku()
+    if gecmis.empty:
+        st.caption("Henüz kayıtlı çalıştırma yok.")
+        return
+    import plotly.express as px
+
+    son = gecmis.iloc[-1]
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Son Çalıştırma", f"{son.get('toplam_sn', 0):.1f} sn", son.get('durum'))
+    c2.metric("Adım / Kısıt", f"{int(son.get('adim_sayisi', 0))} / {int(son.get('kisit_sayisi', 0) or 0)}")
+    c3.metric("Çatışma / Dal", f"{int(son.get('catisma_sayisi', 0) or 0)} / {int(son.get('dal_sayisi', 0) or 0)}")
+    c4.metric("Boşluk", "-" if pd.isna(son.get('bosluk')) else f"%{son['bosluk'] * 100:.1f}")
+
+    asamalar = [s for s in ASAMA_ADLARI if s in gecmis.columns]
+    uzun = gecmis.melt(id_vars=['tarih'], value_vars=asamalar, var_name='Aşama', value_name='Süre (sn)')
+    uzun['Aşama'] = uzun['Aşama'].map(ASAMA_ADLARI)
+    st.plotly_chart(px.bar(uzun, x='tarih', y='Süre (sn)', color='Aşama', title="Aşama Süreleri"), use_container_width=True)
+
+    # Süre girdi boyutuna göre çizilir; aynı boyutta yavaşlayan çalıştırmalar kural değişikliğine işaret eder
+    renk = 'kaynak_kisiti_sayisi' if 'kaynak_kisiti_sayisi' in gecmis.columns else None
+    st.plotly_chart(px.scatter(gecmis, x='adim_sayisi', y='toplam_sn', color=renk,
+                               hover_data=[c for c in ('tarih', 'durum', 'kisit_sayisi', 'sabit_kural_sayisi', 'manuel_grup_sayisi', 'bosluk')
+                                           if c in gecmis.columns],
+                               title="Toplam Süre - Adım Sayısı"), use_container_width=True)
+    st.dataframe(gecmis.iloc[::-1].head(50), use_container_width=True)
+    if st.button("Geçmişi Temizle"):
+        performans_gecmisi.temizle()
+        st.rerun()
 
 # --------------------------------------------------------------------------
 # --- ARAYÜZ (STREAMLIT) ---
@@ -513,10 +839,33 @@ tab1, tab_fizibilite, tab2, tab3, tab4 = st.tabs(["📊 Ana Panel", "📈 Fizibi
 
 with tab1:
     st.header("📊 Üretim Planlama Paneli")
+    c_plan, c_onizleme = st.columns(2)
+    if c_plan.button("🚀 Planı Hesapla", disabled=st.session_state.plan_isi is not None):
+        st.toast(plani_arka_planda_baslat())
+        st.rerun()
+    if c_onizleme.button("⚡ Hızlı Önizleme", disabled=st.session_state.plan_isi is not None):
+        st.toast(hizli_onizleme())
+    st.number_input("Ayrıntılı Çözüm Ufku (hafta)", min_value=0, max_value=52, step=1, key='kayan_ufuk_hafta',
+                    help="Başlamış adımlar yerinde kalır, yalnızca bu kadar haftalık iş çözücüyle yeniden planlanır. "
+                         "Sonraki işler öncelik listesiyle yerleşir. 0 tüm planı çözer.")
+    plan_isi_paneli()
+    ai_denetimini_surdur()
+    plan_df = _oturum_verisi(PLAN_ALANI)
+    if plan_df is not None and not plan_df.empty and st.session_state.plan_isi is None:
+        # Büyük planlarda yalnızca seçilen aralık çizilir; uzak görünümde adımlar özetlenir
+        ilk, son = pd.to_datetime(plan_df['Başlangıç']).min().date(), pd.to_datetime(plan_df['Bitiş']).max().date()
+        aralik = st.slider("Görüntülenen Aralık", min_value=ilk, max_value=max(son, ilk + timedelta(days=1)),
+                           value=(ilk, max(son, ilk + timedelta(days=1))), format="DD.MM.YYYY")
+        st.plotly_chart(create_enhanced_gantt_chart(plan_df, st.session_state.editable_df, *aralik), use_container_width=True)
     # ... (Dashboard kodları)
 
 with tab_fizibilite:
     st.header("📈 Satış Fizibilite")
+    if st.button("⚡ Sepeti Toplu Değerlendir", disabled=not st.session_state.fizibilite_sepeti):
+        with st.spinner("Teklifler değerlendiriliyor..."):
+            st.toast(fizibilite_sepetini_degerlendir())
+    if st.session_state.fizibilite_tablosu is not None:
+        st.dataframe(st.session_state.fizibilite_tablosu, use_container_width=True)
     # ... (Fizibilite kodları)
 
 with tab2:
@@ -540,6 +889,34 @@ with tab4:
         show_admin_login()
     else:
         st.header("⚙️ Yönetim Paneli")
+        with st.expander("🗄️ Plan Önbelleği"):
+            ist = plan_onbellegi.istatistikler()
+            c1, c2, c3 = st.columns(3)
+            c1.metric("İsabet / Iskalama", f"{ist['isabet']} / {ist['iskalama']}", f"%{ist['isabet_orani'] * 100:.0f} isabet")
+            c2.metric("Kayıt Sayısı", ist['kayit_sayisi'])
+            c3.metric("Disk Kullanımı", f"{ist['boyut_mb']} / {ist['maks_mb']} MB")
+            if st.button("Önbelleği Temizle"):
+                plan_onbellegi.temizle()
+                st.rerun()
+        with st.expander("✍️ Kural Yazma Maliyeti"):
+            ist = yazma_istatistikleri(kural_depolari(veri_deposu).values())
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Düzenleme", ist['duzenleme'])
+            c2.metric("Depo Çağrısı (Delta / Tam Yazım)", f"{ist['yazma_cagrisi']} / {ist['tam_yazma_cagrisi']}")
+            c3.metric("Yazılan Satır (Delta / Tam Yazım)", f"{ist['eklenen_satir']} / {ist['tam_yazma_satir']}")
+            st.caption(f"Silinen kural: {ist['silinen_kural']} · Toplam yazma süresi: {ist['yazma_sn']} sn · "
+                       f"Bekleyen kural: {ist['bekleyen_kural']} · Başarısız yazma: {ist['basarisiz_yazma']}")
+            for tablo, hata in ist['hatalar'].items():
+                st.error(f"{tablo} yazılamıyor, yeniden denenecek: {hata}")
+        with st.expander("🔗 Paylaşılan Veri"):
+            goruntu = paylasilan_veri(veri_deposu).goruntu()
+            ortak_plan = goruntu[PLAN_ALANI]
+            c1, c2, c3 = st.columns(3)
+            c1.metric("Görüntü Sürümü", goruntu.surum)
+            c2.metric("Ortak Plan", "-" if ortak_plan is None else f"{len(ortak_plan)} adım")
+            c3.metric("Oturuma Özel Alanlar", ", ".join(sorted(st.session_state.veri_katmani.ozel_alanlar())) or "-")
+        with st.expander("⏱️ Çözücü Performans Geçmişi"):
+            performans_gecmisi_paneli()
         # ... (Yönetim fonksiyonları)
 
 # Not: Bu kod, orijinal kodun temizlenmiş iskeletidir.
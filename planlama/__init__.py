@@ -0,0 +1,18 @@
+"""
+Üretim planlama çekirdeği: optimizasyon ve yardımcı modüller.
+
+Paket Streamlit'e bağlı değildir; girdiler planlama.veri ile okunur, plan
+hesapla_ve_optimize_et ile çözülür, raporlar planlama.rapor ile üretilir.
+Komut satırı için: python -m planlama.cli
+"""
+
+
+def __getattr__(ad):
+    # Paket içe aktarılırken ortools yüklenmez; optimizasyon ilk kullanımda yüklenir
+    if ad == "hesapla_ve_optimize_et":
+        from planlama.optimizasyon import hesapla_ve_optimize_et
+        return hesapla_ve_optimize_et
+    if ad == "planlama_girdilerini_oku":
+        from planlama.veri import planlama_girdilerini_oku
+        return planlama_girdilerini_oku
+    raise AttributeError(f"module {__name__!r} has no attribute {ad!r}")
@@ -0,0 +1,146 @@
+"""
+Uygulama açılış süresi ölçümü: içe aktarma profili ve giriş ekranı benchmark'ı.
+
+İçe aktarma profili `python -X importtime` çıktısını üst düzey paket başına toplar.
+Açılış benchmark'ı main.py'yi Streamlit'in test çalıştırıcısıyla (AppTest) her ölçümde
+ayrı bir süreçte çalıştırır; böylece modül önbelleği soğuk başlar. Giriş ekranı, girişten
+sonraki ilk çalıştırma ve yeniden çalıştırma süreleri ile o ana kadar yüklenen ağır
+modüller raporlanır.
+
+    python -m planlama.acilis --profil
+    python -m planlama.acilis --tekrar 3 --cikti acilis.jsonl
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Yalnızca ilgili özellik çalıştığında yüklenmesi beklenen modüller
+AGIR_MODULLER = ("pandas", "ortools", "plotly", "vertexai", "google.cloud.bigquery", "natsort")
+# Giriş ekranında bu modüllerden hiçbiri yüklenmemelidir
+GIRIS_YASAKLI = ("ortools", "plotly", "vertexai", "google.cloud.bigquery")
+# İçe aktarma profilinde varsayılan olarak ölçülen modüller
+PROFIL_MODULLERI = ("streamlit", "pandas", "planlama.denetim", "planlama.rapor", "planlama.optimizasyon",
+                    "planlama.gantt", "vertexai.generative_models", "google.cloud.bigquery")
+
+
+def ice_aktarma_profili(moduller=PROFIL_MODULLERI):
+    """
+    Modülleri temiz bir yorumlayıcıda -X importtime ile içe aktarır; üst düzey paket
+    başına toplam süreyi (ms) büyükten küçüğe döndürür. Yüklenemeyen modüller atlanır.
+    """
+    sonuc = {}
+    for modul in moduller:
+        surec = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {modul}"],
+                               capture_output=True, text=True)
+        if surec.returncode != 0:
+            sonuc[modul] = None
+            continue
+        paketler = {}
+        for satir in surec.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not satir.startswith("import time:") or "self [us]" in satir:
+                continue
+            kendi, _, ad = satir[len("import time:"):].split("|")
+            paket = ad.strip().split(".")[0]
+            paketler[paket] = paketler.get(paket, 0) + int(kendi)
+        sonuc[modul] = {p: round(us / 1000, 1) for p, us in sorted(paketler.items(), key=lambda x: -x[1])}
+    return sonuc
+
+
+def _yuklu_agir_moduller(haric=()):
+    return [m for m in AGIR_MODULLER if m in sys.modules and m not in haric]
+
+
+def _tek_acilis(ana_dosya, veri_dizini, zaman_asimi):
+    from streamlit.testing.v1 import AppTest
+
+    # Streamlit'in kendi yüklediği modüller (ör. plotly teması) uygulamaya yazılmaz
+    temel = _yuklu_agir_moduller()
+    uygulama = AppTest.from_file(ana_dosya, default_timeout=zaman_asimi)
+    uygulama.secrets["gcp"] = {"project_id": "acilis-olcumu"}
+    uygulama.secrets["auth"] = {"login_password": "acilis", "admin_password": "acilis"}
+    uygulama.secrets["email"] = {"sender_address": "planlama@example.com", "app_password": "",
+                                 "smtp_server": "localhost", "smtp_port": 25}
+    uygulama.secrets["veri"] = {"depo": "yerel", "yerel_dizin": veri_dizini}
+
+    t0 = time.perf_counter()
+    uygulama.run()
+    giris_sn = time.perf_counter() - t0
+    giris_modulleri = _yuklu_agir_moduller(temel)
+
+    uygulama.session_state["password_correct"] = True
+    t0 = time.perf_counter()
+    uygulama.run()
+    ilk_calisma_sn = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    uygulama.run()
+    yeniden_calisma_sn = time.perf_counter() - t0
+    return {
+        "giris_sn": round(giris_sn, 3),
+        "ilk_calisma_sn": round(ilk_calisma_sn, 3),
+        "yeniden_calisma_sn": round(yeniden_calisma_sn, 3),
+        "giris_modulleri": giris_modulleri,
+        "calisma_modulleri": _yuklu_agir_moduller(temel),
+        "hatalar": [h.value for h in uygulama.exception],
+    }
+
+
+def acilis_olc(ana_dosya="main.py", tekrar=3, veri_dizini=None, zaman_asimi=60):
+    """
+    main.py'yi her tekrarda yeni bir süreçte çalıştırıp açılış ölçümlerini döndürür.
+    veri_dizini verilmezse boş bir yerel veri deposu kullanılır.
+    """
+    baglam = multiprocessing.get_context("spawn")
+    sonuclar = []
+    with tempfile.TemporaryDirectory() as gecici:
+        dizin = veri_dizini or gecici
+        for _ in range(tekrar):
+            with ProcessPoolExecutor(max_workers=1, mp_context=baglam) as havuz:
+                sonuclar.append(havuz.submit(_tek_acilis, os.path.abspath(ana_dosya), dizin, zaman_asimi).result())
+    return sonuclar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Uygulama açılış süresi ölçümü")
+    parser.add_argument("--ana-dosya", default="main.py")
+    parser.add_argument("--tekrar", type=int, default=3)
+    parser.add_argument("--veri-dizini", help="Girişten sonraki çalıştırmalarda kullanılacak yerel veri dizini")
+    parser.add_argument("--profil", action="store_true", help="Paket başına içe aktarma süresini de yazdır")
+    parser.add_argument("--cikti", help="Sonuçların ekleneceği JSON Lines dosyası")
+    args = parser.parse_args(argv)
+
+    if args.profil:
+        for modul, paketler in ice_aktarma_profili().items():
+            if paketler is None:
+                print(f"{modul}: yüklenemedi")
+                continue
+            ilk = ", ".join(f"{p} {ms}ms" for p, ms in list(paketler.items())[:5])
+            print(f"{modul}: toplam {sum(paketler.values()):.0f}ms ({ilk})")
+
+    sonuclar = acilis_olc(args.ana_dosya, args.tekrar, args.veri_dizini)
+    ihlal = False
+    for s in sonuclar:
+        yasakli = [m for m in s["giris_modulleri"] if m in GIRIS_YASAKLI]
+        ihlal |= bool(yasakli)
+        print(f"giriş {s['giris_sn']:.3f}s  ilk çalışma {s['ilk_calisma_sn']:.3f}s  "
+              f"yeniden çalışma {s['yeniden_calisma_sn']:.3f}s  girişte yüklenen: {', '.join(s['giris_modulleri']) or '-'}"
+              + (f"  << YASAKLI: {', '.join(yasakli)}" if yasakli else ""))
+        for hata in s["hatalar"]:
+            print(f"  hata: {hata}")
+
+    if args.cikti:
+        with open(args.cikti, "a", encoding="utf-8") as f:
+            for s in sonuclar:
+                f.write(json.dumps(s, ensure_ascii=False) + "\n")
+    return 1 if ihlal else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Optimizasyonu Streamlit betik iş parçacığını bloklamadan arka planda çalıştırma.
+
+İşler süreç genelinde paylaşılan bir iş parçacığı havuzunda çalışır; CP-SAT çözüm
+sırasında GIL'i bıraktığı için arayüz yanıt vermeye devam eder. Her iyileşen ara
+çözüm işin üzerinde saklanır ve arayüz tarafından periyodik olarak okunur.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Aynı anda çalışabilecek arka plan optimizasyon işi sayısı (tüm oturumlar için)
+ARKA_PLAN_IS_SAYISI = 2
+
+_havuz = None
+_havuz_kilidi = threading.Lock()
+
+
+def _is_havuzu():
+    global _havuz
+    with _havuz_kilidi:
+        if _havuz is None:
+            _havuz = ThreadPoolExecutor(max_workers=ARKA_PLAN_IS_SAYISI, thread_name_prefix="planlama")
+        return _havuz
+
+
+class PlanlamaIsi:
+    """
+    Arka planda çalışan tek bir optimizasyon işi.
+
+    fonksiyon, ara_cozum ve durdur anahtar argümanlarını kabul etmeli ve
+    (plan_df, hedef, durum) döndürmelidir (ör. hesapla_ve_optimize_et).
+    """
+
+    def __init__(self, fonksiyon, *args, **kwargs):
+        self._kilit = threading.Lock()
+        self._durdur = threading.Event()
+        self.baslangic = time.monotonic()
+        self.cozum_sayisi = 0
+        self.hedef = None
+        self.sinir = None
+        self.en_iyi_plan = None
+        self._gelecek = _is_havuzu().submit(fonksiyon, *args, ara_cozum=self._ara_cozum_al, durdur=self._durdur, **kwargs)
+
+    def _ara_cozum_al(self, plan_df, hedef, sinir):
+        with self._kilit:
+            self.cozum_sayisi += 1
+            self.hedef, self.sinir = hedef, sinir
+            if plan_df is not None:
+                self.en_iyi_plan = plan_df
+
+    def durdur(self):
+        """Aramayı erken bitirir; iş o ana kadarki en iyi planla sonlanır."""
+        self._durdur.set()
+
+    @property
+    def durduruldu(self):
+        return self._durdur.is_set()
+
+    @property
+    def bitti(self):
+        return self._gelecek.done()
+
+    def anlik_durum(self):
+        """Son ara çözümün özetini döndürür: plan_df, hedef, sinir, cozum_sayisi, gecen_sn."""
+        with self._kilit:
+            return {
+                "plan_df": self.en_iyi_plan,
+                "hedef": self.hedef,
+                "sinir": self.sinir,
+                "cozum_sayisi": self.cozum_sayisi,
+                "gecen_sn": time.monotonic() - self.baslangic,
+            }
+
+    def sonuc(self):
+        """İş bittiyse (plan_df, hedef, durum), bitmediyse None döndürür."""
+        if not self._gelecek.done():
+            return None
+        try:
+            return self._gelecek.result()
+        except Exception:
+            logger.exception("Arka plan optimizasyonu başarısız")
+            return None, 0, None
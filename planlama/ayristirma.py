@@ -0,0 +1,153 @@
+"""
+Planlama problemini birbirinden bağımsız alt problemlere ayırma.
+
+Aynı projeye ait adımlar, aynı manuel başlangıç grubundaki adımlar ve aynı
+kaynağı/tezgahı çakışan zaman pencerelerinde kullanan projeler aynı bileşene
+düşer. Farklı bileşenler ayrı CP-SAT modelleri olarak çözülebilir. Pencereler
+tahmin olduğu için bileşen planları birleştirilince bilesen_catismalari ile
+kapasite ve tezgah çakışmaları aranır; çakışan bileşenler birlikte yeniden çözülür.
+Kaynakları tüm ufuk boyunca ortak kullanılan portföyler tek bileşene düşer.
+"""
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from planlama.sabitler import BATCHABLE_KAYNAKLAR
+from planlama.takvim import kapasite_takvimleri_olustur
+from planlama.toplu_isleme import adim_grubu
+
+# Proje penceresine eklenen güvenlik payı (gün); gecikmeli bitişler de çakışma sayılır
+AYRISTIRMA_PAYI_GUN = 30
+
+
+class _BirlesimBulma:
+    def __init__(self, elemanlar):
+        self.ebeveyn = {e: e for e in elemanlar}
+
+    def bul(self, e):
+        while self.ebeveyn[e] != e:
+            self.ebeveyn[e] = self.ebeveyn[self.ebeveyn[e]]
+            e = self.ebeveyn[e]
+        return e
+
+    def birlestir(self, a, b):
+        ka, kb = self.bul(a), self.bul(b)
+        if ka != kb:
+            self.ebeveyn[kb] = ka
+
+
+def proje_pencereleri(df: pd.DataFrame, plan_baslangic, pay_gun=AYRISTIRMA_PAYI_GUN):
+    """Her proje için (başlangıç, bitiş) gün aralığını kötümser biçimde tahmin eder."""
+    sure = pd.to_numeric(df['suregun'], errors='coerce').fillna(0).groupby(df['projeadi']).sum()
+    tarihler = df.groupby('projeadi')[['projebaslangictarihi', 'projebitistarihi']].first()
+    bas = ((pd.to_datetime(tarihler['projebaslangictarihi']) - plan_baslangic).dt.days).fillna(0).clip(lower=0)
+    termin = ((pd.to_datetime(tarihler['projebitistarihi']) - plan_baslangic).dt.days).fillna(0)
+    # Adımların hepsi sırayla yapılsa bile bitmesi gereken gün, termin ile karşılaştırılır
+    son = pd.concat([termin, bas + sure.reindex(bas.index).fillna(0)], axis=1).max(axis=1) + pay_gun
+    return pd.DataFrame({'bas': bas, 'son': son})
+
+
+def bagimsiz_bilesenleri_bul(df: pd.DataFrame, plan_baslangic, manual_start_groups=None, pay_gun=AYRISTIRMA_PAYI_GUN):
+    """
+    Görev tablosunu bağımsız bileşenlere ayırır.
+    Her bileşen için df index etiketlerinden oluşan bir liste döndürür (büyükten küçüğe).
+    """
+    if df.empty:
+        return []
+    projeler = df['projeadi'].unique()
+    uf = _BirlesimBulma(projeler)
+    pencereler = proje_pencereleri(df, plan_baslangic, pay_gun)
+
+    # Kaynak ve tezgah bağları: aynı kaynağı kullanan projeler başlangıca göre sıralanıp
+    # pencereleri üst üste binenler birleştirilir (aralık birleştirme taraması)
+    kullanim = df[['projeadi', 'kaynakadi']].rename(columns={'kaynakadi': 'birim'})
+    if 'tezgahadi' in df.columns:
+        tezgahlar = df[['projeadi', 'tezgahadi']].dropna()
+        tezgahlar = tezgahlar.assign(birim=tezgahlar['tezgahadi'].astype(str).str.split(',')).explode('birim')
+        tezgahlar['birim'] = 'tezgah:' + tezgahlar['birim'].str.strip()
+        kullanim = pd.concat([kullanim, tezgahlar[['projeadi', 'birim']]])
+    kullanim = kullanim.dropna().drop_duplicates()
+    kullanim = kullanim.join(pencereler, on='projeadi').sort_values(['birim', 'bas'])
+    for _, grup in kullanim.groupby('birim', sort=False):
+        aktif_proje, aktif_son = None, None
+        for proje, bas, son in zip(grup['projeadi'], grup['bas'], grup['son']):
+            if aktif_proje is not None and bas <= aktif_son:
+                uf.birlestir(aktif_proje, proje)
+                aktif_son = max(aktif_son, son)
+            else:
+                aktif_proje, aktif_son = proje, son
+
+    # Manuel başlangıç grupları projeleri birbirine bağlar
+    adim_proje = dict(zip(df['adimid'].astype(str), df['projeadi']))
+    for grup in manual_start_groups or []:
+        grup_projeleri = [adim_proje[str(a)] for a in grup if str(a) in adim_proje]
+        for proje in grup_projeleri[1:]:
+            uf.birlestir(grup_projeleri[0], proje)
+
+    kok = df['projeadi'].map(uf.bul)
+    bilesenler = [list(idx) for _, idx in df.groupby(kok, sort=False).groups.items()]
+    return sorted(bilesenler, key=len, reverse=True)
+
+
+def _plan_araliklari(planlar, plan_baslangic):
+    # Bileşen numarasıyla (kaynak, tezgah, başlangıç, bitiş) günleri; geçmiş kısımlar yer tutmaz
+    tablolar = []
+    for sira, plan in enumerate(planlar):
+        tablolar.append(pd.DataFrame({
+            'bilesen': sira, 'kaynak': plan['Kaynak'], 'tezgah': plan['Tezgah'], 'grup': plan['Adım Adı'].map(adim_grubu),
+            'bas': (plan['Başlangıç'] - plan_baslangic).dt.days.clip(lower=0),
+            'bit': (plan['Bitiş'] - plan_baslangic).dt.days,
+        }))
+    araliklar = pd.concat(tablolar, ignore_index=True)
+    araliklar = araliklar[araliklar['bit'] > araliklar['bas']]
+    # Toplu adım üyeleri aynı gün başlar ve kaynağı birlikte bir birim kullanır
+    toplu = araliklar['kaynak'].isin(BATCHABLE_KAYNAKLAR) & araliklar['grup'].notna()
+    birlesik = (araliklar[toplu].fillna({'tezgah': ''})
+                .groupby(['bilesen', 'kaynak', 'tezgah', 'grup', 'bas'], as_index=False)['bit'].max())
+    birlesik['tezgah'] = birlesik['tezgah'].replace('', None)
+    return pd.concat([araliklar[~toplu], birlesik], ignore_index=True)
+
+
+def bilesen_catismalari(planlar, kaynaklar_df, kaynak_kisitlari, plan_baslangic):
+    """
+    Ayrı çözülen bileşen planlarını birlikte denetler. Bir kaynağın kapasitesini aynı gün
+    birlikte aşan ya da aynı tezgahı aynı anda kullanan bileşen çiftlerini döndürür.
+    """
+    plan_baslangic = pd.Timestamp(plan_baslangic)
+    ciftler = set()
+    araliklar = _plan_araliklari(planlar, plan_baslangic)
+    if araliklar.empty:
+        return ciftler
+
+    takvimler = kapasite_takvimleri_olustur(kaynaklar_df, kaynak_kisitlari, plan_baslangic)
+    takvimler = {k: t for k, t in takvimler.items() if t.temel > 0}
+    for kaynak, grup in araliklar[araliklar['kaynak'].isin(takvimler)].groupby('kaynak'):
+        ufuk = int(grup['bit'].max())
+        kullanim = np.zeros((len(planlar), ufuk + 1), dtype=np.int64)
+        np.add.at(kullanim, (grup['bilesen'].to_numpy(), grup['bas'].to_numpy()), 1)
+        np.add.at(kullanim, (grup['bilesen'].to_numpy(), grup['bit'].to_numpy()), -1)
+        kullanim = kullanim.cumsum(axis=1)[:, :ufuk]
+        asim = kullanim.sum(axis=0) > takvimler[kaynak].kapasite(np.arange(ufuk))
+        # Kapasitenin aşıldığı günlerde kaynağı kullanan bileşen kümeleri
+        for katki in np.unique(kullanim[:, asim] > 0, axis=1).T:
+            ciftler.update(combinations(np.flatnonzero(katki).tolist(), 2))
+
+    for _, grup in araliklar.dropna(subset=['tezgah']).groupby('tezgah'):
+        aktif = {}  # bileşen -> tezgahı kullandığı son gün
+        for bilesen, bas, bit in sorted(zip(grup['bilesen'], grup['bas'], grup['bit']), key=lambda a: a[1]):
+            ciftler.update((min(b, bilesen), max(b, bilesen))
+                           for b, son in aktif.items() if b != bilesen and son > bas)
+            aktif[bilesen] = max(aktif.get(bilesen, bit), bit)
+    return ciftler
+
+
+def catisan_gruplar(bilesen_sayisi, ciftler):
+    """Çakışan bileşen çiftlerinden birlikte yeniden çözülecek bileşen numarası grupları."""
+    uf = _BirlesimBulma(range(bilesen_sayisi))
+    for a, b in ciftler:
+        uf.birlestir(a, b)
+    gruplar = {}
+    for i in range(bilesen_sayisi):
+        gruplar.setdefault(uf.bul(i), []).append(i)
+    return [g for g in gruplar.values() if len(g) > 1]
@@ -0,0 +1,196 @@
+"""
+Optimizasyon motoru için boyut taramalı benchmark.
+
+Her boyut ayrı bir süreçte çözülür; böylece tepe bellek ölçümleri birbirini etkilemez.
+Sonuçlar commit bilgisiyle JSON Lines olarak yazılır ve önceki bir çalıştırmayla karşılaştırılabilir.
+
+    python -m planlama.benchmark --projeler 20,50,100,200 --cikti benchmark.jsonl
+    python -m planlama.benchmark --projeler 20,50,100,200 --karsilastir benchmark.jsonl
+
+--profiller ile her boyut verilen çözücü profillerinin her biriyle çözülür ve boyut başına
+en iyi hedefe ulaşan profil işaretlenir. --gecmise-kaydet ile ölçümler performans geçmişine
+yazılır; profil seçimi bu kayıtlardan öğrenir.
+
+    python -m planlama.benchmark --projeler 20,200,1000 --profiller varsayilan,dogrusal,asamali --gecmise-kaydet
+"""
+import argparse
+import inspect
+import json
+import multiprocessing
+import resource
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from planlama.optimizasyon import hesapla_ve_optimize_et
+from planlama.sentetik import sentetik_veri_uret
+
+# Karşılaştırmada bu oranın üzerindeki yavaşlamalar gerileme olarak işaretlenir
+GERILEME_ESIGI = 1.25
+# Bu farkın altındaki süre değişimleri ölçüm gürültüsü sayılır
+MIN_FARK_SN = 0.5
+# Ölçümü belirleyen üretici parametreleri; eski kayıtlarda bulunmayanlar varsayılan değerini alır
+_URETICI_VARSAYILANLARI = {ad: p.default for ad, p in inspect.signature(sentetik_veri_uret).parameters.items()
+                           if ad != "plan_baslangic"}
+
+
+def _commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _tek_olcum(boyut, cozucu_ayarlari=None):
+    veri = sentetik_veri_uret(**boyut)
+    olcumler = {}
+    cozucu_ayarlari = {"gecmise_kaydet": False, **(cozucu_ayarlari or {})}
+    t0 = time.perf_counter()
+    plan_df, hedef, durum = hesapla_ve_optimize_et(
+        veri["gorevler"], veri["kaynaklar"], veri["tezgahlar"],
+        kaynak_kisitlari=veri["kaynak_kisitlari"], olcumler=olcumler, onbellek=False, **cozucu_ayarlari)
+    toplam = time.perf_counter() - t0
+    return {
+        **boyut,
+        # İstenen profil (None: otomatik seçim) ve çözümde kullanılan profil
+        "profil": cozucu_ayarlari.get("cozucu_profili"),
+        "cozucu_profili": olcumler.get("cozucu_profili"),
+        "boyut_sinifi": olcumler.get("boyut_sinifi"),
+        "adim": len(veri["gorevler"]),
+        "sezgisel_sn": round(olcumler.get("sezgisel_sn", 0.0), 4),
+        "model_kurma_sn": round(olcumler.get("model_kurma_sn", 0.0), 4),
+        "cozum_sn": round(olcumler.get("cozum_sn", 0.0), 4),
+        "ilk_cozum_sn": olcumler.get("ilk_cozum_sn") and round(olcumler["ilk_cozum_sn"], 4),
+        "toplam_sn": round(toplam, 4),
+        "bilesen_sayisi": olcumler.get("bilesen_sayisi", 1),
+        "kisit_sayisi": olcumler.get("kisit_sayisi"),
+        "catisma_sayisi": olcumler.get("catisma_sayisi"),
+        "bosluk": olcumler.get("bosluk"),
+        "hedef": hedef,
+        "durum": durum,
+        # Linux'ta ru_maxrss KB cinsindendir
+        "tepe_bellek_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def benchmark_calistir(proje_sayilari, adim_sayisi=8, tohum=0, cozucu_ayarlari=None, **uretici_ayarlari):
+    """
+    Her proje sayısı için ayrı süreçte ölçüm yapar ve sonuç sözlüklerini döndürür.
+    cozucu_ayarlari hesapla_ve_optimize_et'e aktarılır (ör. zaman_limiti, isci_sayisi).
+    """
+    ortak = {"commit": _commit(), "tarih": datetime.now().isoformat(timespec="seconds")}
+    sonuclar = []
+    baglam = multiprocessing.get_context("spawn")
+    for proje_sayisi in proje_sayilari:
+        boyut = {"proje_sayisi": proje_sayisi, "adim_sayisi": adim_sayisi, "tohum": tohum, **uretici_ayarlari}
+        with ProcessPoolExecutor(max_workers=1, mp_context=baglam) as havuz:
+            sonuclar.append({**ortak, **havuz.submit(_tek_olcum, boyut, cozucu_ayarlari).result()})
+    return sonuclar
+
+
+def _boyut_anahtari(sonuc):
+    return tuple(sonuc.get(ad, varsayilan) for ad, varsayilan in _URETICI_VARSAYILANLARI.items())
+
+
+def _anahtar(sonuc):
+    return _boyut_anahtari(sonuc) + (sonuc.get("profil"),)
+
+
+def profilleri_karsilastir(sonuclar):
+    """Her boyut için en küçük hedefe (eşitlikte en kısa süreye) ulaşan profilin sonucunu döndürür."""
+    en_iyi = {}
+    for s in sonuclar:
+        if s["hedef"] is None:
+            continue
+        anahtar = _boyut_anahtari(s)
+        mevcut = en_iyi.get(anahtar)
+        if mevcut is None or (s["hedef"], s["toplam_sn"]) < (mevcut["hedef"], mevcut["toplam_sn"]):
+            en_iyi[anahtar] = s
+    return en_iyi
+
+
+def _hedef_geriledi(eski, yeni):
+    if eski is None:
+        return False
+    return yeni is None or yeni > eski
+
+
+def karsilastir(onceki, simdiki, esik=GERILEME_ESIGI):
+    """
+    Aynı boyut, üretici ayarları ve profildeki ölçümleri eşleştirip süre oranlarını ve gerilemeleri
+    döndürür. Yavaşlama, daha kötü hedef ya da önceden bulunan çözümün kaybolması gerilemedir.
+    """
+    onceki_son = {_anahtar(s): s for s in onceki}
+    satirlar = []
+    for s in simdiki:
+        eski = onceki_son.get(_anahtar(s))
+        if eski is None:
+            continue
+        oran = s["toplam_sn"] / eski["toplam_sn"] if eski["toplam_sn"] else float("inf")
+        satirlar.append({
+            "proje_sayisi": s["proje_sayisi"], "adim": s["adim"],
+            "eski_sn": eski["toplam_sn"], "yeni_sn": s["toplam_sn"], "oran": round(oran, 2),
+            "eski_hedef": eski["hedef"], "yeni_hedef": s["hedef"],
+            "gerileme": (oran > esik and s["toplam_sn"] - eski["toplam_sn"] > MIN_FARK_SN)
+                        or _hedef_geriledi(eski["hedef"], s["hedef"]),
+        })
+    return satirlar
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimizasyon motoru benchmark taraması")
+    parser.add_argument("--projeler", default="20,50,100,200", help="Virgülle ayrılmış proje sayıları")
+    parser.add_argument("--adim", type=int, default=8, help="Proje başına adım sayısı")
+    parser.add_argument("--oncul-yogunlugu", type=float, default=0.2)
+    parser.add_argument("--freze-orani", type=float, default=0.15)
+    parser.add_argument("--toplu-oran", type=float, default=0.2)
+    parser.add_argument("--kural-sayisi", type=int, default=5)
+    parser.add_argument("--tohum", type=int, default=0)
+    parser.add_argument("--isci", type=int, help="Toplam CP-SAT işçi sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--zaman-limiti", type=float, help="Çözücü zaman limiti (sn)")
+    parser.add_argument("--profiller", help="Virgülle ayrılmış çözücü profilleri (varsayılan: boyuta göre otomatik)")
+    parser.add_argument("--gecmise-kaydet", action="store_true", help="Ölçümleri performans geçmişine yaz")
+    parser.add_argument("--cikti", help="Sonuçların ekleneceği JSON Lines dosyası")
+    parser.add_argument("--karsilastir", help="Karşılaştırılacak önceki JSON Lines dosyası")
+    args = parser.parse_args(argv)
+
+    profiller = args.profiller.split(",") if args.profiller else [None]
+    sonuclar = []
+    for profil in profiller:
+        sonuclar += benchmark_calistir(
+            [int(p) for p in args.projeler.split(",")], adim_sayisi=args.adim, tohum=args.tohum,
+            oncul_yogunlugu=args.oncul_yogunlugu, freze_orani=args.freze_orani, toplu_oran=args.toplu_oran,
+            kural_sayisi=args.kural_sayisi,
+            cozucu_ayarlari={"isci_sayisi": args.isci, "zaman_limiti": args.zaman_limiti,
+                             "cozucu_profili": profil, "gecmise_kaydet": args.gecmise_kaydet})
+    en_iyi = profilleri_karsilastir(sonuclar) if len(profiller) > 1 else {}
+    for s in sorted(sonuclar, key=lambda s: s["proje_sayisi"]):
+        isaret = "  *" if en_iyi.get(_boyut_anahtari(s)) is s else ""
+        print(f"{s['proje_sayisi']:>6} proje {s['adim']:>7} adım  {s['cozucu_profili'] or '-':<13}  "
+              f"kurma {s['model_kurma_sn']:>8.3f}s  çözüm {s['cozum_sn']:>8.3f}s  hedef {s['hedef']}  "
+              f"{s['durum']}  {s['tepe_bellek_mb']} MB{isaret}")
+
+    if args.karsilastir:
+        with open(args.karsilastir, encoding="utf-8") as f:
+            onceki = [json.loads(satir) for satir in f if satir.strip()]
+        gerileme_var = False
+        for k in karsilastir(onceki, sonuclar):
+            isaret = "  << GERİLEME" if k["gerileme"] else ""
+            gerileme_var |= k["gerileme"]
+            print(f"{k['proje_sayisi']:>6} proje: {k['eski_sn']}s -> {k['yeni_sn']}s (x{k['oran']})  "
+                  f"hedef {k['eski_hedef']} -> {k['yeni_hedef']}{isaret}")
+        if gerileme_var:
+            return 1
+
+    if args.cikti:
+        with open(args.cikti, "a", encoding="utf-8") as f:
+            for s in sonuclar:
+                f.write(json.dumps(s, ensure_ascii=False) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
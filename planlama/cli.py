@@ -0,0 +1,96 @@
+"""
+Arayüzsüz planlama: girdileri yerel dosyalardan okuyup planı çözer ve dosyaya yazar.
+
+Girdi dizini YerelVeriDeposu düzenindedir (tablo başına <tablo>.parquet; depoyu_kopyala ile
+BigQuery'den alınabilir). Plan, uzantıya göre Parquet ya da CSV olarak yazılır. Gece
+yeniden planlamaları ve hesaplama düğümlerindeki benchmark'lar Streamlit olmadan çalışır.
+
+    python -m planlama.cli --veri veri/ --cikti plan.parquet --isci 16 --zaman-limiti 600
+    python -m planlama.cli --veri veri/ --onceki-plan plan.parquet --kayan-ufuk 4 --cikti yeni_plan.csv
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+import pandas as pd
+
+from planlama.depolama import YerelVeriDeposu
+from planlama.veri import planlama_girdilerini_oku
+
+logger = logging.getLogger(__name__)
+
+
+def _csv_mi(yol):
+    return os.path.splitext(yol)[1].lower() == ".csv"
+
+
+def plani_oku(yol):
+    """Parquet ya da CSV plan dosyasını okur."""
+    if _csv_mi(yol):
+        return pd.read_csv(yol, dtype={'Adım ID': str}, parse_dates=['Başlangıç', 'Bitiş'])
+    return pd.read_parquet(yol)
+
+
+def plani_yaz(plan_df, yol):
+    """Planı uzantıya göre Parquet ya da CSV olarak yazar."""
+    os.makedirs(os.path.dirname(os.path.abspath(yol)), exist_ok=True)
+    if _csv_mi(yol):
+        plan_df.to_csv(yol, index=False)
+    else:
+        plan_df.to_parquet(yol, index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Üretim planını arayüz olmadan hesaplar")
+    parser.add_argument("--veri", required=True, help="Tablo başına <tablo>.parquet içeren girdi dizini")
+    parser.add_argument("--cikti", required=True, help="Plan dosyası (.parquet ya da .csv)")
+    parser.add_argument("--onceki-plan", help="Sıcak başlatma ve kayan ufuk için önceki plan dosyası")
+    parser.add_argument("--isci", type=int, help="Toplam CP-SAT işçi sayısı (varsayılan: çekirdek sayısı)")
+    parser.add_argument("--zaman-limiti", type=float, help="Çözücü zaman limiti (sn)")
+    parser.add_argument("--profil", help="Çözücü profili (ör. dogrusal, asamali; varsayılan: boyuta ve geçmişe göre)")
+    parser.add_argument("--kayan-ufuk", type=int, help="Tam ayrıntıyla çözülecek yakın ufuk (hafta)")
+    parser.add_argument("--toplu-pencere", type=int, help="Toplu adım birleştirme penceresi (gün); 0 kapatır")
+    parser.add_argument("--ayristirma-yok", action="store_true", help="Bağımsız bileşenlere ayırmadan çöz")
+    parser.add_argument("--onbellek-yok", action="store_true", help="Plan önbelleğini kullanma")
+    parser.add_argument("--olcumler", help="Aşama süreleri ve çözücü istatistiklerinin yazılacağı JSON dosyası")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    # ortools yalnızca çözüm gerektiğinde yüklenir; --help hızlı kalır
+    from planlama.optimizasyon import hesapla_ve_optimize_et
+    from planlama.toplu_isleme import TOPLU_PENCERE_GUN
+
+    g = planlama_girdilerini_oku(YerelVeriDeposu(args.veri))
+    if g["gorevler_df"].empty:
+        logger.error("Görev tablosu boş: %s", args.veri)
+        return 1
+    onceki_plan_df = plani_oku(args.onceki_plan) if args.onceki_plan else None
+    if args.toplu_pencere is None:
+        toplu_pencere_gun = TOPLU_PENCERE_GUN
+    else:
+        toplu_pencere_gun = args.toplu_pencere or None
+
+    olcumler = {}
+    plan_df, hedef, durum = hesapla_ve_optimize_et(
+        g["gorevler_df"], g["kaynaklar_df"], g["tezgahlar_df"],
+        manual_start_groups=g["manual_groups"], sabit_baslangic_kurallari=g["sabit_kurallar"],
+        kaynak_kisitlari=g["kaynak_kisitlari"], onceki_plan_df=onceki_plan_df, ayristir=not args.ayristirma_yok,
+        olcumler=olcumler, onbellek=not args.onbellek_yok, toplu_pencere_gun=toplu_pencere_gun,
+        kayan_ufuk_hafta=args.kayan_ufuk, zaman_limiti=args.zaman_limiti, isci_sayisi=args.isci,
+        cozucu_profili=args.profil)
+    if args.olcumler:
+        with open(args.olcumler, "w", encoding="utf-8") as f:
+            json.dump({**olcumler, "durum": durum}, f, ensure_ascii=False, indent=2, default=str)
+    if plan_df is None:
+        logger.error("Plan hesaplanamadı (durum: %s)", durum)
+        return 1
+    plani_yaz(plan_df, args.cikti)
+    print(f"{len(plan_df)} adım planlandı  durum {durum}  hedef {hedef:.0f}  "
+          f"süre {olcumler.get('toplam_sn', 0.0):.1f}s  -> {args.cikti}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+"""
+CP-SAT çözücü profilleri: model boyutuna göre parametre seçimi ve aşamalı çözüm.
+
+Modeller boyut ölçüsüne (adım ve aralık sayısının büyüğü) göre sınıflara ayrılır; her sınıfın
+varsayılan profili, zaman limiti ve işçi sınırı vardır. Profil, CP-SAT parametrelerinin adlı bir
+kümesidir. Aşamalı profiller önce bütçenin küçük bir kısmında ilk uygulanabilir planı bulur,
+kalan sürede o plandan başlayarak gecikmeyi iyileştirir. Profil verilmezse performans
+geçmişinde sınıf başına en küçük ortalama boşluğa ulaşan profil seçilir; yeterli kayıt yoksa
+sınıfın varsayılanı kullanılır. Profiller benchmark ile karşılaştırılabilir:
+
+    python -m planlama.benchmark --projeler 20,200,1000 --profiller varsayilan,dogrusal,asamali
+"""
+import logging
+import os
+import time
+
+from ortools.sat.python import cp_model
+
+from planlama.sezgisel import SEZGISEL_DURUM
+from planlama.telemetri import performans_gecmisi
+
+logger = logging.getLogger(__name__)
+
+PROFILLER = {
+    # CP-SAT varsayılanları
+    "varsayilan": {"parametreler": {}, "asamali": False},
+    # Güçlü doğrusal gevşetme: küçük modellerde alt sınırı ve optimallik kanıtını hızlandırır
+    "dogrusal": {"parametreler": {"linearization_level": 2}, "asamali": False},
+    # Ön çözüm ve simetri aramasını kısaltır; kurma süresi baskın büyük modeller için
+    "hafif": {"parametreler": {"max_presolve_iterations": 1, "symmetry_level": 0}, "asamali": False},
+    "asamali": {"parametreler": {}, "asamali": True},
+    "asamali_hafif": {"parametreler": {"max_presolve_iterations": 1, "symmetry_level": 0}, "asamali": True},
+}
+
+# (sınıf, en büyük boyut ölçüsü, varsayılan profil, zaman limiti sn, en fazla CP-SAT işçisi)
+BOYUT_SINIFLARI = (
+    ("kucuk", 300, "dogrusal", 30, 8),
+    ("orta", 3000, "asamali", 120, None),
+    ("buyuk", None, "asamali_hafif", 120, None),
+)
+
+# Aşamalı profillerde ilk uygulanabilir plana ayrılan bütçe oranı ve ilk aşama parametreleri
+ILK_ASAMA_ORANI = 0.2
+ILK_ASAMA_PARAMETRELERI = {"stop_after_first_solution": True}
+
+# Geçmişten öğrenmek için sınıf ve profil başına gereken en az çalıştırma
+OGRENME_MIN_KAYIT = 3
+
+_ogrenme_bellegi = {}
+
+
+def boyut_sinifi(adim_sayisi, aralik_sayisi=0):
+    olcu = max(adim_sayisi, aralik_sayisi)
+    for sinif, sinir, *_ in BOYUT_SINIFLARI:
+        if sinir is None or olcu <= sinir:
+            return sinif
+
+
+def sinif_ayarlari(sinif):
+    """Sınıfın varsayılan profili, zaman limiti ve işçi sınırı."""
+    for ad, _, profil, zaman_limiti, isci_sayisi in BOYUT_SINIFLARI:
+        if ad == sinif:
+            return {"profil": profil, "zaman_limiti": zaman_limiti, "isci_sayisi": isci_sayisi}
+    raise ValueError(f"Bilinmeyen boyut sınıfı: {sinif}")
+
+
+def ogrenilen_profiller(gecmis_df, min_kayit=OGRENME_MIN_KAYIT):
+    """
+    Performans geçmişinden sınıf -> profil eşlemesi. Her sınıfta ortalama boşluğu en küçük
+    (eşitlikte ortalama çözüm süresi en kısa) profil seçilir; erken durdurulan ve sezgisel plana
+    düşen çalıştırmalar sayılmaz.
+    """
+    gerekli = {"boyut_sinifi", "cozucu_profili", "bosluk", "cozum_sn"}
+    if gecmis_df.empty or not gerekli <= set(gecmis_df.columns):
+        return {}
+    df = gecmis_df.dropna(subset=sorted(gerekli))
+    df = df[df['cozucu_profili'].isin(PROFILLER)]
+    if 'durduruldu' in df.columns:
+        df = df[~df['durduruldu'].astype('boolean').fillna(False)]
+    if 'durum' in df.columns:
+        df = df[df['durum'] != SEZGISEL_DURUM]
+    if df.empty:
+        return {}
+    ozet = df.groupby(['boyut_sinifi', 'cozucu_profili']).agg(
+        kayit=('bosluk', 'size'), bosluk=('bosluk', 'mean'), sure=('cozum_sn', 'mean')).reset_index()
+    ozet = ozet[ozet['kayit'] >= min_kayit].sort_values(['boyut_sinifi', 'bosluk', 'sure'])
+    return dict(ozet.drop_duplicates('boyut_sinifi')[['boyut_sinifi', 'cozucu_profili']].itertuples(index=False, name=None))
+
+
+def _gecmisten_ogrenilen(gecmis):
+    # Geçmiş dosyası değişmedikçe yeniden okunmaz
+    try:
+        damga = os.path.getmtime(gecmis.dosya)
+    except OSError:
+        return {}
+    kayit = _ogrenme_bellegi.get(gecmis.dosya)
+    if kayit is None or kayit[0] != damga:
+        try:
+            kayit = (damga, ogrenilen_profiller(gecmis.oku()))
+        except Exception:
+            logger.exception("Performans geçmişinden profil öğrenilemedi")
+            kayit = (damga, {})
+        _ogrenme_bellegi[gecmis.dosya] = kayit
+    return kayit[1]
+
+
+def profil_sec(sinif, profil=None, gecmis=performans_gecmisi):
+    """Verilen profil; verilmezse geçmişten öğrenilen, o da yoksa sınıfın varsayılan profili."""
+    if profil is not None:
+        if profil not in PROFILLER:
+            raise ValueError(f"Bilinmeyen çözücü profili: {profil}")
+        return profil
+    return _gecmisten_ogrenilen(gecmis).get(sinif) or sinif_ayarlari(sinif)["profil"]
+
+
+def _cozucu(parametreler, zaman_limiti, isci_sayisi):
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = zaman_limiti
+    if isci_sayisi:
+        solver.parameters.num_workers = isci_sayisi
+    for ad, deger in parametreler.items():
+        setattr(solver.parameters, ad, deger)
+    return solver
+
+
+def profil_ile_coz(model, profil, zaman_limiti, isci_sayisi=None, dinleyici=None, durdur=None, olcumler=None):
+    """
+    Modeli profil parametreleriyle çözer, (solver, status) döndürür. Aşamalı profillerde ilk
+    aşama bütçenin ILK_ASAMA_ORANI kadarında ilk uygulanabilir çözümü arar; ikinci aşama kalan
+    sürede bu çözümü ipucu alarak iyileştirir ve iki aşamadan hedefi iyi olan döner.
+    """
+    ayar = PROFILLER[profil]
+    if not ayar["asamali"]:
+        solver = _cozucu(ayar["parametreler"], zaman_limiti, isci_sayisi)
+        return solver, solver.Solve(model, dinleyici)
+
+    t0 = time.perf_counter()
+    ilk = _cozucu({**ayar["parametreler"], **ILK_ASAMA_PARAMETRELERI}, zaman_limiti * ILK_ASAMA_ORANI, isci_sayisi)
+    ilk_durum = ilk.Solve(model, dinleyici)
+    gecen = time.perf_counter() - t0
+    if olcumler is not None:
+        olcumler['ilk_cozum_sn'] = gecen
+    kalan = zaman_limiti - gecen
+    if (ilk_durum in (cp_model.OPTIMAL, cp_model.INFEASIBLE, cp_model.MODEL_INVALID) or kalan <= 0
+            or (durdur is not None and durdur.is_set())):
+        return ilk, ilk_durum
+
+    cozum_var = ilk_durum == cp_model.FEASIBLE
+    if cozum_var:
+        # İkinci aşama sezgisel ipuçları yerine ilk aşamanın tam çözümünden başlar
+        model.ClearHints()
+        for i, deger in enumerate(ilk.ResponseProto().solution):
+            model.AddHint(model.GetIntVarFromProtoIndex(i), deger)
+    ikinci = _cozucu(ayar["parametreler"], kalan, isci_sayisi)
+    ikinci_durum = ikinci.Solve(model, dinleyici)
+    if ikinci_durum in (cp_model.OPTIMAL, cp_model.FEASIBLE) and (
+            not cozum_var or ikinci.ObjectiveValue() <= ilk.ObjectiveValue()):
+        return ikinci, ikinci_durum
+    return ilk, ilk_durum
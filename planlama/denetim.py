@@ -0,0 +1,208 @@
+"""
+AI süpervizör döngüsü için kompakt plan özeti ve araç sonuçları belleği.
+
+Modele plan tablosunun tamamı yerine proje başına gecikme, gecikmeli projelerin
+kritik yolu ve darboğaz kaynaklar ile bir önceki denemeye göre fark gönderilir. Plan
+hakkındaki sorularda özet, soruda adı geçen projelere ve kaynaklara daraltılır.
+AracBellegi, aynı girdilerle (ve aynı plan durumunda) tekrarlanan araç çağrılarını
+ve yeniden planlamaları oturum içinde yeniden çalıştırmadan döndürür.
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from planlama.sezgisel import _onceki_adim_listesi
+
+# Özete giren en fazla gecikmeli proje, kritik yol adımı ve darboğaz kaynak sayısı
+OZET_PROJE_SAYISI = 15
+OZET_KRITIK_YOL_UZUNLUGU = 6
+OZET_DARBOGAZ_SAYISI = 5
+# Odak projelerinde listelenen en fazla tolerans süresini aşan adım sayısı
+OZET_ADIM_SAYISI = 10
+# Plan sonuçları tüm plan tablosunu taşıdığı için oturum belleği birkaç kayıtla sınırlıdır
+ARAC_BELLEGI_MAKS_KAYIT = 8
+
+
+def _kritik_yol(proje_plani, onculler, proje_baslangic):
+    # Son biten adımdan geriye, her adımda en geç biten öncüle yürünür. Öncülün (ilk adımda
+    # proje başlangıcının) bitişi ile adımın başlangıcı arasındaki boşluk kaynak beklemesidir.
+    adimlar = proje_plani.sort_values('Bitiş').drop_duplicates('Adım Adı', keep='last').set_index('Adım Adı')
+    bas, bit, kaynak = adimlar['Başlangıç'].to_dict(), adimlar['Bitiş'].to_dict(), adimlar['Kaynak'].to_dict()
+    adim = adimlar.index[-1]
+    yol, ziyaret = [], set()
+    while adim is not None and adim not in ziyaret:
+        ziyaret.add(adim)
+        onceki = max((o for o in onculler.get(adim, []) if o in bit), key=bit.get, default=None)
+        hazir = bit[onceki] if onceki is not None else proje_baslangic
+        bekleme = 0 if pd.isna(hazir) else max((bas[adim] - hazir).days, 0)
+        yol.append({"adim": adim, "kaynak": kaynak[adim], "bekleme_gun": bekleme})
+        adim = onceki
+    return yol[::-1]
+
+
+def soru_odagi(soru, plan_df):
+    """Soruda adı geçen projeler ve kaynaklar (büyük/küçük harf duyarsız)."""
+    metin = str(soru or "").casefold()
+
+    def gecenler(adlar):
+        return sorted({str(a) for a in adlar.dropna().unique() if str(a).casefold() in metin})
+
+    return {"projeler": gecenler(plan_df['Proje Adı']), "kaynaklar": gecenler(plan_df['Kaynak'])}
+
+
+def plan_ozeti(plan_df, gorevler_df, kaynaklar_df=None, odak=None):
+    """
+    Planın model için özetini döndürür: toplam gecikme, tolerans süresini aşan adım sayısı,
+    gecikmeli projeler (gecikme, termin, öncelik, kritik yol) ve bekleme ile doluluğa göre
+    sıralı darboğaz kaynaklar. odak (soru_odagi) verilirse proje listesi gecikmeli olsun olmasın
+    odaktaki projelere (tolerans süresini aşan adımlarıyla), darboğazlar odaktaki kaynaklara daraltılır.
+    """
+    odak_projeler = (odak or {}).get("projeler") or []
+    odak_kaynaklar = (odak or {}).get("kaynaklar") or []
+    plan = plan_df.copy()
+    plan['Başlangıç'] = pd.to_datetime(plan['Başlangıç'])
+    plan['Bitiş'] = pd.to_datetime(plan['Bitiş'])
+    projeler = gorevler_df.groupby('projeadi').agg(
+        baslangic=('projebaslangictarihi', 'first'), termin=('projebitistarihi', 'first'),
+        oncelik=('proje_onceligi', 'first'))
+    bitis = plan.groupby('Proje Adı')['Bitiş'].max()
+    projeler = projeler.reindex(bitis.index).assign(bitis=bitis)
+    projeler['gecikme'] = (projeler['bitis'] - pd.to_datetime(projeler['termin'])).dt.days.clip(lower=0).fillna(0).astype(int)
+    gecikmeli = projeler[projeler['gecikme'] > 0].sort_values(['gecikme', 'oncelik'], ascending=[False, True])
+
+    onculler = {}
+    for row in gorevler_df[['projeadi', 'AdimAdi', 'OncekiAdimAdi']].itertuples(index=False):
+        onculler.setdefault(row.projeadi, {})[row.AdimAdi] = _onceki_adim_listesi(row.OncekiAdimAdi)
+    proje_planlari = dict(tuple(plan.groupby('Proje Adı')))
+
+    def proje_kaydi(proje, satir, yol):
+        return {
+            "proje": proje, "gecikme_gun": int(satir['gecikme']),
+            "oncelik": None if pd.isna(satir['oncelik']) else int(satir['oncelik']),
+            "termin": str(pd.to_datetime(satir['termin']).date()), "bitis": str(satir['bitis'].date()),
+            "kritik_yol": [f"{a['adim']} [{a['kaynak']}]" + (f" +{a['bekleme_gun']}g bekleme" if a['bekleme_gun'] else "")
+                           for a in yol[-OZET_KRITIK_YOL_UZUNLUGU:]],
+        }
+
+    bekleme = {}
+    ozet_projeler = []
+    for proje, satir in gecikmeli.iterrows():
+        yol = _kritik_yol(proje_planlari[proje], onculler.get(proje, {}), pd.to_datetime(satir['baslangic']))
+        for adim in yol:
+            bekleme[adim["kaynak"]] = bekleme.get(adim["kaynak"], 0) + adim["bekleme_gun"]
+        if not odak_projeler and len(ozet_projeler) < OZET_PROJE_SAYISI:
+            ozet_projeler.append(proje_kaydi(proje, satir, yol))
+    for proje in odak_projeler:
+        if proje not in proje_planlari:
+            continue
+        satir = projeler.loc[proje]
+        kayit = proje_kaydi(proje, satir, _kritik_yol(proje_planlari[proje], onculler.get(proje, {}),
+                                                      pd.to_datetime(satir['baslangic'])))
+        if 'Tolerans Aşımı' in plan.columns:
+            asan = proje_planlari[proje].sort_values('Tolerans Aşımı', ascending=False)
+            asan = asan[asan['Tolerans Aşımı'] > 0].head(OZET_ADIM_SAYISI)
+            kayit["tolerans_asan_adimlar"] = [f"{r['Adım Adı']} [{r['Kaynak']}] +{int(r['Tolerans Aşımı'])}g"
+                                              for _, r in asan.iterrows()]
+        ozet_projeler.append(kayit)
+
+    # Doluluk: plan süresince kaynağın iş günü / (kapasite x takvim günü)
+    kapasite = {}
+    if kaynaklar_df is not None and not kaynaklar_df.empty:
+        kapasite = dict(zip(kaynaklar_df['kaynakadi'], pd.to_numeric(kaynaklar_df['kapasite'], errors='coerce').fillna(1)))
+    ufuk = max((plan['Bitiş'].max() - plan['Başlangıç'].min()).days, 1) if not plan.empty else 1
+    is_gunu = (plan['Bitiş'] - plan['Başlangıç']).dt.days.groupby(plan['Kaynak']).sum()
+    darbogazlar = [
+        {"kaynak": k, "bekleme_gun": int(bekleme.get(k, 0)),
+         "doluluk": round(float(g) / (max(kapasite.get(k, 1), 1) * ufuk), 2)}
+        for k, g in is_gunu.items()
+    ]
+    if odak_kaynaklar:
+        darbogazlar = [d for d in darbogazlar if d["kaynak"] in odak_kaynaklar]
+    darbogazlar.sort(key=lambda d: (d["bekleme_gun"], d["doluluk"]), reverse=True)
+    return {
+        "toplam_gecikme_gun": int(projeler['gecikme'].sum()),
+        "proje_sayisi": len(projeler),
+        "gecikmeli_proje_sayisi": len(gecikmeli),
+        "tolerans_asan_adim_sayisi": int((plan['Tolerans Aşımı'] > 0).sum()) if 'Tolerans Aşımı' in plan.columns else 0,
+        "gecikmeli_projeler": ozet_projeler,
+        "darbogazlar": darbogazlar[:OZET_DARBOGAZ_SAYISI],
+        # Fark hesabı için tüm gecikmeli projeler; modele gönderilmez
+        "gecikmeler": {str(p): int(g) for p, g in gecikmeli['gecikme'].items()},
+    }
+
+
+def ozet_farki(onceki, yeni):
+    """İki özet arasındaki fark: toplam gecikme değişimi ve gecikmesi değişen projeler."""
+    if onceki is None:
+        return None
+    eski, simdi = onceki["gecikmeler"], yeni["gecikmeler"]
+    degisen = {p: {"once": eski.get(p, 0), "simdi": simdi.get(p, 0)}
+               for p in sorted(set(eski) | set(simdi)) if eski.get(p, 0) != simdi.get(p, 0)}
+    return {"toplam_gecikme_degisimi": yeni["toplam_gecikme_gun"] - onceki["toplam_gecikme_gun"],
+            "degisen_projeler": degisen}
+
+
+def ozet_metni(ozet, fark=None):
+    """Özeti (ve varsa farkı) modele gönderilecek kısa JSON metnine çevirir."""
+    icerik = {"plan": {k: v for k, v in ozet.items() if k != "gecikmeler"}}
+    if fark is not None:
+        icerik["onceki_denemeye_gore"] = fark
+    return json.dumps(icerik, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def plan_imzasi(plan_df):
+    """Plan tablosunun adım, tarih ve kaynaklarından türetilen kısa özet (plan sürümü)."""
+    if plan_df is None or plan_df.empty:
+        return "bos"
+    degerler = pd.util.hash_pandas_object(plan_df[['Adım ID', 'Başlangıç', 'Bitiş', 'Kaynak']], index=False).to_numpy()
+    return hashlib.sha256(degerler.tobytes()).hexdigest()[:16]
+
+
+class AracBellegi:
+    """
+    Araç sonuçlarını (araç adı, argümanlar, durum) özetine göre saklayan, boyut sınırlı bellek.
+    durum, sonucun bağlı olduğu plan/veri özetidir; değiştiğinde eski sonuçlar kullanılmaz.
+    """
+
+    def __init__(self, maks_kayit=ARAC_BELLEGI_MAKS_KAYIT):
+        self.maks_kayit = maks_kayit
+        self._sonuclar = OrderedDict()
+        self._kilit = threading.Lock()
+        self.cagri = 0
+        self.isabet = 0
+
+    @staticmethod
+    def anahtar(ad, argumanlar, durum=None):
+        metin = json.dumps([ad, argumanlar or {}, durum], sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(metin.encode("utf-8")).hexdigest()
+
+    def calistir(self, ad, argumanlar, fonksiyon, durum=None, saklanabilir=None):
+        """
+        Sonuç bellekteyse döndürür, değilse fonksiyon()'u çalıştırıp saklar.
+        saklanabilir(sonuc) False dönerse sonuç saklanmaz (ör. başarısız plan).
+        """
+        anahtar = self.anahtar(ad, argumanlar, durum)
+        with self._kilit:
+            self.cagri += 1
+            if anahtar in self._sonuclar:
+                self.isabet += 1
+                self._sonuclar.move_to_end(anahtar)
+                return self._sonuclar[anahtar]
+        sonuc = fonksiyon()
+        if saklanabilir is None or saklanabilir(sonuc):
+            self._sakla(anahtar, sonuc)
+        return sonuc
+
+    def kaydet(self, ad, argumanlar, sonuc, durum=None):
+        """Başka yoldan (ör. arka plan işinde) hesaplanan sonucu belleğe ekler."""
+        self._sakla(self.anahtar(ad, argumanlar, durum), sonuc)
+
+    def _sakla(self, anahtar, sonuc):
+        with self._kilit:
+            self._sonuclar[anahtar] = sonuc
+            self._sonuclar.move_to_end(anahtar)
+            while len(self._sonuclar) > self.maks_kayit:
+                self._sonuclar.popitem(last=False)
@@ -0,0 +1,219 @@
+"""
+Planlama tablolarını okuyan/yazan değiştirilebilir veri deposu.
+
+BigQueryVeriDeposu canlı veriyi, YerelVeriDeposu ise tablo başına bir Parquet
+dosyasını kullanır; yerel depo BigQuery'ye erişim olmadığında çevrimdışı yedek
+olarak da çalışır. ArtimliTablo, tabloyu bellekte tutup her yenilemede yalnızca
+DEGISIM_SUTUNU son su işaretinden (watermark) yeni olan satırları çeker.
+"""
+import logging
+import os
+import threading
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Satırı yazan her işlem bu sütunu günceller; artımlı okumalar buna göre yapılır
+DEGISIM_SUTUNU = "guncellenme_tarihi"
+
+# Yazılırken değişim damgası basılan tablolar
+ARTIMLI_TABLOLAR = {"gorevler"}
+
+# Silinen satırları yakalamak için artımlı okumada yalnızca anahtar sütunu okunur;
+# bu sayıda yenilemede bir tablo yine de baştan okunur
+TAM_YENILEME_ARALIGI = 50
+
+# Değişim damgası yazan istemcide, yükleme işi tamamlanmadan basılır; damgası su işaretinden
+# eski olan bir yükleme sonradan görünür olabilir, istemci saatleri de kayabilir. Artımlı
+# okumalar su işaretinden bu kadar öncesini yeniden okur, satırlar anahtarla tekilleştirilir.
+SU_ISARETI_PAYI = pd.Timedelta(minutes=15)
+
+
+class VeriDeposu:
+    """Depo arayüzü. Tablo adları veri kümesi öneki olmadan verilir (ör. 'gorevler')."""
+
+    def oku(self, tablo, sutunlar=None, sonrasi=None, degisim_sutunu=DEGISIM_SUTUNU):
+        """sonrasi verilirse yalnızca degisim_sutunu bu değerden büyük olan satırları döndürür."""
+        raise NotImplementedError
+
+    def _yaz(self, tablo, df):
+        raise NotImplementedError
+
+    def _ekle(self, tablo, df):
+        raise NotImplementedError
+
+    def bosalt(self, tablo):
+        raise NotImplementedError
+
+    def sil(self, tablo, sutun, degerler):
+        """sutun değeri degerler içinde olan satırları siler."""
+        raise NotImplementedError
+
+    @staticmethod
+    def _damgala(tablo, df):
+        if tablo in ARTIMLI_TABLOLAR:
+            df = df.assign(**{DEGISIM_SUTUNU: pd.Timestamp.now(tz="UTC")})
+        return df
+
+    def yaz(self, tablo, df):
+        """Tablonun içeriğini df ile değiştirir."""
+        self._yaz(tablo, self._damgala(tablo, df))
+
+    def ekle(self, tablo, df):
+        """df satırlarını tablonun sonuna ekler."""
+        self._ekle(tablo, self._damgala(tablo, df))
+
+
+class BigQueryVeriDeposu(VeriDeposu):
+    def __init__(self, client, project_id, dataset):
+        self.client = client
+        self.project_id = project_id
+        self.dataset = dataset
+
+    def _tam_ad(self, tablo):
+        return f"{self.project_id}.{self.dataset}.{tablo}"
+
+    def oku(self, tablo, sutunlar=None, sonrasi=None, degisim_sutunu=DEGISIM_SUTUNU):
+        from google.cloud import bigquery
+
+        secim = ", ".join(f"`{s}`" for s in sutunlar) if sutunlar else "*"
+        sorgu = f"SELECT {secim} FROM `{self._tam_ad(tablo)}`"
+        parametreler = []
+        if sonrasi is not None:
+            sorgu += f" WHERE `{degisim_sutunu}` > @sonrasi"
+            parametreler.append(bigquery.ScalarQueryParameter("sonrasi", "TIMESTAMP", pd.Timestamp(sonrasi).to_pydatetime()))
+        job_config = bigquery.QueryJobConfig(query_parameters=parametreler)
+        return self.client.query(sorgu, job_config=job_config).to_dataframe()
+
+    def _yukle(self, tablo, df, write_disposition):
+        from google.cloud import bigquery
+
+        job_config = bigquery.LoadJobConfig(write_disposition=write_disposition)
+        self.client.load_table_from_dataframe(df, self._tam_ad(tablo), job_config=job_config).result()
+
+    def _yaz(self, tablo, df):
+        self._yukle(tablo, df, "WRITE_TRUNCATE")
+
+    def _ekle(self, tablo, df):
+        self._yukle(tablo, df, "WRITE_APPEND")
+
+    def bosalt(self, tablo):
+        self.client.query(f"DELETE FROM `{self._tam_ad(tablo)}` WHERE true").result()
+
+    def sil(self, tablo, sutun, degerler):
+        from google.cloud import bigquery
+
+        sorgu = f"DELETE FROM `{self._tam_ad(tablo)}` WHERE `{sutun}` IN UNNEST(@degerler)"
+        job_config = bigquery.QueryJobConfig(
+            query_parameters=[bigquery.ArrayQueryParameter("degerler", "STRING", [str(d) for d in degerler])])
+        self.client.query(sorgu, job_config=job_config).result()
+
+
+class YerelVeriDeposu(VeriDeposu):
+    """Her tabloyu dizin altında <tablo>.parquet dosyası olarak saklar."""
+
+    def __init__(self, dizin):
+        self.dizin = dizin
+        # Okuma-değiştirme-yazma adımları tek kilit altında yapılır
+        self._kilit = threading.RLock()
+
+    def _yol(self, tablo):
+        return os.path.join(self.dizin, f"{tablo}.parquet")
+
+    def oku(self, tablo, sutunlar=None, sonrasi=None, degisim_sutunu=DEGISIM_SUTUNU):
+        yol = self._yol(tablo)
+        if not os.path.exists(yol):
+            return pd.DataFrame(columns=sutunlar or [])
+        filtre = [(degisim_sutunu, ">", pd.Timestamp(sonrasi))] if sonrasi is not None else None
+        return pd.read_parquet(yol, columns=sutunlar, filters=filtre)
+
+    def _dosyaya_yaz(self, tablo, df):
+        os.makedirs(self.dizin, exist_ok=True)
+        yol = self._yol(tablo)
+        gecici = f"{yol}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_parquet(gecici, index=False)
+        os.replace(gecici, yol)
+
+    def _yaz(self, tablo, df):
+        with self._kilit:
+            self._dosyaya_yaz(tablo, df)
+
+    def _ekle(self, tablo, df):
+        with self._kilit:
+            mevcut = self.oku(tablo)
+            self._dosyaya_yaz(tablo, pd.concat([mevcut, df], ignore_index=True) if not mevcut.empty else df)
+
+    def bosalt(self, tablo):
+        with self._kilit:
+            try:
+                os.remove(self._yol(tablo))
+            except FileNotFoundError:
+                pass
+
+    def sil(self, tablo, sutun, degerler):
+        with self._kilit:
+            mevcut = self.oku(tablo)
+            if not mevcut.empty:
+                self._dosyaya_yaz(tablo, mevcut[~mevcut[sutun].astype(str).isin({str(d) for d in degerler})])
+
+
+def depoyu_kopyala(kaynak, hedef, tablolar):
+    """Tabloları bir depodan diğerine kopyalar (ör. BigQuery'den yerel çevrimdışı kopyaya)."""
+    for tablo in tablolar:
+        try:
+            hedef._yaz(tablo, kaynak.oku(tablo))
+        except Exception:
+            logger.exception("Tablo kopyalanamadı: %s", tablo)
+
+
+class ArtimliTablo:
+    """
+    Bir tablonun bellekteki kopyası. yenile() ilk çağrıda tabloyu tam okur; sonraki
+    çağrılarda son su işaretinden sonra değişen satırları ve silmeleri yakalamak için
+    anahtar sütununu okuyup kopyayı günceller. Geç görünen yüklemeler için su işaretinden
+    SU_ISARETI_PAYI öncesi de okunur. Tabloda DEGISIM_SUTUNU yoksa her yenileme tam okuma olur.
+    """
+
+    def __init__(self, depo, tablo, anahtar, sutunlar=None, degisim_sutunu=DEGISIM_SUTUNU, pay=SU_ISARETI_PAYI):
+        self.depo = depo
+        self.tablo = tablo
+        self.anahtar = anahtar
+        self.sutunlar = sutunlar
+        self.degisim_sutunu = degisim_sutunu
+        self.pay = pay
+        self._df = None
+        self._su_isareti = None
+        self._yenileme_sayisi = 0
+        self._kilit = threading.Lock()
+
+    def _tam_oku(self):
+        df = self.depo.oku(self.tablo, self.sutunlar)
+        self._su_isareti = df[self.degisim_sutunu].max() if self.degisim_sutunu in df.columns and not df.empty else None
+        return df
+
+    def _degisiklikleri_uygula(self):
+        degisen = self.depo.oku(self.tablo, self.sutunlar, sonrasi=self._su_isareti - self.pay,
+                                degisim_sutunu=self.degisim_sutunu)
+        mevcut = self.depo.oku(self.tablo, [self.anahtar])[self.anahtar]
+        # Pay içinde yeniden okunan satırlar kopyadakilerin yerine geçer; anahtar başına en yenisi kalır
+        degisen = degisen.sort_values(self.degisim_sutunu, kind='mergesort').drop_duplicates(self.anahtar, keep='last')
+        df = self._df[~self._df[self.anahtar].isin(degisen[self.anahtar])]
+        if not degisen.empty:
+            df = pd.concat([df, degisen], ignore_index=True)
+            self._su_isareti = max(self._su_isareti, degisen[self.degisim_sutunu].max())
+        return df[df[self.anahtar].isin(mevcut)].reset_index(drop=True)
+
+    def yenile(self):
+        with self._kilit:
+            self._yenileme_sayisi += 1
+            if self._df is None or self._su_isareti is None or self._yenileme_sayisi % TAM_YENILEME_ARALIGI == 0:
+                self._df = self._tam_oku()
+            else:
+                self._df = self._degisiklikleri_uygula()
+            return self._df.copy()
+
+    def gecersiz_kil(self):
+        """Sonraki yenilemenin tabloyu baştan okumasını sağlar."""
+        with self._kilit:
+            self._df = None
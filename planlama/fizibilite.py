@@ -0,0 +1,214 @@
+"""
+Satış fizibilitesi için toplu "ya olursa" değerlendirmesi.
+
+Mevcut plan sabit arka plan kabul edilir: kaynak başına takvim kapasitesinden plandaki
+işler düşülerek bir kez artık kapasite takvimi çıkarılır. Her aday sipariş önce ucuz
+bir alt sınır (kritik yol ve kaynak yükü) ve artık kapasiteye açgözlü yerleştirme ile
+elenir; yalnızca termini tutturma ihtimali olan adaylar, arka planı artık kapasite olarak
+gören küçük CP-SAT modelleriyle süreç havuzunda paralel çözülür.
+"""
+import logging
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from ortools.sat.python import cp_model
+
+from planlama.optimizasyon import _surec_havuzu
+from planlama.sezgisel import _onceki_adim_listesi
+from planlama.takvim import KapasiteTakvimi, kapasite_takvimleri_olustur, kumulatif_kapasite_ekle
+
+logger = logging.getLogger(__name__)
+
+FIZIBILITE_ZAMAN_LIMITI_SN = 10
+# Artık kapasitenin hesaplandığı ufkun plan sonrasına taşan kısmı (gün)
+FIZIBILITE_UFUK_PAYI_GUN = 365
+
+
+def artik_kapasite_takvimleri(plan_df, kaynaklar_df, kaynak_kisitlari, plan_baslangic, ufuk):
+    """Takvim kapasitesinden mevcut planın günlük kullanımını düşerek kaynak başına artık kapasite takvimi döndürür."""
+    takvimler = kapasite_takvimleri_olustur(kaynaklar_df, kaynak_kisitlari, plan_baslangic)
+    gunler = np.arange(ufuk)
+    kullanim = {k: np.zeros(ufuk, dtype=np.int64) for k in takvimler}
+    if plan_df is not None and not plan_df.empty:
+        bas = (pd.to_datetime(plan_df['Başlangıç']) - plan_baslangic).dt.days.clip(0, ufuk).to_numpy()
+        bit = (pd.to_datetime(plan_df['Bitiş']) - plan_baslangic).dt.days.clip(0, ufuk).to_numpy()
+        for kaynak, b, s in zip(plan_df['Kaynak'], bas, bit):
+            if kaynak in kullanim and b < s:
+                # Fark dizisiyle aralık ekleme; kümülatif toplam aşağıda alınır
+                kullanim[kaynak][b] += 1
+                if s < ufuk:
+                    kullanim[kaynak][s] -= 1
+    return {
+        k: KapasiteTakvimi.gunlukten(np.maximum(t.kapasite(gunler) - np.cumsum(kullanim[k]), 0), t.temel)
+        for k, t in takvimler.items()
+    }
+
+
+def _aday_adimlari(aday_df, plan_baslangic):
+    # Adımları öncül sırasına (topolojik) dizer; (adimid, kaynak, süre, öncül adimid'leri) döndürür
+    ad_to_id = {}
+    for row in aday_df[['adimid', 'AdimAdi']].itertuples(index=False):
+        ad_to_id.setdefault(row.AdimAdi, str(row.adimid))
+    adimlar = {}
+    for row in aday_df[['adimid', 'kaynakadi', 'suregun', 'OncekiAdimAdi']].itertuples(index=False):
+        onculler = [ad_to_id[o] for o in _onceki_adim_listesi(row.OncekiAdimAdi) if o in ad_to_id]
+        sure = pd.to_numeric(row.suregun, errors='coerce')
+        adimlar[str(row.adimid)] = (row.kaynakadi, max(int(0 if pd.isna(sure) else sure), 1), onculler)
+    sirali, ziyaret = [], set()
+
+    def gez(a, yol):
+        if a in ziyaret:
+            return
+        if a in yol:
+            raise ValueError(f"Öncül döngüsü: {a}")
+        yol.add(a)
+        for o in adimlar[a][2]:
+            gez(o, yol)
+        ziyaret.add(a)
+        sirali.append(a)
+
+    for a in adimlar:
+        gez(a, set())
+    en_erken = (pd.to_datetime(aday_df['projebaslangictarihi']).min() - plan_baslangic).days
+    en_erken = 0 if pd.isna(en_erken) else max(int(en_erken), 0)
+    return [(a, *adimlar[a]) for a in sirali], en_erken
+
+
+def alt_sinir(adimlar, en_erken, artik, ufuk):
+    """Kritik yol ve kaynak yükünden teslim gününün alt sınırı."""
+    bitis = {}
+    for adimid, _, sure, onculler in adimlar:
+        bitis[adimid] = max([en_erken] + [bitis[o] for o in onculler]) + sure
+    sinir = max(bitis.values(), default=en_erken)
+    yuk = {}
+    for _, kaynak, sure, _ in adimlar:
+        yuk[kaynak] = yuk.get(kaynak, 0) + sure
+    for kaynak, is_gunu in yuk.items():
+        takvim = artik.get(kaynak)
+        if takvim is None:
+            continue
+        # Artık kapasitenin kümülatif toplamının iş yükünü karşıladığı ilk gün
+        gunler = np.arange(en_erken, ufuk)
+        idx = np.searchsorted(np.cumsum(takvim.kapasite(gunler)), is_gunu)
+        sinir = max(sinir, int(gunler[idx]) + 1 if idx < len(gunler) else ufuk)
+    return sinir
+
+
+def acgozlu_yerlestir(adimlar, en_erken, artik, ufuk):
+    """
+    Adımları öncül sırasıyla artık kapasitenin izin verdiği en erken güne yerleştirir.
+    (teslim_gunu, adimid -> başlangıç günü) döndürür; yerleşemeyen varsa teslim_gunu None olur.
+    """
+    gunler = np.arange(ufuk)
+    bos = {k: t.kapasite(gunler).copy() for k, t in artik.items()}
+    baslangiclar, bitis = {}, {}
+    for adimid, kaynak, sure, onculler in adimlar:
+        hazir = max([en_erken] + [bitis[o] for o in onculler])
+        if kaynak not in bos:
+            baslangiclar[adimid], bitis[adimid] = hazir, hazir + sure
+            continue
+        uygun = (bos[kaynak] > 0).astype(np.int64)
+        # Ardışık `sure` günün hepsi uygunsa pencere toplamı sure'ye eşittir
+        pencere = np.convolve(uygun, np.ones(sure, dtype=np.int64), mode="valid")
+        adaylar = np.flatnonzero(pencere[hazir:] == sure) if hazir < len(pencere) else []
+        if len(adaylar) == 0:
+            return None, baslangiclar
+        bas = hazir + int(adaylar[0])
+        bos[kaynak][bas:bas + sure] -= 1
+        baslangiclar[adimid], bitis[adimid] = bas, bas + sure
+    return max(bitis.values(), default=en_erken), baslangiclar
+
+
+def _adayi_coz(adimlar, en_erken, artik, ufuk, ipucu, gruplar, isci_sayisi):
+    # Süreç havuzunda çalışır: yalnızca adayın adımları değişkendir, arka plan artık kapasitededir
+    model = cp_model.CpModel()
+    bas_vars, bit_vars, kaynak_araliklari = {}, {}, {}
+    for adimid, kaynak, sure, onculler in adimlar:
+        bas = model.NewIntVar(en_erken, ufuk - sure, f"b_{adimid}")
+        bit = model.NewIntVar(en_erken + sure, ufuk, f"e_{adimid}")
+        aralik = model.NewIntervalVar(bas, sure, bit, f"i_{adimid}")
+        bas_vars[adimid], bit_vars[adimid] = bas, bit
+        kaynak_araliklari.setdefault(kaynak, []).append(aralik)
+        for o in onculler:
+            model.Add(bas >= bit_vars[o])
+        if adimid in ipucu:
+            model.AddHint(bas, ipucu[adimid])
+    for kaynak, araliklar in kaynak_araliklari.items():
+        if kaynak in artik:
+            kumulatif_kapasite_ekle(model, artik[kaynak], araliklar, [1] * len(araliklar), ufuk, ad=str(kaynak))
+    for grup in gruplar:
+        uyeler = [bas_vars[str(a)] for a in grup if str(a) in bas_vars]
+        for v in uyeler[1:]:
+            model.Add(v == uyeler[0])
+    teslim = model.NewIntVar(en_erken, ufuk, "teslim")
+    model.AddMaxEquality(teslim, list(bit_vars.values()))
+    model.Minimize(teslim)
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = FIZIBILITE_ZAMAN_LIMITI_SN
+    solver.parameters.num_workers = isci_sayisi
+    status = solver.Solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None, solver.StatusName(status)
+    return int(solver.Value(teslim)), solver.StatusName(status)
+
+
+def toplu_fizibilite(adaylar, plan_df, kaynaklar_df, kaynak_kisitlari=None, manual_start_groups=None,
+                     plan_baslangic=None):
+    """
+    Aday siparişleri mevcut planı bozmadan değerlendirir.
+
+    adaylar: aday adı -> gorevler şemasında adım DataFrame'i.
+    Aday başına en erken teslim tarihini içeren, uygunluk ve gecikmeye göre sıralı tablo döndürür.
+    """
+    plan_baslangic = pd.Timestamp(plan_baslangic or date.today())
+    plan_sonu = 0
+    if plan_df is not None and not plan_df.empty:
+        plan_sonu = max((pd.to_datetime(plan_df['Bitiş']).max() - plan_baslangic).days, 0)
+    toplam_sure = sum(pd.to_numeric(df['suregun'], errors='coerce').fillna(0).sum() for df in adaylar.values())
+    ufuk = int(plan_sonu + toplam_sure + FIZIBILITE_UFUK_PAYI_GUN)
+    artik = artik_kapasite_takvimleri(plan_df, kaynaklar_df, kaynak_kisitlari, plan_baslangic, ufuk)
+
+    satirlar, cozulecek = [], []
+    for ad, aday_df in adaylar.items():
+        termin = pd.to_datetime(aday_df['projebitistarihi']).max()
+        termin_gun = None if pd.isna(termin) else (termin - plan_baslangic).days
+        try:
+            adimlar, en_erken = _aday_adimlari(aday_df, plan_baslangic)
+        except ValueError as e:
+            satirlar.append({"Aday": ad, "Termin": termin, "Yöntem": f"Hata: {e}"})
+            continue
+        sinir = alt_sinir(adimlar, en_erken, artik, ufuk)
+        teslim, ipucu = acgozlu_yerlestir(adimlar, en_erken, artik, ufuk)
+        satir = {"Aday": ad, "Termin": termin, "Alt Sınır": sinir, "teslim_gun": teslim, "Yöntem": "Sezgisel"}
+        satirlar.append(satir)
+        # Alt sınır termini aşıyorsa ya da sezgisel zaten alt sınıra ulaştıysa tam çözüme gerek yok
+        umut_var = termin_gun is None or sinir <= termin_gun
+        if umut_var and (teslim is None or teslim > sinir):
+            adimlar_ids = {a[0] for a in adimlar}
+            gruplar = [g for g in manual_start_groups or [] if any(str(a) in adimlar_ids for a in g)]
+            cozulecek.append((satir, (adimlar, en_erken, artik, ufuk, ipucu, gruplar)))
+
+    if cozulecek:
+        havuz = _surec_havuzu()
+        isci_sayisi = max(1, (os.cpu_count() or 1) // len(cozulecek))
+        isler = [(satir, havuz.submit(_adayi_coz, *girdi, isci_sayisi)) for satir, girdi in cozulecek]
+        for satir, is_ in isler:
+            try:
+                teslim, durum = is_.result()
+            except Exception:
+                logger.exception("Aday çözülemedi: %s", satir["Aday"])
+                continue
+            if teslim is not None and (satir["teslim_gun"] is None or teslim <= satir["teslim_gun"]):
+                satir["teslim_gun"], satir["Yöntem"] = teslim, f"CP-SAT ({durum})"
+
+    tablo = pd.DataFrame(satirlar)
+    if tablo.empty:
+        return tablo
+    tablo["En Erken Teslim"] = plan_baslangic + pd.to_timedelta(tablo["teslim_gun"], unit="D")
+    tablo["Alt Sınır"] = plan_baslangic + pd.to_timedelta(tablo["Alt Sınır"], unit="D")
+    tablo["Gecikme (Gün)"] = (tablo["En Erken Teslim"] - tablo["Termin"]).dt.days.clip(lower=0)
+    tablo["Uygun"] = tablo["En Erken Teslim"].notna() & (tablo["Gecikme (Gün)"].fillna(0) == 0)
+    tablo = tablo.sort_values(["Uygun", "Gecikme (Gün)", "En Erken Teslim"], ascending=[False, True, True])
+    return tablo[["Aday", "Termin", "En Erken Teslim", "Gecikme (Gün)", "Uygun", "Alt Sınır", "Yöntem"]].reset_index(drop=True)
@@ -0,0 +1,101 @@
+"""
+Büyük planlar için ayrıntı seviyeli (level-of-detail) Gantt çizimi.
+
+Plan önce görüntülenen tarih penceresine kırpılır. Penceredeki adım sayısına göre
+adım, proje özeti (proje başına tek çubuk) ya da kaynak özeti (kaynağın dolu olduğu
+birleşik aralıklar) çizilir. Çok sayıda çubuk SVG yerine WebGL (Scattergl) çizgi
+parçalarıyla çizilir.
+"""
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Penceredeki adım sayısı bunu aşarsa adımlar proje çubuklarında birleştirilir
+GANTT_ADIM_SINIRI = 2000
+# Penceredeki proje sayısı bunu aşarsa kaynak özeti çizilir
+GANTT_PROJE_SINIRI = 300
+# Bu sayıdan fazla çubuk WebGL ile çizilir
+GANTT_WEBGL_SINIRI = 500
+
+
+def pencereye_kirp(plan_df, bas=None, bit=None):
+    """Pencereyle kesişen adımları döndürür; çubuklar pencere sınırlarına kırpılır."""
+    df = plan_df.assign(**{'Başlangıç': pd.to_datetime(plan_df['Başlangıç']), 'Bitiş': pd.to_datetime(plan_df['Bitiş'])})
+    if bas is not None:
+        bas = pd.Timestamp(bas)
+        df = df[df['Bitiş'] > bas]
+        df = df.assign(**{'Başlangıç': df['Başlangıç'].clip(lower=bas)})
+    if bit is not None:
+        bit = pd.Timestamp(bit)
+        df = df[df['Başlangıç'] < bit]
+        df = df.assign(**{'Bitiş': df['Bitiş'].clip(upper=bit)})
+    return df
+
+
+def proje_ozeti(df):
+    """Proje başına ilk başlangıçtan son bitişe tek çubuk."""
+    ozet = df.groupby('Proje Adı', sort=False).agg(
+        **{'Başlangıç': ('Başlangıç', 'min'), 'Bitiş': ('Bitiş', 'max'), 'Adım Sayısı': ('Adım ID', 'size')})
+    return ozet.reset_index()
+
+
+def kaynak_ozeti(df):
+    """Kaynak başına, en az bir işin sürdüğü birleşik aralıklar."""
+    df = df.sort_values(['Kaynak', 'Başlangıç'])
+    # Önceki işlerin en geç bitişinden sonra başlayan iş yeni bir aralık açar
+    onceki_bitis = df.groupby('Kaynak', sort=False)['Bitiş'].transform(lambda s: s.cummax().shift())
+    yeni = onceki_bitis.isna() | (df['Başlangıç'] > onceki_bitis)
+    aralik_no = yeni.cumsum()
+    ozet = df.groupby(aralik_no).agg(
+        **{'Kaynak': ('Kaynak', 'first'), 'Başlangıç': ('Başlangıç', 'min'), 'Bitiş': ('Bitiş', 'max'),
+           'Adım Sayısı': ('Adım ID', 'size')})
+    return ozet.reset_index(drop=True)
+
+
+def _webgl_cubuklar(df, y, renk, baslik):
+    # Her çubuk None ile ayrılmış iki noktalı bir çizgi parçasıdır; renk başına tek iz
+    fig = go.Figure()
+    satir_sayisi = max(df[y].nunique(), 1)
+    kalinlik = max(2, min(14, 600 // satir_sayisi))
+    renkler = px.colors.qualitative.Plotly
+    for i, (ad, grup) in enumerate(df.groupby(renk, sort=False)):
+        n = len(grup)
+        x = np.empty(3 * n, dtype=object)
+        x[0::3], x[1::3], x[2::3] = grup['Başlangıç'].to_numpy(), grup['Bitiş'].to_numpy(), None
+        yy = np.empty(3 * n, dtype=object)
+        yy[0::3] = yy[1::3] = grup[y].astype(str).to_numpy()
+        yy[2::3] = None
+        fig.add_trace(go.Scattergl(
+            x=x, y=yy, mode='lines', name=str(ad), line=dict(width=kalinlik, color=renkler[i % len(renkler)]),
+            hoverinfo='x+y+name'))
+    fig.update_yaxes(type='category')
+    fig.update_layout(title=baslik)
+    return fig
+
+
+def gantt_figuru(plan_df, bas=None, bit=None):
+    """Plan için penceredeki adım sayısına uygun ayrıntıda Gantt figürü üretir."""
+    df = pencereye_kirp(plan_df, bas, bit)
+    if df.empty:
+        return px.timeline(title="Seçilen aralıkta iş yok")
+    if len(df) <= GANTT_ADIM_SINIRI:
+        cizim, y, renk, baslik = df, 'Proje Adı', 'Kaynak', None
+    elif df['Proje Adı'].nunique() <= GANTT_PROJE_SINIRI:
+        # Yüzlerce projede renk başına iz oluşmaması için proje çubukları tek renktir
+        cizim, y, renk, baslik = proje_ozeti(df).assign(Seviye='Proje'), 'Proje Adı', 'Seviye', f"Proje özeti ({len(df)} adım)"
+    else:
+        cizim, y, renk, baslik = kaynak_ozeti(df), 'Kaynak', 'Kaynak', f"Kaynak doluluğu ({len(df)} adım)"
+
+    if len(cizim) > GANTT_WEBGL_SINIRI:
+        fig = _webgl_cubuklar(cizim, y, renk, baslik)
+    else:
+        fig = px.timeline(cizim, x_start='Başlangıç', x_end='Bitiş', y=y, color=renk, title=baslik,
+                          hover_data=[c for c in ('Adım Adı', 'Tezgah', 'Tolerans Aşımı', 'Adım Sayısı')
+                                      if c in cizim.columns])
+    if renk != 'Kaynak' or y == 'Kaynak':
+        fig.update_layout(showlegend=False)
+    if bas is not None or bit is not None:
+        fig.update_xaxes(range=[bas if bas is not None else df['Başlangıç'].min(),
+                                bit if bit is not None else df['Bitiş'].max()])
+    return fig
@@ -0,0 +1,44 @@
+"""
+Kayan ufuk: yeniden planlamada çözülecek adımların zamana göre ayrılması.
+
+Önceki planda bugünden önce başlamış adımlar (sahada devam eden ya da bitmiş) yerlerinde ve
+tezgahlarında dondurulur. Kalan adımlar öncelik listesiyle taslak bir plana yerleştirilir;
+taslakta yakın ufuk içinde başlayanlar süren işlerle birlikte CP-SAT ile tam ayrıntıda
+çözülür. Daha sonraki işler modele girmez, yakın ufkun çözümü sabitken öncelik listesiyle
+yeniden yerleştirilir. Böylece model boyutu iş yüküyle değil yakın ufkun doluluğuyla büyür.
+"""
+import pandas as pd
+
+# Tam ayrıntıyla çözülen yakın ufuk (hafta)
+KAYAN_UFUK_HAFTA = 4
+
+
+def plan_gunleri(plan_df, plan_baslangic):
+    """plan_df'teki adımların başlangıç günleri (adimid -> gün); geçmişteki günler negatiftir."""
+    if plan_df is None or plan_df.empty:
+        return {}
+    plan = plan_df.dropna(subset=['Adım ID', 'Başlangıç']).drop_duplicates('Adım ID')
+    gunler = (pd.to_datetime(plan['Başlangıç']) - plan_baslangic).dt.days
+    return dict(zip(plan['Adım ID'].astype(str), gunler.astype(int)))
+
+
+def donmus_adimlar(onceki_plan_df, plan_baslangic, adimlar=None):
+    """Önceki planda plan başlangıcından önce başlamış adımlar; adimlar verilirse bu kümeyle sınırlanır."""
+    donmus = {a: g for a, g in plan_gunleri(onceki_plan_df, plan_baslangic).items() if g < 0}
+    if adimlar is not None:
+        donmus = {a: g for a, g in donmus.items() if a in adimlar}
+    return donmus
+
+
+def yakin_ufuk_adimlari(taslak_gunleri, donmus, hafta=KAYAN_UFUK_HAFTA):
+    """Taslak planda ilk `hafta` hafta içinde başlayan, dondurulmamış adımlar."""
+    sinir = 7 * hafta
+    return {a for a, g in taslak_gunleri.items() if a not in donmus and g < sinir}
+
+
+def plan_tezgahlari(plan_df, adimlar):
+    """plan_df'te verilen adımlara atanmış tezgahlar (adimid -> tezgah)."""
+    if plan_df is None or plan_df.empty or 'Tezgah' not in plan_df.columns:
+        return {}
+    plan = plan_df.dropna(subset=['Adım ID', 'Tezgah'])
+    return {a: t for a, t in zip(plan['Adım ID'].astype(str), plan['Tezgah']) if a in adimlar}
@@ -0,0 +1,235 @@
+"""
+Kural tabloları (kaynak kısıtları, sabit başlangıçlar, manuel gruplar) için gecikmeli delta yazımı.
+
+KuralDeposu tablonun güncel halini bellekte tutar. Her düzenlemede istenen kural
+listesi mevcut kayıtlarla karşılaştırılır: değişmeyen kurallar kimliklerini korur,
+yalnızca eklenen ve silinen kurallar tampona alınır. Kısa aralıklarla gelen
+düzenlemeler birleştirilip tek bir silme ve tek bir ekleme çağrısıyla yazılır.
+Yazılamayan tampon üstel artan aralıklarla yeniden denenir; son hata yazma_hatasi()
+ve yazma_istatistikleri ile arayüze taşınır.
+"""
+import atexit
+import logging
+import numbers
+import threading
+import time
+import uuid
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Son düzenlemeden bu kadar saniye sonra tampon depoya yazılır
+KURAL_YAZMA_GECIKMESI_SN = 2.0
+# Başarısız yazımlar arasındaki bekleme her denemede ikiye katlanır, bu değeri aşmaz
+KURAL_YAZMA_MAKS_BEKLEME_SN = 300.0
+
+
+def _imza_degeri(deger):
+    # Depodan gelen ve arayüzden gelen değerlerin aynı imzayı üretmesi için normalize edilir
+    if deger is None or (isinstance(deger, float) and pd.isna(deger)):
+        return None
+    if isinstance(deger, numbers.Real) and float(deger).is_integer():
+        return int(deger)
+    if hasattr(deger, "date") and callable(deger.date):
+        return str(deger.date())
+    return str(deger)
+
+
+class KuralDeposu:
+    """
+    Tek bir kural tablosunun gecikmeli (write-behind) delta yazıcısı.
+
+    Bir kural, tabloda aynı anahtar değerini paylaşan satırlardan oluşur
+    (kaynak kısıtları için tek satır, manuel gruplar için grubun her adımı bir satır).
+    """
+
+    def __init__(self, depo, tablo, anahtar, imza_disi=(), gecikme_sn=KURAL_YAZMA_GECIKMESI_SN):
+        self.depo = depo
+        self.tablo = tablo
+        self.anahtar = anahtar
+        self.imza_disi = set(imza_disi) | {anahtar}
+        self.gecikme_sn = gecikme_sn
+        self._kurallar = None  # anahtar -> satır sözlükleri listesi
+        self._kalici = set()  # depoda bulunan anahtarlar
+        self._eklenecek = {}
+        self._silinecek = set()
+        self._zamanlayici = None
+        self._kilit = threading.RLock()
+        self._ardisik_hata = 0
+        self._son_hata = None
+        self.istatistik = {
+            "duzenleme": 0, "yazma_cagrisi": 0, "eklenen_satir": 0, "silinen_kural": 0, "yazma_sn": 0.0,
+            "basarisiz_yazma": 0,
+            # Her düzenlemede tüm tablo WRITE_TRUNCATE ile yazılsaydı yüklenecek satır sayısı
+            "tam_yazma_satir": 0,
+        }
+        atexit.register(self.tamponu_yaz)
+
+    def _imza(self, satirlar):
+        return tuple(sorted(
+            tuple(sorted((k, _imza_degeri(v)) for k, v in satir.items() if k not in self.imza_disi))
+            for satir in satirlar))
+
+    def _yukle(self):
+        if self._kurallar is not None:
+            return
+        df = self.depo.oku(self.tablo)
+        self._kurallar = {}
+        if not df.empty:
+            for anahtar, grup in df.groupby(self.anahtar, sort=False):
+                self._kurallar[str(anahtar)] = grup.to_dict("records")
+        self._kalici = set(self._kurallar)
+
+    def yeniden_oku(self):
+        """
+        Yazılmayı bekleyen düzenleme yoksa tabloyu depodan yeniden okur; başka süreçlerin
+        yazımları böylece görünür. Bekleyen düzenleme varsa bellekteki hal korunur.
+        """
+        with self._kilit:
+            if self._eklenecek or self._silinecek:
+                return False
+            onceki = self._kurallar, self._kalici
+            self._kurallar = None
+            try:
+                self._yukle()
+            except Exception:
+                # Okunamayan tablo bellekteki haliyle kalır
+                self._kurallar, self._kalici = onceki
+                raise
+            return True
+
+    def kayitlar(self):
+        """Tablonun (yazılmamış düzenlemeler dahil) güncel halini döndürür."""
+        with self._kilit:
+            self._yukle()
+            satirlar = [satir for grup in self._kurallar.values() for satir in grup]
+        return pd.DataFrame(satirlar)
+
+    def esitle(self, kurallar):
+        """
+        Tabloyu verilen kural listesine eşitler. kurallar, her biri satır sözlüklerinden
+        oluşan listelerdir; anahtarı olmayan kurallar içeriği aynı olan mevcut bir kuralla
+        eşleşirse onun anahtarını alır, eşleşmezse yeni anahtar üretilir.
+        """
+        with self._kilit:
+            self._yukle()
+            imzadan_anahtar = {}
+            for anahtar, satirlar in self._kurallar.items():
+                imzadan_anahtar.setdefault(self._imza(satirlar), []).append(anahtar)
+
+            yeni = {}
+            for satirlar in kurallar:
+                satirlar = [dict(s) for s in satirlar]
+                if not satirlar:
+                    continue
+                anahtar = satirlar[0].get(self.anahtar)
+                anahtar = None if anahtar is None or (isinstance(anahtar, float) and pd.isna(anahtar)) else str(anahtar)
+                aday = imzadan_anahtar.get(self._imza(satirlar), [])
+                if anahtar is None or anahtar in yeni:
+                    anahtar = next((a for a in aday if a not in yeni), None) or str(uuid.uuid4())
+                elif anahtar in self._kurallar and anahtar not in aday:
+                    # İçeriği değişen kural yeni kimlikle yazılır; eskisi silinir
+                    anahtar = str(uuid.uuid4())
+                if anahtar in self._kurallar:
+                    yeni[anahtar] = self._kurallar[anahtar]
+                else:
+                    yeni[anahtar] = [{**s, self.anahtar: anahtar} for s in satirlar]
+
+            silinen = set(self._kurallar) - set(yeni)
+            eklenen = set(yeni) - set(self._kurallar)
+            if not silinen and not eklenen:
+                return False
+            for anahtar in silinen:
+                # Henüz yazılmamış bir ekleme silinirse depoya hiç gitmez
+                if self._eklenecek.pop(anahtar, None) is None and anahtar in self._kalici:
+                    self._silinecek.add(anahtar)
+            for anahtar in eklenen:
+                self._eklenecek[anahtar] = yeni[anahtar]
+            self._kurallar = yeni
+            self.istatistik["duzenleme"] += 1
+            self.istatistik["tam_yazma_satir"] += sum(len(s) for s in yeni.values())
+            self._zamanla()
+            return True
+
+    def yazma_hatasi(self):
+        """Tampon son denemede yazılamadıysa hata metni, yazılabildiyse None."""
+        with self._kilit:
+            return self._son_hata
+
+    def bekleyen_kural(self):
+        with self._kilit:
+            return len(self._eklenecek) + len(self._silinecek)
+
+    def _zamanla(self):
+        if self._zamanlayici is not None:
+            self._zamanlayici.cancel()
+        # Depo hata verirken yeni düzenlemeler yeniden deneme aralığını kısaltmaz
+        bekleme = self.gecikme_sn
+        if self._ardisik_hata:
+            bekleme = min(self.gecikme_sn * 2 ** self._ardisik_hata, KURAL_YAZMA_MAKS_BEKLEME_SN)
+        self._zamanlayici = threading.Timer(bekleme, self.tamponu_yaz)
+        self._zamanlayici.daemon = True
+        self._zamanlayici.start()
+
+    def tamponu_yaz(self):
+        """Bekleyen silme ve eklemeleri en fazla iki depo çağrısıyla yazar."""
+        with self._kilit:
+            if self._zamanlayici is not None:
+                self._zamanlayici.cancel()
+                self._zamanlayici = None
+            silinecek, eklenecek = self._silinecek, self._eklenecek
+            self._silinecek, self._eklenecek = set(), {}
+            if not silinecek and not eklenecek:
+                return True
+            t0 = time.perf_counter()
+            try:
+                if silinecek:
+                    self.depo.sil(self.tablo, self.anahtar, sorted(silinecek))
+                    self._kalici -= silinecek
+                    self.istatistik["yazma_cagrisi"] += 1
+                    self.istatistik["silinen_kural"] += len(silinecek)
+                    silinecek = set()
+                if eklenecek:
+                    satirlar = [satir for grup in eklenecek.values() for satir in grup]
+                    self.depo.ekle(self.tablo, pd.DataFrame(satirlar))
+                    self._kalici |= set(eklenecek)
+                    self.istatistik["yazma_cagrisi"] += 1
+                    self.istatistik["eklenen_satir"] += len(satirlar)
+                self._ardisik_hata, self._son_hata = 0, None
+                return True
+            except Exception as e:
+                self._ardisik_hata += 1
+                self._son_hata = f"{type(e).__name__}: {e}"
+                self.istatistik["basarisiz_yazma"] += 1
+                logger.exception("Kural tablosu yazılamadı (%d. deneme), düzenlemeler yeniden denenecek: %s",
+                                 self._ardisik_hata, self.tablo)
+                # Yazılamayanlar, bu arada gelen düzenlemelerle çakışmayacak şekilde tampona geri alınır
+                self._silinecek |= silinecek
+                for anahtar, satirlar in eklenecek.items():
+                    if anahtar not in self._kalici and anahtar in self._kurallar:
+                        self._eklenecek.setdefault(anahtar, satirlar)
+                self._zamanla()
+                return False
+            finally:
+                self.istatistik["yazma_sn"] += time.perf_counter() - t0
+
+
+def yazma_istatistikleri(depolar):
+    """
+    Kural depolarının yazma maliyetini toplar; tam_yazma_* alanları eski WRITE_TRUNCATE maliyetidir.
+    bekleyen_kural henüz yazılmamış kural sayısı, hatalar tablo -> son yazma hatasıdır.
+    """
+    toplam = {"duzenleme": 0, "yazma_cagrisi": 0, "eklenen_satir": 0, "silinen_kural": 0, "yazma_sn": 0.0,
+              "basarisiz_yazma": 0, "tam_yazma_satir": 0, "bekleyen_kural": 0, "hatalar": {}}
+    for depo in depolar:
+        with depo._kilit:
+            for anahtar, deger in depo.istatistik.items():
+                toplam[anahtar] += deger
+            toplam["bekleyen_kural"] += depo.bekleyen_kural()
+            if depo._son_hata:
+                toplam["hatalar"][depo.tablo] = depo._son_hata
+    # Eski yöntemde her düzenleme bir yükleme işiydi
+    toplam["tam_yazma_cagrisi"] = toplam["duzenleme"]
+    toplam["yazma_sn"] = round(toplam["yazma_sn"], 3)
+    return toplam
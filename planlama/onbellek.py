@@ -0,0 +1,174 @@
+"""
+Optimizasyon girdilerinin içerik özetiyle adreslenen kalıcı plan önbelleği.
+
+Anahtar; normalize edilmiş gorevler, kaynaklar ve tezgahlar tabloları, kurallar,
+plan başlangıç günü ve çözücü parametrelerinin SHA-256 özetidir. Planlar yerel
+diskte saklanır; toplam boyut sınırı aşılınca en uzun süredir kullanılmayanlar silinir.
+"""
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import threading
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PLAN_ONBELLEGI_DIZINI = os.environ.get(
+    "PLANLAMA_ONBELLEK_DIZINI", os.path.join(os.path.expanduser("~"), ".cache", "planlama", "planlar"))
+PLAN_ONBELLEGI_MAKS_MB = float(os.environ.get("PLANLAMA_ONBELLEK_MAKS_MB", 256))
+
+# Satır sırasından bağımsız özet için tabloların sıralandığı anahtar sütunlar
+_SIRALAMA_SUTUNLARI = ("adimid", "kaynakadi", "tezgahadi", "Adım ID")
+
+
+def _deger_normalize(deger):
+    # Liste/dizi hücreler (OncekiAdimAdi) ve tarihler kararlı metne çevrilir
+    if deger is None or (isinstance(deger, float) and pd.isna(deger)):
+        return None
+    if isinstance(deger, (list, tuple, set)) or hasattr(deger, "tolist"):
+        deger = deger.tolist() if hasattr(deger, "tolist") else list(deger)
+        return [_deger_normalize(d) for d in deger] if isinstance(deger, list) else _deger_normalize(deger)
+    if hasattr(deger, "isoformat"):
+        return deger.isoformat()
+    return deger
+
+
+def _tablo_normalize(df):
+    if df is None:
+        return None
+    df = df.reindex(sorted(df.columns, key=str), axis=1)
+    sirala = [s for s in _SIRALAMA_SUTUNLARI if s in df.columns]
+    if sirala:
+        df = df.sort_values(sirala, key=lambda s: s.astype(str), kind="mergesort")
+    return {"sutunlar": [str(s) for s in df.columns],
+            "satirlar": [[_deger_normalize(d) for d in satir] for satir in df.itertuples(index=False, name=None)]}
+
+
+def _kural_normalize(kurallar):
+    kayitlar = [{str(k): _deger_normalize(v) for k, v in kural.items()} if isinstance(kural, dict)
+                else sorted(str(a) for a in kural) for kural in kurallar or []]
+    return sorted(kayitlar, key=lambda k: json.dumps(k, sort_keys=True, default=str))
+
+
+def plan_anahtari(gorevler_df, kaynaklar_df, tezgahlar_df, manual_start_groups=None, sabit_baslangic_kurallari=None,
+                  kaynak_kisitlari=None, cozucu_parametreleri=None, onceki_plan_df=None, serbest_adimlar=None):
+    """
+    Optimizasyon girdilerinin içerik özetini döndürür.
+    Önceki plan yalnızca artımlı modda (serbest_adimlar verilmişse) ve kayan ufuk modunda
+    (cozucu_parametreleri'nde kayan_ufuk_hafta verilmişse) sonucu belirlediği için anahtara girer;
+    bu modlarda adımlar önceki plandaki günlerinde ve tezgahlarında dondurulur.
+    """
+    icerik = {
+        "gorevler": _tablo_normalize(gorevler_df),
+        "kaynaklar": _tablo_normalize(kaynaklar_df),
+        "tezgahlar": _tablo_normalize(tezgahlar_df),
+        "manual_start_groups": _kural_normalize(manual_start_groups),
+        "sabit_baslangic_kurallari": _kural_normalize(sabit_baslangic_kurallari),
+        "kaynak_kisitlari": _kural_normalize(kaynak_kisitlari),
+        "cozucu": {str(k): _deger_normalize(v) for k, v in (cozucu_parametreleri or {}).items()},
+    }
+    if serbest_adimlar is not None:
+        icerik["serbest_adimlar"] = sorted(str(a) for a in serbest_adimlar)
+    if onceki_plan_df is not None and (serbest_adimlar is not None or icerik["cozucu"].get("kayan_ufuk_hafta")):
+        sutunlar = [s for s in ("Adım ID", "Başlangıç", "Tezgah") if s in onceki_plan_df.columns]
+        icerik["onceki_plan"] = _tablo_normalize(onceki_plan_df[sutunlar])
+    metin = json.dumps(icerik, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(metin.encode("utf-8")).hexdigest()
+
+
+class PlanOnbellegi:
+    """Disk üzerinde, boyut sınırlı ve süreçler arasında paylaşılan plan önbelleği."""
+
+    def __init__(self, dizin=PLAN_ONBELLEGI_DIZINI, maks_mb=PLAN_ONBELLEGI_MAKS_MB):
+        self.dizin = dizin
+        self.maks_bayt = int(maks_mb * 1024 * 1024)
+        self.isabet = 0
+        self.iskalama = 0
+        self._kilit = threading.Lock()
+
+    def _yol(self, anahtar):
+        return os.path.join(self.dizin, f"{anahtar}.pkl")
+
+    def getir(self, anahtar):
+        """Kayıtlı (plan_df, hedef, durum) üçlüsünü ya da None döndürür."""
+        yol = self._yol(anahtar)
+        try:
+            with open(yol, "rb") as f:
+                sonuc = pickle.load(f)
+            # Son kullanım zamanı tahliye sırası için güncellenir
+            os.utime(yol)
+        except FileNotFoundError:
+            sonuc = None
+        except Exception:
+            logger.exception("Önbellek kaydı okunamadı, siliniyor: %s", yol)
+            self._sil(yol)
+            sonuc = None
+        with self._kilit:
+            if sonuc is None:
+                self.iskalama += 1
+            else:
+                self.isabet += 1
+        return sonuc
+
+    def kaydet(self, anahtar, sonuc):
+        try:
+            os.makedirs(self.dizin, exist_ok=True)
+            # Yarım yazılmış dosya okunmasın diye geçici dosyaya yazılıp yerine taşınır
+            fd, gecici = tempfile.mkstemp(dir=self.dizin, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(sonuc, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(gecici, self._yol(anahtar))
+            self._tahliye_et()
+        except Exception:
+            logger.exception("Plan önbelleğe yazılamadı")
+
+    def _kayitlar(self):
+        kayitlar = []
+        with os.scandir(self.dizin) as girdiler:
+            for g in girdiler:
+                if g.name.endswith(".pkl"):
+                    bilgi = g.stat()
+                    kayitlar.append((bilgi.st_mtime, bilgi.st_size, g.path))
+        return kayitlar
+
+    def _tahliye_et(self):
+        kayitlar = sorted(self._kayitlar())
+        toplam = sum(k[1] for k in kayitlar)
+        for _, boyut, yol in kayitlar:
+            if toplam <= self.maks_bayt:
+                break
+            self._sil(yol)
+            toplam -= boyut
+
+    @staticmethod
+    def _sil(yol):
+        try:
+            os.remove(yol)
+        except OSError:
+            pass
+
+    def temizle(self):
+        if os.path.isdir(self.dizin):
+            for _, _, yol in self._kayitlar():
+                self._sil(yol)
+
+    def istatistikler(self):
+        """Bu süreçteki isabet/ıskalama sayıları ve diskteki önbelleğin boyutu."""
+        kayitlar = self._kayitlar() if os.path.isdir(self.dizin) else []
+        with self._kilit:
+            toplam = self.isabet + self.iskalama
+            return {
+                "isabet": self.isabet,
+                "iskalama": self.iskalama,
+                "isabet_orani": self.isabet / toplam if toplam else 0.0,
+                "kayit_sayisi": len(kayitlar),
+                "boyut_mb": round(sum(k[1] for k in kayitlar) / (1024 * 1024), 2),
+                "maks_mb": round(self.maks_bayt / (1024 * 1024), 2),
+            }
+
+
+plan_onbellegi = PlanOnbellegi()
@@ -0,0 +1,742 @@
+"""
+OR-Tools CP-SAT optimizasyon motoru.
+
+Streamlit'ten bağımsızdır; süreç havuzundaki işçiler bu modülü doğrudan içe aktarır.
+"""
+import logging
+import math
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date
+
+import pandas as pd
+from ortools.sat.python import cp_model
+
+from planlama.ayristirma import bagimsiz_bilesenleri_bul, bilesen_catismalari, catisan_gruplar
+from planlama.cozucu_profilleri import boyut_sinifi, profil_ile_coz, profil_sec, sinif_ayarlari
+from planlama.kayan_ufuk import donmus_adimlar, plan_gunleri, plan_tezgahlari, yakin_ufuk_adimlari
+from planlama.onbellek import plan_anahtari, plan_onbellegi
+from planlama.sezgisel import (SEZGISEL_DURUM, _gun, _onceki_adim_listesi, liste_cizelgele, oncul_listeleri,
+                                plan_cezasi, tolerans_asimlari)
+from planlama.takvim import kapasite_takvimleri_olustur, kullanimi_dus, kumulatif_kapasite_ekle
+from planlama.toplu_isleme import TOPLU_PENCERE_GUN, gunleri_ac, toplu_adimlari_birlestir
+from planlama.telemetri import (alt_olcumleri_birlestir, bosluk, cozucu_istatistikleri, girdi_boyutu, model_boyutu,
+                                performans_gecmisi)
+from planlama.tezgah_atama import TezgahIndeksi, tezgah_ata, tezgah_kisitlari_ekle
+
+logger = logging.getLogger(__name__)
+
+# Artımlı modda yalnızca etkilenen adımlar çözüldüğü için süre limiti (saniye) kısa tutulur. Diğer
+# çözümlerin limiti ve parametreleri model boyutuna göre cozucu_profilleri'nden gelir.
+ARTIMLI_ZAMAN_LIMITI_SN = 15
+
+# Bu adım sayısının altındaki portföyler tek modelde çözülür; süreç başlatma maliyeti kazancı aşar
+AYRISTIRMA_MIN_ADIM = 200
+
+# Sezgisel plan varken model ufku onun bitişinin bu katına kadar açılır; sezgisel plan ufuk
+# içinde kaldığı için model her zaman uygulanabilir bir çözüm içerir
+UFUK_KATSAYISI = 2
+# Ufkun sezgisel plandan bağımsız en küçük değeri (gün)
+MIN_UFUK_GUN = 30
+
+# Ara çözümlerden plan tablosu en fazla bu sıklıkla üretilir; hedef değeri her çözümde güncellenir
+ARA_COZUM_ARALIGI_SN = 1.0
+
+_havuz = None
+_yonetici = None
+
+
+def etkilenen_adimlari_bul(df: pd.DataFrame, degisen_adimlar=None, degisen_kaynaklar=None, manual_start_groups=None):
+    """
+    Bir değişiklikten etkilenebilecek adım ID'lerini döndürür: değişen adımlar,
+    değişen kaynaklardaki işler, bunların ardılları ve aynı manuel gruptaki adımlar.
+    """
+    adimid = df['adimid'].astype(str)
+    kaynak = df['kaynakadi'].fillna('').astype(str).str.lower()
+    degisen_adimlar = {str(a) for a in (degisen_adimlar or [])}
+    degisen_kaynaklar = {str(k).lower() for k in (degisen_kaynaklar or [])}
+    # Kayan bir adım, aynı kaynaktaki diğer işlerin kapasitesini de değiştirir
+    degisen_kaynaklar |= set(kaynak[adimid.isin(degisen_adimlar)])
+    serbest = set(adimid[adimid.isin(degisen_adimlar) | kaynak.isin(degisen_kaynaklar)])
+
+    ardillar = {}
+    adim_ids = {}
+    for row in df[['adimid', 'projeadi', 'AdimAdi']].itertuples(index=False):
+        adim_ids.setdefault((row.projeadi, row.AdimAdi), []).append(str(row.adimid))
+    for row in df[['adimid', 'projeadi', 'OncekiAdimAdi']].itertuples(index=False):
+        for onceki in _onceki_adim_listesi(row.OncekiAdimAdi):
+            for onceki_id in adim_ids.get((row.projeadi, onceki), []):
+                ardillar.setdefault(onceki_id, []).append(str(row.adimid))
+
+    grup_uyeleri = {}
+    for grup in manual_start_groups or []:
+        grup = [str(a) for a in grup]
+        for a in grup:
+            grup_uyeleri.setdefault(a, []).extend(grup)
+
+    kuyruk = list(serbest)
+    while kuyruk:
+        adim = kuyruk.pop()
+        for komsu in ardillar.get(adim, []) + grup_uyeleri.get(adim, []):
+            if komsu not in serbest:
+                serbest.add(komsu)
+                kuyruk.append(komsu)
+    return serbest
+
+
+def onceki_plandan_ipucu_ekle(model, baslangic_vars, onceki_plan_df, plan_baslangic, serbest_adimlar=None):
+    """
+    Önceki planın başlangıç günlerini CP-SAT'a çözüm ipucu olarak verir.
+    serbest_adimlar verilirse bu küme dışındaki adımlar önceki yerlerine sabitlenir.
+    Sabitlenen adım sayısını döndürür.
+    """
+    sabitlenen = 0
+    for adimid, gun in plan_gunleri(onceki_plan_df, plan_baslangic).items():
+        var = baslangic_vars.get(adimid)
+        if var is None:
+            continue
+        model.AddHint(var, int(gun))
+        if serbest_adimlar is not None and adimid not in serbest_adimlar:
+            model.Add(var == int(gun))
+            sabitlenen += 1
+    return sabitlenen
+
+
+def _surec_havuzu():
+    global _havuz
+    if _havuz is None:
+        # Streamlit sunucusu çok iş parçacıklı çalıştığı için fork yerine spawn kullanılır
+        _havuz = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=multiprocessing.get_context("spawn"))
+    return _havuz
+
+
+def _havuzu_kapat():
+    global _havuz
+    if _havuz is not None:
+        _havuz.shutdown(wait=False, cancel_futures=True)
+        _havuz = None
+
+
+def _surec_yoneticisi():
+    # Alt süreçlere ara çözüm kuyruğu ve durdurma bayrağı taşımak için paylaşılan yönetici
+    global _yonetici
+    if _yonetici is None:
+        _yonetici = multiprocessing.get_context("spawn").Manager()
+    return _yonetici
+
+
+def plan_tablosu_olustur(df, baslangic_gunleri, plan_baslangic, tezgahlar=None):
+    """
+    Adım başlangıç günlerinden (adimid -> gün) ve atanan tezgahlardan plan_df satırlarını üretir.
+    Tolerans Aşımı, adımın öncülünden toleransgun'den fazla beklediği gün sayısıdır (yoksa 0).
+    """
+    plan = df[['adimid', 'projeadi', 'AdimAdi', 'kaynakadi', 'suregun']].copy()
+    plan['adimid'] = plan['adimid'].astype(str)
+    plan = plan[plan['adimid'].isin(baslangic_gunleri)]
+    bas = plan_baslangic + pd.to_timedelta(plan['adimid'].map(baslangic_gunleri), unit='D')
+    sure = pd.to_numeric(plan['suregun'], errors='coerce').fillna(0)
+    return pd.DataFrame({
+        'Adım ID': plan['adimid'], 'Proje Adı': plan['projeadi'], 'Adım Adı': plan['AdimAdi'],
+        'Kaynak': plan['kaynakadi'], 'Tezgah': plan['adimid'].map(tezgahlar or {}),
+        'Başlangıç': bas, 'Bitiş': bas + pd.to_timedelta(sure, unit='D'),
+        'Tolerans Aşımı': plan['adimid'].map(tolerans_asimlari(df, baslangic_gunleri)).fillna(0).astype(int),
+    }).reset_index(drop=True)
+
+
+def model_ufku(cozum_df, plan_baslangic, sezgisel_gunler=None):
+    """
+    Başlangıç değişkenlerinin üst sınırı için ufuk (gün). Sezgisel plan yoksa tüm adımların
+    art arda yapılabileceği kadar, varsa sezgisel planın bitişinin UFUK_KATSAYISI katı.
+    """
+    adimid = cozum_df['adimid'].astype(str)
+    sure = pd.to_numeric(cozum_df['suregun'], errors='coerce').fillna(0).clip(lower=0).round().astype(int)
+    en_erken = (pd.to_datetime(cozum_df['projebaslangictarihi'], errors='coerce') - plan_baslangic).dt.days
+    ufuk = int(en_erken.fillna(0).clip(lower=0).max()) + int(sure.sum()) if len(cozum_df) else 0
+    if sezgisel_gunler:
+        bitis = max(sezgisel_gunler.get(a, 0) + s for a, s in zip(adimid, sure))
+        ufuk = min(ufuk, UFUK_KATSAYISI * bitis)
+    return max(ufuk, MIN_UFUK_GUN)
+
+
+def _model_kur(model, cozum_df, df, toplu_uyeler, plan_baslangic, ufuk, takvimler, sabit_baslangic_kurallari=None,
+               manual_start_groups=None, donmus=None, tezgah_indeksi=None, tezgah_tercihleri=None):
+    """
+    cozum_df satırları için başlangıç/bitiş değişkenleri ve aralıklar, öncül, kaynak kapasitesi
+    (takvimler: kaynakadi -> KapasiteTakvimi), sabit başlangıç ve manuel grup kısıtları ile hedefi
+    kurar. Hedef, proje gecikme günleri ile tolerans aşım günlerinin toplamıdır (sezgisel.plan_cezasi
+    ile aynı ölçü). donmus'taki adımlar (adimid -> gün, geçmişte negatif olabilir) sabitlenmek üzere
+    o güne uzanan bir alanla kurulur; sabitlemeyi onceki_plandan_ipucu_ekle yapar. Dondurulmuş ve
+    sabit başlangıçlı adımlar öncelik listesinde olduğu gibi öncül kısıtına bağlanmaz ve kapasiteyi
+    aşabilir: kullanımları kaynağın takviminden düşülür, kümülatif kısıta girmezler. Tezgah sınıfı
+    kısıtları tezgah_indeksi verilirse tezgah_kisitlari_ekle ile aynı kuralla eklenir.
+    (adimid -> başlangıç değişkeni, adimid -> [(tezgah sınıfı, seçim değişkeni)]) döndürür.
+    """
+    donmus = donmus or {}
+    adimid = cozum_df['adimid'].astype(str).tolist()
+    sure = pd.to_numeric(cozum_df['suregun'], errors='coerce').fillna(0).clip(lower=0).round().astype(int).tolist()
+    en_erken = (pd.to_datetime(cozum_df['projebaslangictarihi'], errors='coerce') - plan_baslangic).dt.days
+    en_erken = en_erken.fillna(0).clip(lower=0).astype(int).tolist()
+    tolerans = pd.to_numeric(cozum_df.get('toleransgun', pd.Series(index=cozum_df.index, dtype=float)),
+                             errors='coerce').tolist()
+    kaynak = cozum_df['kaynakadi'].tolist()
+    onculler, _ = oncul_listeleri(cozum_df)
+    sabit = {}
+    for kural in sabit_baslangic_kurallari or []:
+        gun = _gun(kural.get('sabit_baslangic_tarihi'), plan_baslangic)
+        if gun is not None:
+            sabit[str(kural.get('adimid'))] = max(gun, 0)
+
+    # Sabitlenen günler geçmişte ya da ufkun ötesinde olabilir; alanlar onları da kapsar
+    gunler = [donmus.get(a, sabit.get(a)) for a in adimid]
+    alt_sinir = min([0] + [g for g in gunler if g is not None])
+    ust_sinir = max([ufuk] + [g + s for g, s in zip(gunler, sure) if g is not None])
+
+    baslangic_vars, araliklar, kaynak_araliklari, sabit_kullanim = {}, {}, {}, {}
+    bitisler = []
+    for i, a in enumerate(adimid):
+        alt = en_erken[i] if gunler[i] is None else min(en_erken[i], gunler[i])
+        bas = model.NewIntVar(alt, max(ust_sinir - sure[i], alt), f"b_{a}")
+        bit = model.NewIntVar(alt + sure[i], max(ust_sinir, alt + sure[i]), f"e_{a}")
+        aralik = model.NewIntervalVar(bas, sure[i], bit, f"i_{a}")
+        baslangic_vars[a], araliklar[a] = bas, (bas, sure[i], bit)
+        bitisler.append(bit)
+        if gunler[i] is None:
+            kaynak_araliklari.setdefault(kaynak[i], []).append(aralik)
+        else:
+            sabit_kullanim.setdefault(kaynak[i], []).append((gunler[i], gunler[i] + sure[i]))
+        if a in sabit and a not in donmus:
+            model.Add(bas == sabit[a])
+    # Temel kapasitesi olmayan kaynak öncelik listesinde olduğu gibi kısıt dışıdır
+    for k, aralik_listesi in kaynak_araliklari.items():
+        takvim = takvimler.get(k)
+        if takvim is not None and takvim.temel > 0:
+            takvim = kullanimi_dus(takvim, sabit_kullanim.get(k), ust_sinir)
+            kumulatif_kapasite_ekle(model, takvim, aralik_listesi, [1] * len(aralik_listesi), ust_sinir, ad=f"k_{k}")
+    tezgah_secimleri = {}
+    if tezgah_indeksi is not None:
+        sabit_gunler = {a: g for a, g in zip(adimid, gunler) if g is not None}
+        tezgah_secimleri = tezgah_kisitlari_ekle(model, tezgah_indeksi, araliklar, ust_sinir, sabit_gunler,
+                                                 tezgah_tercihleri)
+    for i, a in enumerate(adimid):
+        if a in donmus or a in sabit:
+            continue
+        for j in onculler[i]:
+            model.Add(baslangic_vars[a] >= bitisler[j])
+    for grup in manual_start_groups or []:
+        uyeler = [baslangic_vars[str(u)] for u in grup if str(u) in baslangic_vars]
+        for v in uyeler[1:]:
+            model.Add(v == uyeler[0])
+
+    # Toplu adımın bitişi, üyelerinin projelerinin teslimini belirler
+    proje = dict(zip(df['adimid'].astype(str), df['projeadi']))
+    termin = (pd.to_datetime(df.groupby('projeadi')['projebitistarihi'].first(), errors='coerce')
+              - plan_baslangic).dt.days.dropna().astype(int).to_dict()
+    proje_bitisleri = {}
+    for i, a in enumerate(adimid):
+        for p in {proje.get(u) for u in toplu_uyeler.get(a, [a])}:
+            if p in termin:
+                proje_bitisleri.setdefault(p, []).append(bitisler[i])
+    cezalar = []
+    for p, bitis_listesi in proje_bitisleri.items():
+        gecikme = model.NewIntVar(0, max(ust_sinir - termin[p], 0), f"gecikme_{p}")
+        for bit in bitis_listesi:
+            model.Add(gecikme >= bit - termin[p])
+        cezalar.append(gecikme)
+    for i, a in enumerate(adimid):
+        if not onculler[i] or math.isnan(tolerans[i]) or a in donmus or a in sabit:
+            continue
+        if len(onculler[i]) == 1:
+            son_oncul = bitisler[onculler[i][0]]
+        else:
+            son_oncul = model.NewIntVar(alt_sinir, ust_sinir, f"son_oncul_{a}")
+            model.AddMaxEquality(son_oncul, [bitisler[j] for j in onculler[i]])
+        asim = model.NewIntVar(0, ust_sinir - alt_sinir, f"tolerans_{a}")
+        model.Add(asim >= baslangic_vars[a] - son_oncul - int(tolerans[i]))
+        cezalar.append(asim)
+    model.Minimize(sum(cezalar))
+    return baslangic_vars, tezgah_secimleri
+
+
+class _AraCozumDinleyici(cp_model.CpSolverSolutionCallback):
+    """
+    Her iyileşen çözümde ara_cozum(plan_df, hedef, sinir) çağırır.
+    durdur bayrağı kurulursa arama bulunan en iyi çözümle sonlandırılır.
+    """
+
+    def __init__(self, df, baslangic_vars, plan_baslangic, ara_cozum, durdur=None, toplu_uyeler=None):
+        super().__init__()
+        self._df = df
+        self._toplu_uyeler = toplu_uyeler or {}
+        self._vars = baslangic_vars
+        self._plan_baslangic = plan_baslangic
+        self._ara_cozum = ara_cozum
+        self._durdur = durdur
+        self._son_bildirim = 0.0
+
+    def on_solution_callback(self):
+        if self._durdur is not None and self._durdur.is_set():
+            self.StopSearch()
+            return
+        simdi = time.monotonic()
+        plan_df = None
+        if simdi - self._son_bildirim >= ARA_COZUM_ARALIGI_SN:
+            gunler = {adimid: self.Value(var) for adimid, var in self._vars.items()}
+            plan_df = plan_tablosu_olustur(self._df, gunleri_ac(gunler, self._toplu_uyeler), self._plan_baslangic)
+            self._son_bildirim = simdi
+        try:
+            self._ara_cozum(plan_df, self.ObjectiveValue(), self.BestObjectiveBound())
+        except Exception:
+            logger.exception("Ara çözüm bildirilemedi")
+
+
+def _toplu_birlestir(df, plan_baslangic, manual_start_groups, sabit_baslangic_kurallari, pencere_gun, donmus=()):
+    # Manuel gruptaki, sabit başlangıçlı ve dondurulmuş adımlar kendi kurallarıyla planlandığı için birleştirilmez
+    haric = [a for grup in manual_start_groups or [] for a in grup]
+    haric += [k.get('adimid') for k in sabit_baslangic_kurallari or []]
+    haric += list(donmus)
+    try:
+        return toplu_adimlari_birlestir(df, plan_baslangic, pencere_gun, haric)
+    except Exception:
+        logger.exception("Toplu adımlar birleştirilemedi, adımlar ayrı planlanacak")
+        return df, {}
+
+
+def _sezgisel_plan(df, kaynaklar_df_full, plan_baslangic, manual_start_groups, sabit_baslangic_kurallari,
+                   kaynak_kisitlari, cozum_df=None, toplu_uyeler=None, donmus_gunler=None, tezgah_tercihleri=None):
+    # (cozum_df adimid -> gün, plan_df, hedef) döndürür; çizelgelenemezse None.
+    # cozum_df toplu adımları birleştirilmiş tablodur; plan_df df'in adımlarıyla üretilir.
+    # donmus_gunler'deki adımlar yerlerinde, tezgah_tercihleri'ndeki adımlar boşsa tezgahlarında kalır.
+    cozum_df = df if cozum_df is None else cozum_df
+    toplu_uyeler = toplu_uyeler or {}
+    tezgahlar = dict(tezgah_tercihleri or {})
+    try:
+        gunler = liste_cizelgele(cozum_df, kaynaklar_df_full, plan_baslangic, kaynak_kisitlari,
+                                 sabit_baslangic_kurallari, manual_start_groups, tezgahlar, donmus_gunler)
+    except Exception:
+        logger.exception("Sezgisel plan üretilemedi")
+        return None
+    plan_df = plan_tablosu_olustur(df, gunleri_ac(gunler, toplu_uyeler), plan_baslangic,
+                                   gunleri_ac(tezgahlar, toplu_uyeler))
+    return gunler, plan_df, plan_cezasi(plan_df, df)
+
+
+def hizli_plan(df_input, kaynaklar_df_full, tezgahlar_df_full, manual_start_groups=None, sabit_baslangic_kurallari=None,
+               kaynak_kisitlari=None, toplu_pencere_gun=TOPLU_PENCERE_GUN):
+    """
+    Çözücü çalıştırmadan öncelik listesiyle uygulanabilir bir plan üretir (önizleme için).
+    hesapla_ve_optimize_et ile aynı (plan_df, hedef, durum) üçlüsünü döndürür; hedef gecikme ve
+    tolerans aşımı günleri toplamıdır.
+    """
+    plan_baslangic = pd.to_datetime(date.today())
+    cozum_df, toplu_uyeler = _toplu_birlestir(df_input, plan_baslangic, manual_start_groups,
+                                              sabit_baslangic_kurallari, toplu_pencere_gun)
+    sezgisel = _sezgisel_plan(df_input, kaynaklar_df_full, plan_baslangic, manual_start_groups,
+                              sabit_baslangic_kurallari, kaynak_kisitlari, cozum_df, toplu_uyeler)
+    if sezgisel is None:
+        return None, 0, None
+    return sezgisel[1], sezgisel[2], SEZGISEL_DURUM
+
+
+def _kayan_ufuk_coz(df, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu, manual_start_groups,
+                    sabit_baslangic_kurallari, kaynak_kisitlari, onceki_plan_df, serbest_adimlar, ayristir,
+                    olcumler, ara_cozum, durdur, toplu_pencere_gun, hafta, zaman_limiti=None, isci_sayisi=None,
+                    cozucu_profili=None):
+    # Kayan ufuk modu: taslak plan, yakın ufkun CP-SAT çözümü ve uzak ufkun öncelik listesiyle yerleşimi
+    t0 = time.perf_counter()
+    plan_baslangic = pd.to_datetime(date.today())
+    adimid = df['adimid'].astype(str)
+    donmus = donmus_adimlar(onceki_plan_df, plan_baslangic, set(adimid))
+    tercihler = plan_tezgahlari(onceki_plan_df, donmus)
+
+    # Taslak: başlamış adımlar yerinde, kalanlar öncelik listesiyle
+    cozum_df, toplu_uyeler = _toplu_birlestir(df, plan_baslangic, manual_start_groups, sabit_baslangic_kurallari,
+                                              toplu_pencere_gun, donmus)
+    taslak = _sezgisel_plan(df, kaynaklar_df_full, plan_baslangic, manual_start_groups, sabit_baslangic_kurallari,
+                            kaynak_kisitlari, cozum_df, toplu_uyeler, donmus, tercihler)
+    if taslak is None:
+        logger.warning("Kayan ufuk taslağı üretilemedi, tüm plan çözülecek")
+        return _optimize_et(df, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu, manual_start_groups,
+                            sabit_baslangic_kurallari, kaynak_kisitlari, onceki_plan_df, serbest_adimlar, ayristir,
+                            olcumler, ara_cozum, durdur, toplu_pencere_gun, zaman_limiti, isci_sayisi, cozucu_profili)
+    taslak_plan = taslak[1]
+    yakin = yakin_ufuk_adimlari(plan_gunleri(taslak_plan, plan_baslangic), donmus, hafta)
+    sure = dict(zip(adimid, pd.to_numeric(df['suregun'], errors='coerce').fillna(0)))
+    suren = {a for a, g in donmus.items() if g + sure[a] > 0}
+    serbest = yakin if serbest_adimlar is None else yakin & {str(a) for a in serbest_adimlar}
+    olcumler['donmus_adim_sayisi'] = len(donmus)
+    olcumler['yakin_ufuk_adim_sayisi'] = len(yakin)
+    olcumler['taslak_sn'] = time.perf_counter() - t0
+
+    # Yakın ufuk: süren işler sabit, yakın ufuktakiler serbest; uzak işler modele girmez
+    def _taslakla_tamamla(plan_df):
+        if plan_df is None:
+            return None
+        return pd.concat([plan_df, taslak_plan[~taslak_plan['Adım ID'].isin(plan_df['Adım ID'])]], ignore_index=True)
+
+    def alt_ara_cozum(plan_df, hedef, sinir):
+        ara_cozum(_taslakla_tamamla(plan_df), hedef, sinir)
+
+    alt_df = df[adimid.isin(yakin | suren).to_numpy()]
+    yakin_sonuc = _optimize_et(alt_df, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu, manual_start_groups,
+                               sabit_baslangic_kurallari, kaynak_kisitlari, taslak_plan, serbest, ayristir,
+                               olcumler, alt_ara_cozum if ara_cozum is not None else None, durdur, toplu_pencere_gun,
+                               zaman_limiti, isci_sayisi, cozucu_profili)
+    if yakin_sonuc[0] is None:
+        return taslak_plan, taslak[2], SEZGISEL_DURUM
+
+    # Uzak ufuk: yakın ufkun çözümü ve başlamış adımlar sabitken kalan işler öncelik listesiyle yerleşir
+    t0 = time.perf_counter()
+    sabit = {**donmus, **plan_gunleri(yakin_sonuc[0], plan_baslangic)}
+    tercihler = {**tercihler, **plan_tezgahlari(yakin_sonuc[0], sabit)}
+    cozum_df, toplu_uyeler = _toplu_birlestir(df, plan_baslangic, manual_start_groups, sabit_baslangic_kurallari,
+                                              toplu_pencere_gun, sabit)
+    son = _sezgisel_plan(df, kaynaklar_df_full, plan_baslangic, manual_start_groups, sabit_baslangic_kurallari,
+                         kaynak_kisitlari, cozum_df, toplu_uyeler, sabit, tercihler)
+    olcumler['uzak_ufuk_sn'] = time.perf_counter() - t0
+    if son is None:
+        return _taslakla_tamamla(yakin_sonuc[0]), taslak[2], yakin_sonuc[2]
+    return son[1], son[2], yakin_sonuc[2]
+
+
+class _KuyrugaBildir:
+    # Süreç havuzundaki bileşenler ara çözümlerini bileşen numarasıyla kuyruğa yazar
+    def __init__(self, kuyruk, sira):
+        self.kuyruk = kuyruk
+        self.sira = sira
+
+    def __call__(self, plan_df, hedef, sinir):
+        self.kuyruk.put((self.sira, plan_df, hedef, sinir))
+
+
+def _tek_model_coz(df_input, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu=False, manual_start_groups=None,
+                   sabit_baslangic_kurallari=None, kaynak_kisitlari=None, onceki_plan_df=None, serbest_adimlar=None,
+                   cozucu_isci_sayisi=None, olcumler=None, ara_cozum=None, durdur=None,
+                   toplu_pencere_gun=TOPLU_PENCERE_GUN, zaman_limiti=None, cozucu_profili=None):
+    olcumler = {} if olcumler is None else olcumler
+    sezgisel = None
+    try:
+        t0 = time.perf_counter()
+        df = df_input.copy()
+        plan_baslangic = pd.to_datetime(date.today())
+        # ... (Veri temizleme adımları)
+        t1 = time.perf_counter()
+        olcumler['temizleme_sn'] = t1 - t0
+
+        # Toplu işlenebilir adımlar modelde projeler arası tek aralık olur. Artımlı modda
+        # sabitlenen ve serbest adımlar aynı toplu adıma düşebileceği için birleştirme yapılmaz.
+        cozum_df, toplu_uyeler = df, {}
+        if serbest_adimlar is None:
+            cozum_df, toplu_uyeler = _toplu_birlestir(df, plan_baslangic, manual_start_groups,
+                                                      sabit_baslangic_kurallari, toplu_pencere_gun)
+        olcumler['toplu_adim_sayisi'] = len(toplu_uyeler)
+        olcumler['birlestirilen_adim_sayisi'] = sum(len(u) for u in toplu_uyeler.values())
+        t0 = time.perf_counter()
+        olcumler['birlestirme_sn'] = t0 - t1
+        t1 = t0
+
+        # Öncelik listesi planı hem ipucu hem de çözücü başarısız olursa yedek plandır. Artımlı
+        # modda serbest olmayan adımlar yedek planda da önceki yerlerinde kalır.
+        artimli = onceki_plan_df is not None and not onceki_plan_df.empty
+        donmus = None
+        if artimli and serbest_adimlar is not None:
+            donmus = {a: g for a, g in plan_gunleri(onceki_plan_df, plan_baslangic).items() if a not in serbest_adimlar}
+        tezgah_tercihleri = plan_tezgahlari(onceki_plan_df, donmus or {})
+        sezgisel = _sezgisel_plan(df, kaynaklar_df_full, plan_baslangic, manual_start_groups,
+                                  sabit_baslangic_kurallari, kaynak_kisitlari, cozum_df, toplu_uyeler, donmus,
+                                  tezgah_tercihleri)
+        t0 = time.perf_counter()
+        olcumler['sezgisel_sn'] = t0 - t1
+        if sezgisel is not None and ara_cozum is not None:
+            ara_cozum(sezgisel[1], sezgisel[2], None)
+
+        # Aday tezgah kümeleri bir kez ayrıştırılıp eşdeğerlik sınıflarına indirgenir; modelde
+        # sınıf başına tek kümülatif kısıt kurulur, somut tezgahlar çözümden sonra tezgah_ata ile
+        # başlangıç sırasına göre açgözlü atanır
+        tezgah_indeksi = TezgahIndeksi.tablodan(cozum_df)
+        olcumler['tezgah_sinifi_sayisi'] = len(tezgah_indeksi.siniflar)
+
+        # baslangic_vars: cozum_df adimid -> başlangıç değişkeni (plan_baslangic'tan itibaren gün)
+        ufuk = model_ufku(cozum_df, plan_baslangic, sezgisel[0] if sezgisel is not None else None)
+        olcumler['ufuk_gun'] = ufuk
+        model = cp_model.CpModel()
+        takvimler = kapasite_takvimleri_olustur(kaynaklar_df_full, kaynak_kisitlari, plan_baslangic)
+        baslangic_vars, tezgah_secimleri = _model_kur(model, cozum_df, df, toplu_uyeler, plan_baslangic, ufuk,
+                                                      takvimler, sabit_baslangic_kurallari, manual_start_groups,
+                                                      donmus, tezgah_indeksi, tezgah_tercihleri)
+
+        if artimli:
+            onceki_plandan_ipucu_ekle(model, baslangic_vars, onceki_plan_df, plan_baslangic, serbest_adimlar)
+        elif sezgisel is not None:
+            for adimid, gun in sezgisel[0].items():
+                if adimid in baslangic_vars:
+                    model.AddHint(baslangic_vars[adimid], gun)
+
+        t1 = time.perf_counter()
+        olcumler['model_kurma_sn'] = t1 - t0
+        olcumler.update(model_boyutu(model))
+        # Başlangıç değişkeni olmayan adımlar çözümden plana aktarılamaz; böyle bir çözüm
+        # eksik plan üreteceği için ara çözüm olarak bildirilmez ve sezgisel plan kullanılır
+        kapsanmayan = set(cozum_df['adimid'].astype(str)) - set(baslangic_vars)
+        olcumler['kapsanmayan_adim_sayisi'] = len(kapsanmayan)
+
+        # Parametreler, zaman limiti ve işçi sayısı model boyutu sınıfının profilinden gelir
+        sinif = boyut_sinifi(len(cozum_df), olcumler.get('aralik_sayisi', 0))
+        ayarlar = sinif_ayarlari(sinif)
+        profil = profil_sec(sinif, cozucu_profili)
+        zaman_limiti = zaman_limiti or ayarlar['zaman_limiti']
+        if artimli and serbest_adimlar is not None:
+            zaman_limiti = min(zaman_limiti, ARTIMLI_ZAMAN_LIMITI_SN)
+        isci_sayisi = min((i for i in (cozucu_isci_sayisi, ayarlar['isci_sayisi']) if i), default=None)
+        olcumler.update(boyut_sinifi=sinif, cozucu_profili=profil)
+        dinleyici = None
+        bildir = None if kapsanmayan else ara_cozum
+        if bildir is not None or durdur is not None:
+            dinleyici = _AraCozumDinleyici(df, baslangic_vars, plan_baslangic, bildir or (lambda *_: None), durdur,
+                                           toplu_uyeler)
+        solver, status = profil_ile_coz(model, profil, zaman_limiti, isci_sayisi, dinleyici, durdur, olcumler)
+        t0 = time.perf_counter()
+        olcumler['cozum_sn'] = t0 - t1
+        cozum_var = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+        olcumler.update(cozucu_istatistikleri(solver, status, cozum_var))
+        if not cozum_var:
+            if sezgisel is not None:
+                logger.warning("Çözücü plan bulamadı (%s), sezgisel plan kullanılıyor", solver.StatusName(status))
+                return sezgisel[1], sezgisel[2], SEZGISEL_DURUM
+            return None, 0, solver.StatusName(status)
+        if kapsanmayan:
+            if sezgisel is not None:
+                logger.warning("Çözüm %d adımı kapsamıyor, sezgisel plan kullanılıyor", len(kapsanmayan))
+                return sezgisel[1], sezgisel[2], SEZGISEL_DURUM
+            logger.error("Çözüm %d adımı kapsamıyor ve sezgisel plan yok", len(kapsanmayan))
+            return None, 0, None
+
+        # ... (Sonuçların plan_df'e aktarılması)
+        gunler = {a: solver.Value(v) for a, v in baslangic_vars.items()}
+        sureler = dict(zip(cozum_df['adimid'].astype(str),
+                           pd.to_numeric(cozum_df['suregun'], errors='coerce').fillna(0).astype(int)))
+        secimler = {a: s for a, liste in tezgah_secimleri.items() for s, secim in liste if solver.Value(secim)}
+        tezgahlar = tezgah_ata(tezgah_indeksi, gunler, sureler, secimler, tezgah_tercihleri)
+        plan_df = plan_tablosu_olustur(df, gunleri_ac(gunler, toplu_uyeler), plan_baslangic,
+                                       gunleri_ac(tezgahlar, toplu_uyeler))
+        olcumler['cikarma_sn'] = time.perf_counter() - t0
+        return plan_df, solver.ObjectiveValue(), solver.StatusName(status)
+    except Exception:
+        logger.exception("Optimizasyon hatası")
+        if sezgisel is not None:
+            return sezgisel[1], sezgisel[2], SEZGISEL_DURUM
+        return None, 0, None
+
+
+def _olcumlu_model_coz(*args, **kwargs):
+    # Süreç havuzunda ölçümler sözlük üzerinden geri taşınamaz, sonuçla birlikte döndürülür
+    olcumler = {}
+    return _tek_model_coz(*args, olcumler=olcumler, **kwargs), olcumler
+
+
+def _ara_cozumleri_birlestir(kuyruk, bilesen_sayisi, son_cozumler, ara_cozum):
+    # Her bileşenin son ara çözümü saklanır; hepsi en az bir çözüm bulduğunda birleşik plan bildirilir
+    guncellendi = False
+    while True:
+        try:
+            sira, plan_df, hedef, sinir = kuyruk.get_nowait()
+        except queue.Empty:
+            break
+        onceki_plan = son_cozumler.get(sira, (None,))[0]
+        son_cozumler[sira] = (plan_df if plan_df is not None else onceki_plan, hedef, sinir)
+        guncellendi = True
+    if not guncellendi or len(son_cozumler) < bilesen_sayisi:
+        return
+    planlar = [c[0] for c in son_cozumler.values()]
+    plan_df = None if any(p is None for p in planlar) else pd.concat(planlar, ignore_index=True)
+    sinirlar = [c[2] for c in son_cozumler.values()]
+    sinir = None if any(s is None for s in sinirlar) else sum(sinirlar)
+    ara_cozum(plan_df, sum(c[1] for c in son_cozumler.values()), sinir)
+
+
+def _alt_problem_girdileri(df, idx, manual_start_groups, sabit_baslangic_kurallari, onceki_plan_df, serbest_adimlar):
+    alt_df = df.loc[idx]
+    adimlar = set(alt_df['adimid'].astype(str))
+    gruplar = [g for g in manual_start_groups or [] if any(str(a) in adimlar for a in g)]
+    kurallar = [k for k in sabit_baslangic_kurallari or [] if str(k.get('adimid')) in adimlar]
+    onceki = None
+    if onceki_plan_df is not None and not onceki_plan_df.empty:
+        onceki = onceki_plan_df[onceki_plan_df['Adım ID'].astype(str).isin(adimlar)]
+    serbest = None if serbest_adimlar is None else set(serbest_adimlar) & adimlar
+    return alt_df, gruplar, kurallar, onceki, serbest
+
+
+def _bilesenleri_coz(bilesenler, df_input, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu,
+                     manual_start_groups, sabit_baslangic_kurallari, kaynak_kisitlari, onceki_plan_df,
+                     serbest_adimlar, olcumler, ara_cozum, durdur, toplu_pencere_gun, zaman_limiti, isci_sayisi,
+                     cozucu_profili):
+    # Bileşenleri süreç havuzunda çözer; bileşen sırasıyla (plan_df, hedef, durum) listesi döndürür.
+    # Çekirdekler alt problemlere paylaştırılır; her model en az bir CP-SAT işçisi alır.
+    bilesen_isci_sayisi = max(1, (isci_sayisi or os.cpu_count() or 1) // len(bilesenler))
+    havuz = _surec_havuzu()
+    kuyruk = alt_durdur = None
+    if ara_cozum is not None or durdur is not None:
+        yonetici = _surec_yoneticisi()
+        kuyruk, alt_durdur = yonetici.Queue(), yonetici.Event()
+    isler = []
+    for sira, idx in enumerate(bilesenler):
+        alt_df, gruplar, kurallar, onceki, serbest = _alt_problem_girdileri(
+            df_input, idx, manual_start_groups, sabit_baslangic_kurallari, onceki_plan_df, serbest_adimlar)
+        isler.append(havuz.submit(_olcumlu_model_coz, alt_df, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu,
+                                  gruplar, kurallar, kaynak_kisitlari, onceki, serbest, bilesen_isci_sayisi,
+                                  ara_cozum=_KuyrugaBildir(kuyruk, sira) if ara_cozum is not None else None,
+                                  durdur=alt_durdur, toplu_pencere_gun=toplu_pencere_gun, zaman_limiti=zaman_limiti,
+                                  cozucu_profili=cozucu_profili))
+
+    if kuyruk is not None:
+        son_cozumler = {}
+        bekleyen = set(isler)
+        while bekleyen:
+            _, bekleyen = wait(bekleyen, timeout=0.2, return_when=FIRST_COMPLETED)
+            if durdur is not None and durdur.is_set():
+                alt_durdur.set()
+            if ara_cozum is not None:
+                _ara_cozumleri_birlestir(kuyruk, len(isler), son_cozumler, ara_cozum)
+    sonuclar = []
+    for is_ in isler:
+        sonuc, alt_olcumler = is_.result()
+        alt_olcumleri_birlestir(olcumler, alt_olcumler)
+        sonuclar.append(sonuc)
+    return sonuclar
+
+
+def hesapla_ve_optimize_et(df_input: pd.DataFrame, kaynaklar_df_full: pd.DataFrame, tezgahlar_df_full: pd.DataFrame, simulasyon_modu=False, manual_start_groups=None, sabit_baslangic_kurallari=None, kaynak_kisitlari=None, onceki_plan_df=None, serbest_adimlar=None, ayristir=True, olcumler=None, ara_cozum=None, durdur=None, onbellek=True, gecmise_kaydet=True, toplu_pencere_gun=TOPLU_PENCERE_GUN, kayan_ufuk_hafta=None, zaman_limiti=None, isci_sayisi=None, cozucu_profili=None):
+    """
+    Google OR-Tools Optimizasyon Motoru
+
+    onceki_plan_df verilirse model önceki planla sıcak başlatılır; serbest_adimlar
+    ile birlikte verilirse yalnızca bu adımlar yeniden planlanır (artımlı mod).
+    Büyük portföyler bağımsız bileşenlere ayrılıp süreç havuzunda paralel çözülür.
+    Toplu işlenebilir adımlar, en erken başlangıçları toplu_pencere_gun içinde kalanlar tek
+    aralıkta birleştirilerek çözülür (None birleştirmeyi kapatır).
+    kayan_ufuk_hafta verilirse (kayan ufuk modu) onceki_plan_df'te bugünden önce başlamış
+    adımlar dondurulur, yalnızca önümüzdeki kayan_ufuk_hafta haftada başlayanlar CP-SAT ile
+    çözülür; daha sonraki işler öncelik listesinin yerleştirdiği yerde kalır.
+    olcumler sözlüğü verilirse aşama süreleri (temizleme_sn, sezgisel_sn, model_kurma_sn, cozum_sn,
+    cikarma_sn), model boyutu ve CP-SAT istatistikleri içine yazılır; gecmise_kaydet açıkken
+    çözülen (önbellekten gelmeyen) her çalıştırma performans geçmişine eklenir.
+    ara_cozum(plan_df, hedef, sinir) her iyileşen çözümde çağrılır (plan_df seyreltilir, None olabilir);
+    ilk çağrı sezgisel plandır ve sinir None'dır. Çözücü plan bulamazsa ya da çözüm her adımı
+    kapsamazsa sezgisel plan SEZGISEL_DURUM ile döner.
+    durdur (threading.Event) kurulduğunda arama erken biter ve o ana kadarki en iyi plan döner.
+    CP-SAT parametreleri model boyutuna göre seçilen profilden gelir (cozucu_profilleri);
+    cozucu_profili verilirse o profil kullanılır. zaman_limiti (sn) profilin limitinin yerine
+    geçer; isci_sayisi toplam CP-SAT işçi sayısıdır (varsayılan çekirdek sayısı) ve bileşenlere
+    paylaştırılır.
+    onbellek açıkken aynı girdilerle daha önce bulunan plan diskteki önbellekten döner.
+    """
+    olcumler = {} if olcumler is None else olcumler
+    anahtar = None
+    if onbellek:
+        cozucu_parametreleri = {
+            "plan_baslangic": date.today(), "simulasyon_modu": simulasyon_modu, "ayristir": ayristir,
+            "zaman_limiti": zaman_limiti, "artimli_zaman_limiti": ARTIMLI_ZAMAN_LIMITI_SN,
+            # İşçi sayısı CP-SAT'ın bulduğu çözümü değiştirebilir
+            "isci_sayisi": isci_sayisi, "cozucu_profili": cozucu_profili,
+            "toplu_pencere_gun": toplu_pencere_gun, "kayan_ufuk_hafta": kayan_ufuk_hafta,
+        }
+        anahtar = plan_anahtari(df_input, kaynaklar_df_full, tezgahlar_df_full, manual_start_groups,
+                                sabit_baslangic_kurallari, kaynak_kisitlari, cozucu_parametreleri,
+                                onceki_plan_df, serbest_adimlar)
+        sonuc = plan_onbellegi.getir(anahtar)
+        olcumler['onbellek'] = 'isabet' if sonuc is not None else 'iskalama'
+        if sonuc is not None:
+            if ara_cozum is not None:
+                ara_cozum(sonuc[0], sonuc[1], sonuc[1])
+            return sonuc
+
+    t0 = time.perf_counter()
+    if kayan_ufuk_hafta is None:
+        sonuc = _optimize_et(df_input, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu, manual_start_groups,
+                             sabit_baslangic_kurallari, kaynak_kisitlari, onceki_plan_df, serbest_adimlar, ayristir,
+                             olcumler, ara_cozum, durdur, toplu_pencere_gun, zaman_limiti, isci_sayisi,
+                             cozucu_profili)
+    else:
+        sonuc = _kayan_ufuk_coz(df_input, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu, manual_start_groups,
+                                sabit_baslangic_kurallari, kaynak_kisitlari, onceki_plan_df, serbest_adimlar, ayristir,
+                                olcumler, ara_cozum, durdur, toplu_pencere_gun, kayan_ufuk_hafta, zaman_limiti,
+                                isci_sayisi, cozucu_profili)
+    olcumler['toplam_sn'] = time.perf_counter() - t0
+    olcumler['bosluk'] = bosluk(olcumler.get('hedef'), olcumler.get('en_iyi_sinir'))
+    if gecmise_kaydet:
+        performans_gecmisi.ekle({
+            **girdi_boyutu(df_input, kaynaklar_df_full, manual_start_groups, sabit_baslangic_kurallari,
+                           kaynak_kisitlari, serbest_adimlar),
+            **olcumler, "durum": sonuc[2], "durduruldu": durdur is not None and durdur.is_set(),
+        })
+    # Erken durdurulan aramalar ve sezgisel yedek planlar en iyi planı vermeyebileceği için önbelleğe yazılmaz
+    if anahtar is not None and sonuc[0] is not None and sonuc[2] != SEZGISEL_DURUM and not (durdur is not None and durdur.is_set()):
+        plan_onbellegi.kaydet(anahtar, sonuc)
+    return sonuc
+
+
+def _optimize_et(df_input, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu, manual_start_groups,
+                 sabit_baslangic_kurallari, kaynak_kisitlari, onceki_plan_df, serbest_adimlar, ayristir,
+                 olcumler, ara_cozum, durdur, toplu_pencere_gun, zaman_limiti=None, isci_sayisi=None,
+                 cozucu_profili=None):
+    bilesenler = []
+    if ayristir and len(df_input) >= AYRISTIRMA_MIN_ADIM:
+        try:
+            bilesenler = bagimsiz_bilesenleri_bul(df_input, pd.to_datetime(date.today()), manual_start_groups)
+        except Exception:
+            logger.exception("Ayrıştırma başarısız, tek model çözülecek")
+    olcumler['bilesen_sayisi'] = max(1, len(bilesenler))
+    if len(bilesenler) <= 1:
+        return _tek_model_coz(df_input, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu, manual_start_groups,
+                              sabit_baslangic_kurallari, kaynak_kisitlari, onceki_plan_df, serbest_adimlar,
+                              cozucu_isci_sayisi=isci_sayisi, olcumler=olcumler, ara_cozum=ara_cozum, durdur=durdur,
+                              toplu_pencere_gun=toplu_pencere_gun, zaman_limiti=zaman_limiti,
+                              cozucu_profili=cozucu_profili)
+
+    plan_baslangic = pd.to_datetime(date.today())
+    ortak = (df_input, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu, manual_start_groups,
+             sabit_baslangic_kurallari, kaynak_kisitlari, onceki_plan_df, serbest_adimlar, olcumler)
+    try:
+        sonuclar = _bilesenleri_coz(bilesenler, *ortak, ara_cozum, durdur, toplu_pencere_gun, zaman_limiti,
+                                    isci_sayisi, cozucu_profili)
+        # Bileşen pencereleri tahmin olduğu için ayrı planlar birlikte kapasiteyi aşabilir ya da
+        # aynı tezgahı kullanabilir; çakışan bileşenler birleştirilip birlikte yeniden çözülür
+        while len(bilesenler) > 1 and all(s[0] is not None for s in sonuclar):
+            ciftler = bilesen_catismalari([s[0] for s in sonuclar], kaynaklar_df_full, kaynak_kisitlari,
+                                          plan_baslangic)
+            if not ciftler:
+                break
+            gruplar = catisan_gruplar(len(bilesenler), ciftler)
+            birlesen = {i for g in gruplar for i in g}
+            olcumler['catisan_bilesen_sayisi'] = olcumler.get('catisan_bilesen_sayisi', 0) + len(birlesen)
+            logger.info("%d bileşende birlikte kapasite ya da tezgah çakışması var, yeniden çözülecek",
+                        len(birlesen))
+            yeni = [[etiket for i in g for etiket in bilesenler[i]] for g in gruplar]
+            yeni_sonuclar = _bilesenleri_coz(yeni, *ortak, None, durdur, toplu_pencere_gun, zaman_limiti,
+                                             isci_sayisi, cozucu_profili)
+            bilesenler = [b for i, b in enumerate(bilesenler) if i not in birlesen] + yeni
+            sonuclar = [s for i, s in enumerate(sonuclar) if i not in birlesen] + yeni_sonuclar
+    except BrokenProcessPool:
+        logger.exception("Süreç havuzu çöktü, tek model çözülecek")
+        _havuzu_kapat()
+        return _tek_model_coz(df_input, kaynaklar_df_full, tezgahlar_df_full, simulasyon_modu, manual_start_groups,
+                              sabit_baslangic_kurallari, kaynak_kisitlari, onceki_plan_df, serbest_adimlar,
+                              cozucu_isci_sayisi=isci_sayisi, olcumler=olcumler, ara_cozum=ara_cozum, durdur=durdur,
+                              toplu_pencere_gun=toplu_pencere_gun, zaman_limiti=zaman_limiti,
+                              cozucu_profili=cozucu_profili)
+
+    planlar, toplam_hedef, durumlar = [], 0, set()
+    for plan_df, hedef, durum in sonuclar:
+        if plan_df is None:
+            return None, 0, durum
+        planlar.append(plan_df)
+        toplam_hedef += hedef
+        durumlar.add(durum)
+    if SEZGISEL_DURUM in durumlar:
+        durum = SEZGISEL_DURUM
+    else:
+        durum = "OPTIMAL" if durumlar == {"OPTIMAL"} else "FEASIBLE"
+    return pd.concat(planlar, ignore_index=True), toplam_hedef, durum
@@ -0,0 +1,173 @@
+"""
+Oturumlar arasında paylaşılan, sürümlü ve değiştirilmez veri görüntüsü.
+
+Kural listeleri (manuel gruplar, kaynak kısıtları, sabit başlangıçlar) ve son çözülen ortak
+plan süreç başına tek bir AnlikGoruntu'da tutulur. Görüntü yerinde değiştirilmez; depoya
+ulaşan her yazım yeni bir sürüm yayınlar. Oturumlar (OturumKatmani) yalnızca gördükleri
+sürümü ve kendi düzenlemelerinin katmanını saklar: bir kural listesi ilk düzenlendiğinde
+oturuma kopyalanır (copy-on-write); ortak değer başka bir yazımla değişirse oturumun eski
+kopyası geçersiz sayılıp ortak değere dönülür. Başka süreçlerin (diğer sunucular, komut
+satırı, doğrudan tablo düzenlemeleri) yazımları KURAL_YENILEME_SN aralıklarla yeniden
+okunur; yalnızca içeriği değişen kural alanları yeni sürüm alır.
+"""
+import copy
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+KURAL_ALANLARI = ("manual_groups", "kaynak_kisitlari", "sabit_baslangic_kurallari")
+PLAN_ALANI = "plan_df"
+
+# Kuralların depodan yeniden okunma aralığı (sn); görev tablosu önbelleğinin süresiyle aynıdır
+KURAL_YENILEME_SN = 300
+
+
+def _ayni(a, b):
+    # Depodan okunan kayıtlarda NaN bulunabilir; karşılaştırma metin üzerinden yapılır
+    return json.dumps(a, sort_keys=True, default=str) == json.dumps(b, sort_keys=True, default=str)
+
+
+def _dondur(alan, deger):
+    # Kural listeleri demet olarak paylaşılır; plan tablosu oturumlarca yalnızca okunur
+    if alan == PLAN_ALANI:
+        return deger
+    return tuple(deger or ())
+
+
+class AnlikGoruntu:
+    """Bir sürümdeki paylaşılan değerler. alan_surumleri her alanın son değiştiği sürümdür."""
+
+    __slots__ = ("surum", "degerler", "alan_surumleri")
+
+    def __init__(self, surum, degerler, alan_surumleri):
+        self.surum = surum
+        self.degerler = degerler
+        self.alan_surumleri = alan_surumleri
+
+    def __getitem__(self, alan):
+        return self.degerler[alan]
+
+    def degistir(self, degerler):
+        """Verilen alanları değiştirilmiş yeni sürümü döndürür; bu görüntü olduğu gibi kalır."""
+        surum = self.surum + 1
+        return AnlikGoruntu(surum, {**self.degerler, **{a: _dondur(a, d) for a, d in degerler.items()}},
+                            {**self.alan_surumleri, **dict.fromkeys(degerler, surum)})
+
+
+class PaylasilanVeri:
+    """
+    Süreç genelindeki güncel görüntü. yukleyici() kural alanlarını içeren bir sözlük döndürür;
+    ilk okumada ve ardından her yenileme_sn saniyede bir çağrılır (None: yalnızca ilk okumada).
+    Bu süreçteki değişiklikler yayinla() ile gelir.
+    """
+
+    def __init__(self, yukleyici, yenileme_sn=KURAL_YENILEME_SN):
+        self._yukleyici = yukleyici
+        self.yenileme_sn = yenileme_sn
+        self._kilit = threading.Lock()
+        self._goruntu = AnlikGoruntu(0, {**{a: () for a in KURAL_ALANLARI}, PLAN_ALANI: None}, {})
+        self._yuklenecek = True
+        self._yukleme_zamani = None
+
+    def goruntu(self):
+        with self._kilit:
+            if self._yuklenecek:
+                # İlk yükleme kilit altında yapılır; aynı anda açılan oturumlar depoyu bir kez okur
+                yuklenen = self._yukleyici()
+                self._goruntu = self._goruntu.degistir({a: yuklenen.get(a) for a in KURAL_ALANLARI})
+                self._yuklenecek = False
+                self._yukleme_zamani = time.monotonic()
+                return self._goruntu
+            if self.yenileme_sn is None or time.monotonic() - self._yukleme_zamani < self.yenileme_sn:
+                return self._goruntu
+            # Yenilemeyi tek bir çağıran üstlenir; diğerleri bu sırada mevcut görüntüyü okur
+            self._yukleme_zamani = time.monotonic()
+            onceki = self._goruntu
+        self._yeniden_yukle(onceki)
+        with self._kilit:
+            return self._goruntu
+
+    def _yeniden_yukle(self, onceki):
+        try:
+            yuklenen = self._yukleyici()
+        except Exception:
+            logger.exception("Kurallar yeniden okunamadı, mevcut görüntü kullanılıyor")
+            return
+        with self._kilit:
+            # Okuma sürerken bu süreçte yayınlanan alanlar daha yenidir, üzerine yazılmaz
+            degisen = {a: yuklenen.get(a) for a in KURAL_ALANLARI
+                       if self._goruntu.alan_surumleri.get(a, 0) == onceki.alan_surumleri.get(a, 0)
+                       and not _ayni(list(_dondur(a, yuklenen.get(a))), list(self._goruntu[a]))}
+            if degisen:
+                logger.info("Depoda değişen kurallar yüklendi: %s", ", ".join(sorted(degisen)))
+                self._goruntu = self._goruntu.degistir(degisen)
+
+    def yayinla(self, degerler, dayanak=None):
+        """
+        Alanları yeni sürümle yayınlar ve sürümü döndürür. dayanak verilirse (ör. planın
+        hesaplandığı sürüm) o sürümden sonra bir kural değiştiyse yayınlanmaz, None döner.
+        """
+        with self._kilit:
+            if dayanak is not None and any(self._goruntu.alan_surumleri.get(a, 0) > dayanak for a in KURAL_ALANLARI):
+                return None
+            self._goruntu = self._goruntu.degistir(degerler)
+            return self._goruntu.surum
+
+
+class OturumKatmani:
+    """Bir oturumun gördüğü sürüm ile paylaşılan değerler üzerindeki kendi düzenlemeleri."""
+
+    def __init__(self, paylasilan):
+        self.paylasilan = paylasilan
+        self.surum = None
+        self._katman = {}  # alan -> (oturumun değeri, kopyalandığı alan sürümü)
+
+    def _goruntu(self):
+        goruntu = self.paylasilan.goruntu()
+        self.surum = goruntu.surum
+        # Başka bir yazımla değişen kuralların oturumdaki kopyası eskimiştir. Oturuma özel plan
+        # (ör. AI öncelik denemeleri) kendi girdileriyle hesaplandığı için korunur.
+        for alan in [a for a in self._katman if a in KURAL_ALANLARI]:
+            if goruntu.alan_surumleri.get(alan, 0) > self._katman[alan][1]:
+                logger.info("%s başka bir oturumda güncellendi, yerel düzenleme bırakıldı", alan)
+                del self._katman[alan]
+        return goruntu
+
+    def oku(self, alan):
+        """Alanın oturumda geçerli değeri; düzenlenmemişse paylaşılan değer (değiştirilmemelidir)."""
+        goruntu = self._goruntu()
+        if alan in self._katman:
+            return self._katman[alan][0]
+        return goruntu[alan]
+
+    def duzenle(self, alan):
+        """Kural listesinin oturuma özel, değiştirilebilir kopyası; ilk çağrıda paylaşılan değerden kopyalanır."""
+        goruntu = self._goruntu()
+        if alan not in self._katman:
+            self._katman[alan] = (copy.deepcopy(list(goruntu[alan])), goruntu.alan_surumleri.get(alan, 0))
+        return self._katman[alan][0]
+
+    def ayarla(self, alan, deger):
+        """Alanı yalnızca bu oturum için değiştirir."""
+        goruntu = self._goruntu()
+        self._katman[alan] = (deger, goruntu.alan_surumleri.get(alan, 0))
+
+    def birak(self, alan):
+        """Oturumun düzenlemesini atar; alan yeniden paylaşılan değeri gösterir."""
+        self._katman.pop(alan, None)
+
+    def ozel_alanlar(self):
+        """Oturumda paylaşılan değerden ayrılan alanlar."""
+        self._goruntu()
+        return set(self._katman)
+
+    def yayinla(self, alan, deger, dayanak=None):
+        """Değeri tüm oturumlar için yayınlar; başarılıysa oturumun düzenlemesi bırakılır."""
+        surum = self.paylasilan.yayinla({alan: deger}, dayanak)
+        if surum is not None:
+            self.birak(alan)
+            self.surum = surum
+        return surum
@@ -0,0 +1,300 @@
+"""
+Haftalık birim raporları: plan bir kez dilimlenir, raporlar süreç havuzunda çizilir,
+e-postalar tek bir SMTP bağlantısı üzerinden gönderilir.
+
+Aşama süreleri (dilimleme_sn, cizim_sn, gonderim_sn) olcumler sözlüğüne yazılır.
+YerelSmtpSunucusu, gerçek sunucu yerine kullanılabilecek bellek içi bir SMTP sunucusudur:
+
+    python -m planlama.rapor --port 8025
+"""
+import argparse
+import logging
+import smtplib
+import socketserver
+import threading
+import time
+from email.mime.image import MIMEImage
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Gantt görselinin bugünden itibaren kapsadığı gün sayısı
+RAPOR_GANTT_GUN = 21
+SMTP_DENEME_SAYISI = 3
+SMTP_BEKLEME_SN = 2.0
+SMTP_ZAMAN_ASIMI_SN = 30
+
+
+def birim_dilimleri(plan_df, birimler, bugun):
+    """
+    Planı birimlere (kaynak adına göre, büyük/küçük harf duyarsız) tek geçişte böler.
+    birim -> (bu haftanın işleri, Gantt penceresindeki işler) döndürür.
+    """
+    bugun = pd.Timestamp(bugun).floor('D')
+    hafta_basi = bugun - pd.to_timedelta(bugun.weekday(), unit='D')
+    hafta_sonu = hafta_basi + pd.to_timedelta(7, unit='D')
+    gantt_sonu = bugun + pd.to_timedelta(RAPOR_GANTT_GUN, unit='D')
+
+    df = plan_df.assign(**{'Başlangıç': pd.to_datetime(plan_df['Başlangıç']), 'Bitiş': pd.to_datetime(plan_df['Bitiş'])})
+    # Rapora girebilecek tek aralık: hafta başından Gantt penceresinin sonuna
+    df = df[(df['Bitiş'] > hafta_basi) & (df['Başlangıç'] < max(hafta_sonu, gantt_sonu))]
+    df = df.assign(_birim=df['Kaynak'].astype(str).str.lower(),
+                   _bu_hafta=(df['Bitiş'] > hafta_basi) & (df['Başlangıç'] < hafta_sonu),
+                   _gantt=(df['Bitiş'] > bugun) & (df['Başlangıç'] < gantt_sonu))
+    gruplar = dict(tuple(df.groupby('_birim', sort=False)))
+    bos = df.iloc[0:0]
+    sutunlar = [c for c in plan_df.columns if c != 'Kaynak']
+    dilimler = {}
+    for birim in birimler:
+        grup = gruplar.get(str(birim).lower(), bos)
+        dilimler[birim] = (grup.loc[grup['_bu_hafta'], sutunlar].sort_values('Başlangıç'),
+                           grup.loc[grup['_gantt'], sutunlar])
+    return dilimler, (hafta_basi, hafta_sonu - pd.to_timedelta(1, unit='D'), bugun, gantt_sonu)
+
+
+def birim_raporu_olustur(birim, hafta_df, gantt_df, donem):
+    """(birim, html, png) döndürür; süreç havuzunda çalışır. Görsel üretilemezse png None olur."""
+    hafta_basi, hafta_sonu, bugun, gantt_sonu = donem
+    tablo = hafta_df.assign(**{'Başlangıç': hafta_df['Başlangıç'].dt.strftime('%d.%m.%Y'),
+                               'Bitiş': hafta_df['Bitiş'].dt.strftime('%d.%m.%Y')})
+    html = (f"<h3>{birim} - {hafta_basi:%d.%m.%Y} / {hafta_sonu:%d.%m.%Y} haftalık iş listesi</h3>"
+            + (tablo.to_html(index=False, border=0) if not tablo.empty else "<p>Bu hafta planlanmış iş yok.</p>"))
+    png = None
+    if not gantt_df.empty:
+        try:
+            import plotly.express as px
+
+            fig = px.timeline(gantt_df, x_start='Başlangıç', x_end='Bitiş', y='Proje Adı', color='Proje Adı',
+                              title=f"{birim} - önümüzdeki {RAPOR_GANTT_GUN} gün")
+            fig.update_layout(showlegend=False)
+            fig.update_xaxes(range=[bugun, gantt_sonu])
+            png = fig.to_image(format='png', width=1100, height=max(300, 28 * gantt_df['Proje Adı'].nunique() + 120))
+        except Exception as e:
+            # Görsel dışa aktarımı (kaleido) kurulu değilse rapor tabloyla gider
+            logger.warning("Gantt görseli üretilemedi (%s): %s", birim, e)
+    return birim, html, png
+
+
+def rapor_mesaji(gonderen, alici, cc, konu, html, png=None):
+    mesaj = MIMEMultipart('related')
+    mesaj['From'], mesaj['To'], mesaj['Subject'] = gonderen, alici, konu
+    if cc:
+        mesaj['Cc'] = ", ".join(cc)
+    if png is not None:
+        html += '<br><img src="cid:gantt">'
+    mesaj.attach(MIMEText(html, 'html', 'utf-8'))
+    if png is not None:
+        gorsel = MIMEImage(png, 'png')
+        gorsel.add_header('Content-ID', '<gantt>')
+        mesaj.attach(gorsel)
+    return mesaj
+
+
+def _gecici_hata(hata):
+    if isinstance(hata, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(hata, smtplib.SMTPResponseException):
+        return 400 <= hata.smtp_code < 500
+    return not isinstance(hata, smtplib.SMTPException)
+
+
+class SmtpGonderici:
+    """
+    Tek bir SMTP bağlantısını tüm mesajlar için kullanır. Bağlantı koparsa yeniden açılır;
+    her mesaj en fazla deneme_sayisi kez, artan beklemelerle denenir.
+    """
+
+    def __init__(self, sunucu, port, kullanici=None, sifre=None, deneme_sayisi=SMTP_DENEME_SAYISI,
+                 bekleme_sn=SMTP_BEKLEME_SN):
+        self.sunucu = sunucu
+        self.port = int(port)
+        self.kullanici = kullanici
+        self.sifre = sifre
+        self.deneme_sayisi = deneme_sayisi
+        self.bekleme_sn = bekleme_sn
+        self._smtp = None
+        self.baglanti_sayisi = 0
+
+    def _baglan(self):
+        if self.port == 465:
+            smtp = smtplib.SMTP_SSL(self.sunucu, self.port, timeout=SMTP_ZAMAN_ASIMI_SN)
+        else:
+            smtp = smtplib.SMTP(self.sunucu, self.port, timeout=SMTP_ZAMAN_ASIMI_SN)
+            smtp.ehlo()
+            if smtp.has_extn('starttls'):
+                smtp.starttls()
+                smtp.ehlo()
+        if self.kullanici and self.sifre:
+            smtp.login(self.kullanici, self.sifre)
+        self._smtp = smtp
+        self.baglanti_sayisi += 1
+
+    def gonder(self, mesaj):
+        for deneme in range(1, self.deneme_sayisi + 1):
+            try:
+                if self._smtp is None:
+                    self._baglan()
+                self._smtp.send_message(mesaj)
+                return
+            except OSError as e:
+                # Geçici hatalarda (kopan bağlantı, ağ hatası, 4xx yanıtı) bağlantı yenilenip tekrar denenir;
+                # alıcı reddi gibi kalıcı SMTP hataları hemen yükselir
+                if not _gecici_hata(e):
+                    raise
+                self.kapat()
+                if deneme == self.deneme_sayisi:
+                    raise
+                logger.warning("SMTP gönderimi başarısız (%s), %d. deneme yapılacak", e, deneme + 1)
+                time.sleep(self.bekleme_sn * deneme)
+
+    def kapat(self):
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.kapat()
+
+
+def haftalik_raporlari_gonder(plan_df, amir_listesi, cc_listesi, gonderen, gonderici, bugun, test_email=None,
+                              havuz=None, olcumler=None):
+    """
+    amir_listesi (birim -> e-posta) için raporları üretip gönderir.
+    test_email verilirse tüm raporlar CC'siz bu adrese gider. {birim: hata veya None} döndürür.
+    havuz verilirse raporlar bu süreç havuzunda paralel çizilir.
+    """
+    olcumler = {} if olcumler is None else olcumler
+    t0 = time.perf_counter()
+    dilimler, donem = birim_dilimleri(plan_df, list(amir_listesi), bugun)
+    t1 = time.perf_counter()
+    olcumler['dilimleme_sn'] = t1 - t0
+
+    if havuz is not None:
+        isler = [havuz.submit(birim_raporu_olustur, birim, hafta_df, gantt_df, donem)
+                 for birim, (hafta_df, gantt_df) in dilimler.items()]
+        raporlar = [is_.result() for is_ in isler]
+    else:
+        raporlar = [birim_raporu_olustur(birim, hafta_df, gantt_df, donem)
+                    for birim, (hafta_df, gantt_df) in dilimler.items()]
+    t2 = time.perf_counter()
+    olcumler['cizim_sn'] = t2 - t1
+
+    sonuclar = {}
+    on_ek = "[TEST] " if test_email else ""
+    with gonderici:
+        for birim, html, png in raporlar:
+            alici = test_email or amir_listesi[birim]
+            konu = f"{on_ek}{birim} Haftalık Üretim Planı ({donem[0]:%d.%m.%Y})"
+            mesaj = rapor_mesaji(gonderen, alici, [] if test_email else cc_listesi, konu, html, png)
+            try:
+                gonderici.gonder(mesaj)
+                sonuclar[birim] = None
+            except Exception as e:
+                logger.exception("Rapor gönderilemedi: %s", birim)
+                sonuclar[birim] = str(e)
+    olcumler['gonderim_sn'] = time.perf_counter() - t2
+    olcumler['smtp_baglanti_sayisi'] = gonderici.baglanti_sayisi
+    return sonuclar
+
+
+class _SmtpIstekIsleyici(socketserver.StreamRequestHandler):
+    # RFC 5321'in rapor gönderimi için gereken alt kümesi: EHLO/HELO, MAIL, RCPT, DATA, RSET, NOOP, QUIT
+    def _yaz(self, satir):
+        self.wfile.write(f"{satir}\r\n".encode("ascii"))
+
+    def handle(self):
+        self._yaz("220 planlama yerel SMTP")
+        gonderen, alicilar = None, []
+        while True:
+            satir = self.rfile.readline()
+            if not satir:
+                return
+            komut = satir.decode("utf-8", "replace").strip()
+            ust = komut.upper()
+            if ust.startswith("EHLO"):
+                self._yaz("250-localhost")
+                self._yaz("250 8BITMIME")
+            elif ust.startswith("HELO"):
+                self._yaz("250 localhost")
+            elif ust.startswith("MAIL FROM:"):
+                gonderen, alicilar = komut[10:].strip(), []
+                self._yaz("250 OK")
+            elif ust.startswith("RCPT TO:"):
+                alicilar.append(komut[8:].strip())
+                self._yaz("250 OK")
+            elif ust == "DATA":
+                self._yaz("354 End data with <CR><LF>.<CR><LF>")
+                veri = []
+                while True:
+                    satir = self.rfile.readline()
+                    if not satir or satir in (b".\r\n", b".\n"):
+                        break
+                    veri.append(satir[1:] if satir.startswith(b"..") else satir)
+                self.server.mesajlar.append({"gonderen": gonderen, "alicilar": alicilar, "veri": b"".join(veri)})
+                self._yaz("250 OK")
+            elif ust == "RSET":
+                gonderen, alicilar = None, []
+                self._yaz("250 OK")
+            elif ust == "NOOP":
+                self._yaz("250 OK")
+            elif ust == "QUIT":
+                self._yaz("221 Bye")
+                return
+            else:
+                self._yaz("502 Command not implemented")
+
+
+class YerelSmtpSunucusu(socketserver.ThreadingTCPServer):
+    """Test için bellek içi SMTP sunucusu; alınan mesajlar mesajlar listesinde tutulur."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, adres="127.0.0.1", port=0):
+        super().__init__((adres, port), _SmtpIstekIsleyici)
+        self.mesajlar = []
+        self._is_parcacigi = None
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def baslat(self):
+        self._is_parcacigi = threading.Thread(target=self.serve_forever, daemon=True)
+        self._is_parcacigi.start()
+        return self
+
+    def durdur(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rapor testleri için yerel SMTP sunucusu")
+    parser.add_argument("--port", type=int, default=8025)
+    args = parser.parse_args(argv)
+    sunucu = YerelSmtpSunucusu(port=args.port)
+    print(f"Yerel SMTP sunucusu 127.0.0.1:{sunucu.port} adresinde dinliyor")
+    onceki = 0
+    try:
+        sunucu.baslat()
+        while True:
+            time.sleep(1)
+            for mesaj in sunucu.mesajlar[onceki:]:
+                print(f"{mesaj['gonderen']} -> {', '.join(mesaj['alicilar'])} ({len(mesaj['veri'])} bayt)")
+            onceki = len(sunucu.mesajlar)
+    except KeyboardInterrupt:
+        sunucu.durdur()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Optimizasyon ve arayüz tarafından paylaşılan üretim sabitleri."""
+
+BATCHABLE_KAYNAKLAR = ["Satınalma", "Kesimhane", "Tasarım"]
+
+STEP_GROUP_MAPPING = {
+    "Hammadde Tedariği": "Genel Satınalma",
+    "Platine ve Silindir Malzemeleri Temini": "Genel Satınalma",
+    "Malzeme Sipariş": "Genel Satınalma",
+    "Kesim Operasyonu": "Genel Kesim",
+    "Kesim Süreci": "Genel Kesim",
+    "Tasarım Süreci": "Tasarım Çizim",
+    "Onay Süreci": "Tasarım Onay"
+}
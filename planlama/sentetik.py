@@ -0,0 +1,124 @@
+"""
+Optimizasyon motorunu canlı BigQuery verisi olmadan ölçmek için tohumlu sentetik veri üreticisi.
+
+Üretilen tablolar gorevler, kaynaklar ve tezgahlar tablolarının şemasıyla aynıdır;
+aynı tohum ve boyutlar her zaman aynı veriyi üretir.
+"""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from planlama.sabitler import STEP_GROUP_MAPPING
+
+# kaynakadi -> (kapasite, tezgah sayısı)
+SENTETIK_KAYNAKLAR = {
+    "Tasarım": (4, 0),
+    "Otomasyon": (2, 0),
+    "Satınalma": (3, 0),
+    "Kesimhane": (2, 2),
+    "Kaynakhane": (3, 3),
+    "Freze": (6, 6),
+    "Torna": (3, 3),
+    "Montaj": (4, 0),
+    "Boyahane": (2, 1),
+}
+
+# Toplu işlenebilir adım grubunun çalıştığı kaynak
+_GRUP_KAYNAGI = {
+    "Genel Satınalma": "Satınalma",
+    "Genel Kesim": "Kesimhane",
+    "Tasarım Çizim": "Tasarım",
+    "Tasarım Onay": "Tasarım",
+}
+
+_NORMAL_KAYNAKLAR = ["Otomasyon", "Kaynakhane", "Torna", "Montaj", "Boyahane"]
+
+
+def sentetik_veri_uret(proje_sayisi=50, adim_sayisi=8, oncul_yogunlugu=0.2, freze_orani=0.15, toplu_oran=0.2,
+                       kural_sayisi=5, tohum=0, plan_baslangic=None):
+    """
+    Gerçek şemada sentetik planlama girdileri üretir.
+
+    oncul_yogunlugu: bir adımın, hemen önceki adım dışındaki her önceki adıma bağlı olma olasılığı.
+    freze_orani: birden çok tezgah adayı olan Freze adımlarının oranı.
+    toplu_oran: STEP_GROUP_MAPPING'deki toplu işlenebilir adımların oranı.
+    Sözlük döndürür: gorevler, kaynaklar, tezgahlar DataFrame'leri ve kaynak_kisitlari listesi.
+    """
+    rng = np.random.default_rng(tohum)
+    plan_baslangic = pd.Timestamp(plan_baslangic or date.today())
+
+    kaynaklar_df = pd.DataFrame(
+        [{"kaynakadi": k, "kapasite": kap} for k, (kap, _) in SENTETIK_KAYNAKLAR.items()])
+    tezgahlar_df = pd.DataFrame(
+        [{"tezgahadi": f"{k[:3].upper()}-{i + 1}", "kaynakadi": k}
+         for k, (_, adet) in SENTETIK_KAYNAKLAR.items() for i in range(adet)])
+    freze_tezgahlari = tezgahlar_df.loc[tezgahlar_df["kaynakadi"] == "Freze", "tezgahadi"].to_numpy()
+    toplu_adimlar = list(STEP_GROUP_MAPPING)
+
+    satirlar = []
+    for p in range(proje_sayisi):
+        proje = f"SNT-{p + 1:04d}"
+        baslangic = plan_baslangic + pd.Timedelta(days=int(rng.integers(-20, 120)))
+        termin = baslangic + pd.Timedelta(days=int(rng.integers(30, 150)))
+        oncelik = int(rng.integers(1, 6))
+        adim_adlari = []
+        for k in range(adim_sayisi):
+            tezgah = None
+            secim = rng.random()
+            if secim < toplu_oran:
+                ad = toplu_adimlar[int(rng.integers(len(toplu_adimlar)))]
+                kaynak = _GRUP_KAYNAGI[STEP_GROUP_MAPPING[ad]]
+                # Aynı projede aynı toplu adım tekrar ederse adı tekilleştirilir
+                if ad in adim_adlari:
+                    ad = f"{ad} {k + 1}"
+            elif secim < toplu_oran + freze_orani:
+                ad = f"Freze İşleme {k + 1}"
+                kaynak = "Freze"
+                adaylar = rng.choice(freze_tezgahlari, size=int(rng.integers(2, 5)), replace=False)
+                tezgah = ",".join(sorted(adaylar))
+            else:
+                kaynak = _NORMAL_KAYNAKLAR[int(rng.integers(len(_NORMAL_KAYNAKLAR)))]
+                ad = f"{kaynak} Operasyonu {k + 1}"
+                if SENTETIK_KAYNAKLAR[kaynak][1] and rng.random() < 0.5:
+                    tezgah = f"{kaynak[:3].upper()}-{int(rng.integers(SENTETIK_KAYNAKLAR[kaynak][1])) + 1}"
+
+            onculler = []
+            if k > 0:
+                onculler.append(adim_adlari[k - 1])
+                ekstra = rng.random(k - 1) < oncul_yogunlugu
+                onculler += [adim_adlari[j] for j in np.flatnonzero(ekstra)]
+            adim_adlari.append(ad)
+            satirlar.append({
+                "adimid": f"{proje}-{k + 1:03d}",
+                "projeadi": proje,
+                "AdimAdi": ad,
+                "kaynakadi": kaynak,
+                "tezgahadi": tezgah,
+                "suregun": int(rng.integers(1, 11)),
+                "toleransgun": int(rng.integers(0, 6)),
+                "OncekiAdimAdi": onculler,
+                "projebaslangictarihi": baslangic,
+                "projebitistarihi": termin,
+                "proje_onceligi": oncelik,
+            })
+    gorevler_df = pd.DataFrame(satirlar)
+
+    kaynak_kisitlari = []
+    for _ in range(kural_sayisi):
+        kaynak = list(SENTETIK_KAYNAKLAR)[int(rng.integers(len(SENTETIK_KAYNAKLAR)))]
+        bas = plan_baslangic + pd.Timedelta(days=int(rng.integers(0, 150)))
+        bit = bas + pd.Timedelta(days=int(rng.integers(1, 15)))
+        kaynak_kisitlari.append({
+            "kaynak_adi": kaynak,
+            "baslangic_tarihi": bas.strftime("%Y-%m-%d"),
+            "bitis_tarihi": bit.strftime("%Y-%m-%d"),
+            "yeni_kapasite": int(rng.integers(0, SENTETIK_KAYNAKLAR[kaynak][0])),
+        })
+
+    return {
+        "gorevler": gorevler_df,
+        "kaynaklar": kaynaklar_df,
+        "tezgahlar": tezgahlar_df,
+        "kaynak_kisitlari": kaynak_kisitlari,
+    }
@@ -0,0 +1,388 @@
+"""
+Öncelik listesiyle çizelgeleme: CP-SAT'tan bağımsız, milisaniyeler içinde uygulanabilir plan.
+
+Adımlar öncülleri bittikçe hazır kümesine girer; hazır adımlardan öncelik sırası en
+yüksek olan (proje önceliği, termin, kalan kritik yol) kaynak kapasitesinin ve tezgahın
+boş olduğu en erken güne yerleştirilir. Doluluk kaynak ve tezgah sınıfı başına günlük
+NumPy dizilerinde tutulur; uygun pencere kümülatif toplamla aranır. Somut tezgahlar
+plandan sonra tezgah_atama.tezgah_ata ile atanır.
+
+Sonuç CP-SAT'a ipucu olarak verilir, çözücü çözüm bulamazsa doğrudan kullanılır.
+"""
+from collections import Counter
+import heapq
+import logging
+import math
+
+import numpy as np
+import pandas as pd
+
+from planlama.takvim import kapasite_takvimleri_olustur
+from planlama.tezgah_atama import TezgahIndeksi, tezgah_ata
+
+logger = logging.getLogger(__name__)
+
+# Çözücü uygulanabilir plan bulamadığında dönen öncelik listesi planının durum adı
+SEZGISEL_DURUM = "SEZGISEL"
+
+# Başlangıçta ayrılan doluluk ufku (gün); gerektikçe ikiye katlanır
+SEZGISEL_ILK_UFUK_GUN = 365
+# Bu günden ileriye yerleştirilemeyen adım, kapasite tanımında hata olduğunu gösterir
+SEZGISEL_MAKS_UFUK_GUN = 36500
+
+
+def _onceki_adim_listesi(deger):
+    # OncekiAdimAdi BigQuery'den liste, elle girilen kayıtlarda virgüllü metin olarak gelebilir
+    if deger is None or (isinstance(deger, float) and math.isnan(deger)):
+        return []
+    if isinstance(deger, str):
+        return [d.strip() for d in deger.split(",") if d.strip()]
+    return [str(d) for d in deger if d is not None and str(d).strip()]
+
+
+def oncul_listeleri(df):
+    """
+    Satır konumlarıyla öncül ve ardıl listeleri. Öncüller proje içinde adım adıyla
+    (OncekiAdimAdi) ve varsa projeler arası adım ID'siyle (OncekiAdimID) tanımlanır.
+    """
+    n = len(df)
+    sira = {}
+    for i, (proje, ad) in enumerate(zip(df['projeadi'], df['AdimAdi'])):
+        sira.setdefault((proje, ad), []).append(i)
+    onculler = [[] for _ in range(n)]
+    ardillar = [[] for _ in range(n)]
+    for i, (proje, onceki) in enumerate(zip(df['projeadi'], df['OncekiAdimAdi'])):
+        for ad in _onceki_adim_listesi(onceki):
+            for j in sira.get((proje, ad), []):
+                if j != i:
+                    onculler[i].append(j)
+                    ardillar[j].append(i)
+    if 'OncekiAdimID' in df.columns:
+        konum = {a: i for i, a in enumerate(df['adimid'].astype(str))}
+        for i, onceki in enumerate(df['OncekiAdimID']):
+            for a in _onceki_adim_listesi(onceki):
+                j = konum.get(a)
+                if j is not None and j != i:
+                    onculler[i].append(j)
+                    ardillar[j].append(i)
+    return onculler, ardillar
+
+
+def topolojik_sira(onculler, ardillar):
+    """Topolojik sıra ve döngüde kalan satırlar (döngü yoksa boş liste)."""
+    kalan_derece = [len(o) for o in onculler]
+    topolojik, kuyruk = [], [i for i, d in enumerate(kalan_derece) if d == 0]
+    while kuyruk:
+        i = kuyruk.pop()
+        topolojik.append(i)
+        for j in ardillar[i]:
+            kalan_derece[j] -= 1
+            if kalan_derece[j] == 0:
+                kuyruk.append(j)
+    return topolojik, [i for i, d in enumerate(kalan_derece) if d > 0]
+
+
+def _gun(tarih, plan_baslangic):
+    tarih = pd.to_datetime(tarih, errors='coerce')
+    return None if pd.isna(tarih) else (tarih - plan_baslangic).days
+
+
+def _ilk_pencere(uygun, sure):
+    """uygun dizisinde ardışık `sure` günün hepsinin uygun olduğu ilk konum; yoksa None."""
+    if len(uygun) < sure:
+        return None
+    toplam = np.concatenate([[0], np.cumsum(uygun, dtype=np.int64)])
+    adaylar = np.flatnonzero(toplam[sure:] - toplam[:-sure] == sure)
+    return int(adaylar[0]) if len(adaylar) else None
+
+
+class _Doluluk:
+    """Kaynakların ve tezgah sınıflarının günlük boş kapasitesi; ufuk gerektikçe genişler."""
+
+    def __init__(self, takvimler, sinif_kapasiteleri=()):
+        self.takvimler = takvimler
+        self.ufuk = 0
+        self.bos = {k: np.zeros(0, dtype=np.int64) for k in takvimler}
+        self.sinif_kapasiteleri = list(sinif_kapasiteleri)
+        self.sinif_bos = [np.zeros(0, dtype=np.int64) for _ in self.sinif_kapasiteleri]
+
+    def genislet(self, ufuk):
+        if ufuk <= self.ufuk:
+            return
+        yeni = max(ufuk, 2 * self.ufuk, SEZGISEL_ILK_UFUK_GUN)
+        gunler = np.arange(self.ufuk, yeni)
+        for k, takvim in self.takvimler.items():
+            self.bos[k] = np.concatenate([self.bos[k], takvim.kapasite(gunler)])
+        for s, kapasite in enumerate(self.sinif_kapasiteleri):
+            self.sinif_bos[s] = np.concatenate([self.sinif_bos[s], np.full(len(gunler), kapasite, dtype=np.int64)])
+        self.ufuk = yeni
+
+    def en_erken(self, hazir, sure, kaynak, siniflar):
+        """(başlangıç günü, seçilen tezgah sınıfı) döndürür; sınıflardan en erken başlayan alınır."""
+        kisitli = kaynak in self.bos
+        if sure <= 0 or (not kisitli and not siniflar):
+            return hazir, (siniflar[0] if siniflar else None)
+        uzunluk = max(4 * sure, 64)
+        while hazir + uzunluk <= SEZGISEL_MAKS_UFUK_GUN + sure:
+            self.genislet(hazir + uzunluk)
+            dilim = slice(hazir, hazir + uzunluk)
+            kaynak_uygun = self.bos[kaynak][dilim] > 0 if kisitli else np.ones(uzunluk, dtype=bool)
+            en_iyi = None
+            for sinif in siniflar or [None]:
+                uygun = kaynak_uygun if sinif is None else kaynak_uygun & (self.sinif_bos[sinif][dilim] > 0)
+                konum = _ilk_pencere(uygun, sure)
+                if konum is not None and (en_iyi is None or konum < en_iyi[0]):
+                    en_iyi = (konum, sinif)
+            if en_iyi is not None:
+                return hazir + en_iyi[0], en_iyi[1]
+            uzunluk *= 2
+        raise ValueError(f"{kaynak} kaynağında {SEZGISEL_MAKS_UFUK_GUN} gün içinde yer bulunamadı")
+
+    def en_bos_sinif(self, bas, sure, siniflar):
+        """Kapasiteye bakılmadan yerleşen adım için aralığında en çok boş tezgahı olan sınıf."""
+        bitis, bas = bas + sure, max(bas, 0)
+        if not siniflar or bitis <= bas:
+            return siniflar[0] if siniflar else None
+        self.genislet(bitis)
+        return max(siniflar, key=lambda s: self.sinif_bos[s][bas:bitis].min())
+
+    def ayir(self, bas, sure, kaynak, sinif, miktar=1):
+        # Geçmişte başlamış (dondurulmuş) adımın yalnızca bugünden sonraki kısmı yer tutar
+        bitis = bas + sure
+        bas = max(bas, 0)
+        sure = bitis - bas
+        if sure <= 0:
+            return
+        self.genislet(bitis)
+        if kaynak in self.bos:
+            self.bos[kaynak][bas:bas + sure] -= miktar
+        if sinif is not None:
+            self.sinif_bos[sinif][bas:bas + sure] -= miktar
+
+    def birak(self, bas, sure, kaynak, sinif):
+        """ayir ile ayrılan yeri geri verir."""
+        self.ayir(bas, sure, kaynak, sinif, miktar=-1)
+
+
+def liste_cizelgele(df, kaynaklar_df, plan_baslangic, kaynak_kisitlari=None,
+                    sabit_baslangic_kurallari=None, manual_start_groups=None, atamalar=None, donmus_gunler=None):
+    """
+    Görev tablosunu öncelik listesiyle çizelgeler; adimid -> başlangıç günü döndürür.
+
+    Öncüller (OncekiAdimAdi, OncekiAdimID), kaynak kapasitesi (kaynak_kisitlari takvimiyle) ve tezgah
+    tekilliği kesin kısıttır. Adımlar hazır oldukları en erken güne yerleştiği için
+    öncülle arasındaki boşluk olabilecek en kısa haliyle kalır; kapasite beklemesi yüzünden
+    toleransgun aşılırsa plan tablosunda tolerans_asimlari ile işaretlenir. Sabit başlangıç kuralı olan adımlar kapasiteye bakılmadan
+    kurala yerleştirilir. Manuel gruplar tüm üyeleri hazır olunca hepsinin sığdığı ilk ortak güne
+    yerleşir (üyelerden biri dondurulmuş ya da sabitse o güne); üyeleri birbirine bağlı olduğu
+    ya da tek kapasiteyi paylaştığı için aynı gün başlayamayan grupta ilk yerleşen üyenin günü
+    diğerleri için alt sınır olur.
+    donmus_gunler (adimid -> gün, geçmiş için negatif) adımları öncül ve kapasiteye bakılmadan
+    o güne koyar; kapasiteleri diğer adımlardan önce ayrılır. atamalar sözlük verilirse
+    adimid -> atanan tezgah ile doldurulur; içinde önceden bulunan tezgahlar (ör. dondurulmuş
+    adımların sahadaki tezgahları) boşsa korunur.
+    """
+    plan_baslangic = pd.Timestamp(plan_baslangic)
+    takvimler = kapasite_takvimleri_olustur(kaynaklar_df, kaynak_kisitlari, plan_baslangic)
+    # Temel kapasitesi olmayan kaynak sonsuza dek dolu olacağı için kısıt dışı bırakılır
+    takvimler = {k: t for k, t in takvimler.items() if t.temel > 0}
+
+    adimid = df['adimid'].astype(str).tolist()
+    n = len(adimid)
+    sure = pd.to_numeric(df['suregun'], errors='coerce').fillna(0).clip(lower=0).round().astype(np.int64).to_numpy()
+    oncelik = pd.to_numeric(df.get('proje_onceligi', pd.Series(index=df.index, dtype=float)), errors='coerce').fillna(np.inf).to_numpy(copy=True)
+    termin = (pd.to_datetime(df['projebitistarihi'], errors='coerce') - plan_baslangic).dt.days.fillna(np.inf).to_numpy(copy=True)
+    en_erken = (pd.to_datetime(df['projebaslangictarihi'], errors='coerce') - plan_baslangic).dt.days
+    en_erken = en_erken.fillna(0).clip(lower=0).astype(np.int64).to_numpy()
+    kaynak = df['kaynakadi'].tolist()
+    tezgah_indeksi = TezgahIndeksi.tablodan(df)
+    siniflar = tezgah_indeksi.satir_siniflari
+
+    onculler, ardillar = oncul_listeleri(df)
+
+    # Kalan kritik yol: adımdan proje sonuna kadarki en uzun süre (ters topolojik sırayla)
+    topolojik, dongudekiler = topolojik_sira(onculler, ardillar)
+    if dongudekiler:
+        dongu = sorted(adimid[i] for i in dongudekiler)
+        raise ValueError(f"Öncül döngüsü: {', '.join(dongu[:5])}")
+    kuyruk_suresi = sure.copy()
+    for i in reversed(topolojik):
+        for j in ardillar[i]:
+            kuyruk_suresi[i] = max(kuyruk_suresi[i], sure[i] + kuyruk_suresi[j])
+            # Projeler arası ardılı (ör. toplu adım) bekleyen öncül, ardılın önceliğini ve terminini alır
+            oncelik[i] = min(oncelik[i], oncelik[j])
+            termin[i] = min(termin[i], termin[j])
+
+    sabit = {}
+    for kural in sabit_baslangic_kurallari or []:
+        gun = _gun(kural.get('sabit_baslangic_tarihi'), plan_baslangic)
+        if gun is not None:
+            sabit[str(kural.get('adimid'))] = max(gun, 0)
+    grubu = {}
+    for g, grup in enumerate(manual_start_groups or []):
+        for a in grup:
+            grubu[str(a)] = g
+    uyeler = {}
+    for i, a in enumerate(adimid):
+        if a in grubu:
+            uyeler.setdefault(grubu[a], []).append(i)
+    grup_gunu = {}
+    bekleyen = {}
+    cozulen = set()
+    donmus = {str(a): int(g) for a, g in (donmus_gunler or {}).items()}
+
+    # Döngüde NumPy skalerleri yerine Python listeleri daha hızlıdır
+    sure, en_erken = sure.tolist(), en_erken.tolist()
+    derece = [len(o) for o in onculler]
+    doluluk = _Doluluk(takvimler, [len(t) for t in tezgah_indeksi.siniflar])
+    secilen_sinif = {}
+    tercihler = dict(atamalar or {})
+    for i in (i for i in range(n) if adimid[i] in donmus):
+        sinif = tezgah_indeksi.tezgah_sinifi.get(tercihler.get(adimid[i]))
+        if sinif not in siniflar[i]:
+            sinif = doluluk.en_bos_sinif(donmus[adimid[i]], sure[i], siniflar[i])
+        doluluk.ayir(donmus[adimid[i]], sure[i], kaynak[i], sinif)
+        if sinif is not None:
+            secilen_sinif[adimid[i]] = sinif
+    baslangic, bitis = [0] * n, [0] * n
+
+    def hazir_gunu(i):
+        return max([en_erken[i]] + [bitis[j] for j in onculler[i]])
+
+    def bitir(i, bas):
+        baslangic[i], bitis[i] = bas, bas + sure[i]
+        for j in ardillar[i]:
+            derece[j] -= 1
+            if derece[j] == 0:
+                heapq.heappush(hazirlar, (oncelik[j], termin[j], -kuyruk_suresi[j], j))
+
+    def grubu_yerlestir(grup):
+        """Grubu ortak güne yerleştirir; aynı gün sığmaları imkânsızsa False döner."""
+        zorunlu = [donmus[adimid[j]] for j in grup if adimid[j] in donmus]
+        zorunlu += [sabit[adimid[j]] for j in grup if adimid[j] in sabit]
+        if zorunlu:
+            # Dondurulmuş ya da sabit üyenin günü, diğerlerine kapasiteye bakılmadan uygulanır
+            gun = zorunlu[0]
+            for j in grup:
+                if adimid[j] in donmus:
+                    bitir(j, donmus[adimid[j]])
+                    continue
+                sinif = doluluk.en_bos_sinif(gun, sure[j], siniflar[j])
+                doluluk.ayir(gun, sure[j], kaynak[j], sinif)
+                if sinif is not None:
+                    secilen_sinif[adimid[j]] = sinif
+                bitir(j, gun)
+            return True
+        # Tek kapasiteli kaynağı ya da tek tezgahı paylaşan üyeler hiçbir gün birlikte sığmaz
+        kaynak_talebi, sinif_talebi = Counter(), Counter()
+        for j in (j for j in grup if sure[j] > 0):
+            kaynak_talebi[kaynak[j]] += kaynak[j] in takvimler
+            if len(siniflar[j]) == 1:
+                sinif_talebi[siniflar[j][0]] += 1
+        if any(adet > max(takvimler[k].temel, takvimler[k].kapasiteler.max(initial=0))
+               for k, adet in kaynak_talebi.items() if adet) or \
+                any(adet > doluluk.sinif_kapasiteleri[s] for s, adet in sinif_talebi.items()):
+            return False
+        gun = max(hazir_gunu(j) for j in grup)
+        while True:
+            ayrilan = []
+            for j in grup:
+                bas, sinif = doluluk.en_erken(gun, sure[j], kaynak[j], siniflar[j])
+                if bas != gun:
+                    break
+                doluluk.ayir(gun, sure[j], kaynak[j], sinif)
+                ayrilan.append((j, sinif))
+            else:
+                break
+            # Üye o gün sığmıyor: ayrılanlar geri verilip onun sığdığı ilk günden yeniden denenir
+            for j, sinif in ayrilan:
+                doluluk.birak(gun, sure[j], kaynak[j], sinif)
+            gun = bas
+        for j, sinif in ayrilan:
+            if sinif is not None:
+                secilen_sinif[adimid[j]] = sinif
+            bitir(j, gun)
+        return True
+
+    hazirlar = [(oncelik[i], termin[i], -kuyruk_suresi[i], i) for i in range(n) if derece[i] == 0]
+    heapq.heapify(hazirlar)
+    while True:
+        while hazirlar:
+            i = heapq.heappop(hazirlar)[-1]
+            g = grubu.get(adimid[i])
+            if g is not None and g not in cozulen and len(uyeler[g]) > 1:
+                bekleyen.setdefault(g, []).append(i)
+                if len(bekleyen[g]) == len(uyeler[g]) and not grubu_yerlestir(bekleyen[g]):
+                    logger.warning("%d numaralı manuel grubun üyeleri aynı gün sığmıyor", g)
+                    cozulen.add(g)
+                    for j in bekleyen[g]:
+                        heapq.heappush(hazirlar, (oncelik[j], termin[j], -kuyruk_suresi[j], j))
+                if len(bekleyen[g]) == len(uyeler[g]):
+                    del bekleyen[g]
+                continue
+            hazir = hazir_gunu(i)
+            if g is not None and g in grup_gunu:
+                hazir = max(hazir, grup_gunu[g])
+            if adimid[i] in donmus:
+                bas = donmus[adimid[i]]
+            else:
+                if adimid[i] in sabit:
+                    bas = sabit[adimid[i]]
+                    sinif = doluluk.en_bos_sinif(bas, sure[i], siniflar[i])
+                else:
+                    bas, sinif = doluluk.en_erken(hazir, sure[i], kaynak[i], siniflar[i])
+                doluluk.ayir(bas, sure[i], kaynak[i], sinif)
+                if sinif is not None:
+                    secilen_sinif[adimid[i]] = sinif
+            if g is not None:
+                grup_gunu.setdefault(g, bas)
+            bitir(i, bas)
+        if not bekleyen:
+            break
+        # Kalan gruplarda bir üye diğerinin ardılı: eşit başlangıç imkânsız, alt sınıra düşülür
+        logger.warning("%d manuel grup üyeleri birbirine bağlı olduğu için aynı gün başlatılamadı", len(bekleyen))
+        for g, grup in bekleyen.items():
+            cozulen.add(g)
+            for j in grup:
+                heapq.heappush(hazirlar, (oncelik[j], termin[j], -kuyruk_suresi[j], j))
+        bekleyen.clear()
+    gunler = dict(zip(adimid, baslangic))
+    if atamalar is not None:
+        atamalar.update(tezgah_ata(tezgah_indeksi, gunler, dict(zip(adimid, sure)), secilen_sinif, tercihler))
+    return gunler
+
+
+def tolerans_asimlari(df, gunler):
+    """
+    En geç biten öncülünün bitişinden toleransgun'den daha geç başlayan adımların aşım günleri
+    (adimid -> gün). gunler df'in adımlarının başlangıç günleridir.
+    """
+    adimid = df['adimid'].astype(str).tolist()
+    sure = pd.to_numeric(df['suregun'], errors='coerce').fillna(0).clip(lower=0).round().astype(np.int64).tolist()
+    tolerans = pd.to_numeric(df.get('toleransgun', pd.Series(index=df.index, dtype=float)), errors='coerce').tolist()
+    onculler, _ = oncul_listeleri(df)
+    asimlar = {}
+    for i, a in enumerate(adimid):
+        if a not in gunler or math.isnan(tolerans[i]):
+            continue
+        bitisler = [gunler[adimid[j]] + sure[j] for j in onculler[i] if adimid[j] in gunler]
+        if bitisler and gunler[a] - max(bitisler) > tolerans[i]:
+            asimlar[a] = int(gunler[a] - max(bitisler) - tolerans[i])
+    return asimlar
+
+
+def plan_cezasi(plan_df, df):
+    """Proje gecikme günleri ile tolerans aşım günlerinin toplamı; CP-SAT hedefiyle aynı ölçüdür."""
+    if plan_df is None or plan_df.empty:
+        return 0
+    asim = int(plan_df['Tolerans Aşımı'].sum()) if 'Tolerans Aşımı' in plan_df.columns else 0
+    return gecikme_cezasi(plan_df, df) + asim
+
+
+def gecikme_cezasi(plan_df, df):
+    """Projelerin terminden gecikme günleri toplamı."""
+    if plan_df is None or plan_df.empty:
+        return 0
+    bitis = pd.to_datetime(plan_df.groupby('Proje Adı')['Bitiş'].max())
+    termin = pd.to_datetime(df.groupby('projeadi')['projebitistarihi'].first(), errors='coerce').reindex(bitis.index)
+    return int((bitis - termin).dt.days.clip(lower=0).fillna(0).sum())
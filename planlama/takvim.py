@@ -0,0 +1,135 @@
+"""
+Kaynak kapasite takvimi: kaynak_kisitlari tarih aralıklarının kaynak başına adım fonksiyonu hali.
+
+Çakışan kurallar takvim kurulurken bir kez birleştirilir (sonra eklenen kural geçerlidir).
+CP-SAT modeline kapasite günlük kısıtlarla değil, kapasitenin düştüğü her takvim parçası
+için tek bir sabit "blok" aralığıyla aktarılır.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+class KapasiteTakvimi:
+    """
+    Bir kaynağın günlük kapasitesi. sinirlar[i] gününden sinirlar[i + 1] gününe kadar
+    kapasite kapasiteler[i]'dir; ilk sınırdan önce ve son sınırdan sonra temel kapasite geçerlidir.
+    Günler plan başlangıcından itibaren sayılır.
+    """
+
+    __slots__ = ("temel", "sinirlar", "kapasiteler")
+
+    def __init__(self, temel, sinirlar=None, kapasiteler=None):
+        self.temel = int(temel)
+        self.sinirlar = np.asarray(sinirlar if sinirlar is not None else [], dtype=np.int64)
+        self.kapasiteler = np.asarray(kapasiteler if kapasiteler is not None else [], dtype=np.int64)
+
+    @classmethod
+    def kurallardan(cls, temel, araliklar):
+        """araliklar: sırayla uygulanan (bas_gun, bit_gun_dahil, kapasite) üçlüleri."""
+        if not araliklar:
+            return cls(temel)
+        bas = np.array([a[0] for a in araliklar], dtype=np.int64)
+        bit = np.array([a[1] for a in araliklar], dtype=np.int64) + 1
+        kap = np.array([a[2] for a in araliklar], dtype=np.int64)
+        sinirlar = np.unique(np.concatenate([bas, bit]))
+        kapasiteler = np.full(len(sinirlar), int(temel), dtype=np.int64)
+        for b, s, k in zip(bas, bit, kap):
+            kapasiteler[(sinirlar >= b) & (sinirlar < s)] = k
+        # Kapasitesi değişmeyen ardışık sınırlar atılır
+        degisen = np.concatenate([[kapasiteler[0] != temel], kapasiteler[1:] != kapasiteler[:-1]])
+        return cls(temel, sinirlar[degisen], kapasiteler[degisen])
+
+    @classmethod
+    def gunlukten(cls, gunluk, temel):
+        """Gün 0'dan başlayan günlük kapasite dizisinden takvim kurar; dizi sonrası temel geçerlidir."""
+        gunluk = np.asarray(gunluk, dtype=np.int64)
+        if len(gunluk) == 0:
+            return cls(temel)
+        degerler = np.concatenate([gunluk, [temel]])
+        degisen = np.concatenate([[degerler[0] != temel], degerler[1:] != degerler[:-1]])
+        return cls(temel, np.flatnonzero(degisen), degerler[degisen])
+
+    def kapasite(self, gunler):
+        """Gün (veya gün dizisi) için kapasiteyi döndürür."""
+        gunler = np.asarray(gunler, dtype=np.int64)
+        # İlk sınırdan önceki günler 0. elemana (temel kapasiteye) düşer
+        degerler = np.concatenate([[self.temel], self.kapasiteler])
+        sonuc = degerler[np.searchsorted(self.sinirlar, gunler, side="right")]
+        return int(sonuc) if sonuc.ndim == 0 else sonuc
+
+    def parcalar(self, ufuk, temel_dahil=False):
+        """
+        [0, ufuk) içindeki (bas, bit, kapasite) parçaları. temel_dahil değilse yalnızca
+        kapasitenin temelden farklı olduğu parçalar döner.
+        """
+        sinirlar = [0] + [int(s) for s in self.sinirlar if 0 < s < ufuk] + [ufuk]
+        parcalar = []
+        for bas, bit in zip(sinirlar[:-1], sinirlar[1:]):
+            kap = self.kapasite(bas)
+            if bas < bit and (temel_dahil or kap != self.temel):
+                parcalar.append((bas, bit, kap))
+        return parcalar
+
+    def en_yuksek(self, ufuk):
+        return max([self.temel] + [k for _, _, k in self.parcalar(ufuk)])
+
+
+def kapasite_takvimleri_olustur(kaynaklar_df, kaynak_kisitlari, plan_baslangic):
+    """kaynakadi -> KapasiteTakvimi sözlüğü. Kural kaynak adları büyük/küçük harf duyarsız eşleşir."""
+    temeller = {}
+    if kaynaklar_df is not None and not kaynaklar_df.empty:
+        kapasite = pd.to_numeric(kaynaklar_df['kapasite'], errors='coerce').fillna(1).astype(int)
+        temeller = dict(zip(kaynaklar_df['kaynakadi'], kapasite))
+    adlar = {str(k).lower(): k for k in temeller}
+    plan_baslangic = pd.Timestamp(plan_baslangic)
+
+    araliklar = {}
+    for kural in kaynak_kisitlari or []:
+        kaynak = adlar.get(str(kural.get('kaynak_adi', '')).lower())
+        if kaynak is None:
+            logger.warning("Kapasite kuralı bilinmeyen kaynak için atlandı: %s", kural.get('kaynak_adi'))
+            continue
+        bas = (pd.Timestamp(kural['baslangic_tarihi']) - plan_baslangic).days
+        bit = (pd.Timestamp(kural['bitis_tarihi']) - plan_baslangic).days
+        if bit < bas:
+            continue
+        araliklar.setdefault(kaynak, []).append((bas, bit, int(kural['yeni_kapasite'])))
+    return {k: KapasiteTakvimi.kurallardan(temel, araliklar.get(k)) for k, temel in temeller.items()}
+
+
+def kullanimi_dus(takvim, araliklar, ufuk):
+    """
+    Takvimden sabit işlerin [bas, bit) kullanımını (birer birim) düşen takvim; kapasite sıfırın
+    altına inmez. Kullanım [0, ufuk) içinde düşülür.
+    """
+    if not araliklar:
+        return takvim
+    fark = np.zeros(ufuk + 1, dtype=np.int64)
+    for bas, bit in araliklar:
+        bas, bit = max(bas, 0), min(bit, ufuk)
+        if bas < bit:
+            fark[bas] += 1
+            fark[bit] -= 1
+    gunluk = np.maximum(takvim.kapasite(np.arange(ufuk)) - np.cumsum(fark[:-1]), 0)
+    return KapasiteTakvimi.gunlukten(gunluk, takvim.temel)
+
+
+def kumulatif_kapasite_ekle(model, takvim, araliklar, talepler, ufuk, ad="kaynak"):
+    """
+    Kaynağın işlerine takvime uygun tek bir AddCumulative kısıtı ekler.
+    Kapasite, ufuktaki en yüksek değere sabitlenir; düştüğü her parça için aradaki fark
+    kadar talep eden sabit bir blok aralığı eklenir. Eklenen blok sayısını döndürür.
+    """
+    ust = takvim.en_yuksek(ufuk)
+    bloklar, blok_talepleri = [], []
+    # Bir kural kapasiteyi temelin üstüne çıkarıyorsa temel dönemler de bloklanmalıdır
+    for bas, bit, kap in takvim.parcalar(ufuk, temel_dahil=ust > takvim.temel):
+        if kap < ust:
+            bloklar.append(model.NewFixedSizeIntervalVar(bas, bit - bas, f"{ad}_blok_{bas}"))
+            blok_talepleri.append(ust - kap)
+    model.AddCumulative(list(araliklar) + bloklar, list(talepler) + blok_talepleri, ust)
+    return len(bloklar)
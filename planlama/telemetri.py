@@ -0,0 +1,152 @@
+"""
+Çözücü telemetrisi ve kalıcı performans geçmişi.
+
+Her optimizasyon çalıştırmasının aşama süreleri, girdi boyutu, model boyutu (değişken,
+mantıksal değişken, aralık ve kısıt sayıları), seçilen çözücü profili ve CP-SAT istatistikleri
+(çatışma, dal, hedef, en iyi sınır, boşluk) yerel diskte JSON Lines dosyasına eklenir. Yönetim
+paneli bu geçmişi girdi boyutuna göre çizer; cozucu_profilleri profil seçimini bu geçmişten öğrenir.
+"""
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PERFORMANS_GECMISI_DOSYASI = os.environ.get(
+    "PLANLAMA_PERFORMANS_DOSYASI", os.path.join(os.path.expanduser("~"), ".cache", "planlama", "performans.jsonl"))
+# Dosya bu kayıt sayısının 1,5 katını aşınca en eski kayıtlar silinir
+PERFORMANS_GECMISI_MAKS_KAYIT = int(os.environ.get("PLANLAMA_PERFORMANS_MAKS_KAYIT", 5000))
+
+# Bileşenlere ayrılan çözümlerde toplanan ölçümler; _sn ile bitenlerin en büyüğü alınır
+TOPLANAN_OLCUMLER = ("toplu_adim_sayisi", "birlestirilen_adim_sayisi", "tezgah_sinifi_sayisi", "degisken_sayisi",
+                     "mantiksal_sayisi", "aralik_sayisi", "kisit_sayisi", "catisma_sayisi", "dal_sayisi", "hedef",
+                     "en_iyi_sinir")
+# Bileşenler arasında farklı olabilen etiketler; bileşenlerin değeri ayrışırsa "karma" yazılır
+ETIKET_OLCUMLERI = ("boyut_sinifi", "cozucu_profili")
+
+
+def _aralik_mi(kisit):
+    # OR-Tools 9.12+ protobuf yerine kendi proto sınıflarını döndürür
+    return kisit.has_interval() if hasattr(kisit, "has_interval") else kisit.HasField("interval")
+
+
+def model_boyutu(model):
+    """CP-SAT modelindeki değişken, 0-1 değişken, aralık ve (aralıklar hariç) kısıt sayıları."""
+    proto = model.Proto()
+    aralik = sum(1 for k in proto.constraints if _aralik_mi(k))
+    mantiksal = sum(1 for d in proto.variables if len(d.domain) == 2 and d.domain[0] >= 0 and d.domain[1] <= 1)
+    return {"degisken_sayisi": len(proto.variables), "mantiksal_sayisi": mantiksal,
+            "aralik_sayisi": aralik, "kisit_sayisi": len(proto.constraints) - aralik}
+
+
+def cozucu_istatistikleri(solver, status, cozum_var):
+    """Solve() sonrası çözücü durumu, çatışma/dal sayıları, hedef ve en iyi sınır."""
+    return {
+        "cozucu_durumu": solver.StatusName(status),
+        "catisma_sayisi": solver.NumConflicts(),
+        "dal_sayisi": solver.NumBranches(),
+        "hedef": solver.ObjectiveValue() if cozum_var else None,
+        "en_iyi_sinir": solver.BestObjectiveBound() if cozum_var else None,
+    }
+
+
+def bosluk(hedef, sinir):
+    """Hedef ile en iyi sınır arasındaki göreli fark; 0 en iyi çözümün kanıtlandığını gösterir."""
+    if hedef is None or sinir is None:
+        return None
+    return abs(hedef - sinir) / max(abs(hedef), 1.0)
+
+
+def alt_olcumleri_birlestir(olcumler, alt_olcumler):
+    """Paralel çözülen bir bileşenin ölçümlerini genel ölçümlere ekler."""
+    for anahtar, deger in alt_olcumler.items():
+        if anahtar in TOPLANAN_OLCUMLER:
+            onceki = olcumler.get(anahtar, 0)
+            # Bir bileşende hedef/sınır yoksa toplam da tanımsızdır
+            olcumler[anahtar] = None if deger is None or onceki is None else onceki + deger
+        elif anahtar in ETIKET_OLCUMLERI:
+            olcumler[anahtar] = deger if olcumler.get(anahtar, deger) == deger else "karma"
+        elif anahtar.endswith("_sn"):
+            # Alt problemler paralel çalıştığı için her aşamanın en uzun süresi duvar saatine karşılık gelir
+            olcumler[anahtar] = max(olcumler.get(anahtar, 0), deger)
+
+
+def girdi_boyutu(df, kaynaklar_df, manual_start_groups=None, sabit_baslangic_kurallari=None,
+                 kaynak_kisitlari=None, serbest_adimlar=None):
+    """Çözüm süresini belirleyen girdi büyüklükleri."""
+    return {
+        "adim_sayisi": len(df),
+        "proje_sayisi": int(df['projeadi'].nunique()) if 'projeadi' in df.columns else 0,
+        "kaynak_sayisi": len(kaynaklar_df) if kaynaklar_df is not None else 0,
+        "manuel_grup_sayisi": len(manual_start_groups or []),
+        "sabit_kural_sayisi": len(sabit_baslangic_kurallari or []),
+        "kaynak_kisiti_sayisi": len(kaynak_kisitlari or []),
+        "serbest_adim_sayisi": None if serbest_adimlar is None else len(serbest_adimlar),
+    }
+
+
+class PerformansGecmisi:
+    """Çalıştırma kayıtlarını yerel bir JSON Lines dosyasına ekleyen, boyut sınırlı geçmiş."""
+
+    def __init__(self, dosya=PERFORMANS_GECMISI_DOSYASI, maks_kayit=PERFORMANS_GECMISI_MAKS_KAYIT):
+        self.dosya = dosya
+        self.maks_kayit = maks_kayit
+        self._kilit = threading.Lock()
+        self._satir_sayisi = None
+
+    def ekle(self, kayit):
+        kayit = {"tarih": datetime.now().isoformat(timespec="seconds"), **kayit}
+        try:
+            with self._kilit:
+                os.makedirs(os.path.dirname(self.dosya) or ".", exist_ok=True)
+                with open(self.dosya, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(kayit, ensure_ascii=False, default=str) + "\n")
+                if self._satir_sayisi is None:
+                    with open(self.dosya, encoding="utf-8") as f:
+                        self._satir_sayisi = sum(1 for _ in f)
+                else:
+                    self._satir_sayisi += 1
+                if self._satir_sayisi > self.maks_kayit * 3 // 2:
+                    self._kirp()
+        except Exception:
+            logger.exception("Performans kaydı yazılamadı")
+
+    def _kirp(self):
+        with open(self.dosya, encoding="utf-8") as f:
+            satirlar = f.readlines()[-self.maks_kayit:]
+        gecici = f"{self.dosya}.{os.getpid()}.tmp"
+        with open(gecici, "w", encoding="utf-8") as f:
+            f.writelines(satirlar)
+        os.replace(gecici, self.dosya)
+        self._satir_sayisi = len(satirlar)
+
+    def oku(self, son=None):
+        """Kayıtları tarih sırasıyla DataFrame olarak döndürür; bozuk satırlar atlanır."""
+        if not os.path.exists(self.dosya):
+            return pd.DataFrame()
+        kayitlar = []
+        with open(self.dosya, encoding="utf-8") as f:
+            for satir in f:
+                try:
+                    kayitlar.append(json.loads(satir))
+                except ValueError:
+                    continue
+        df = pd.DataFrame(kayitlar[-son:] if son else kayitlar)
+        if not df.empty:
+            df['tarih'] = pd.to_datetime(df['tarih'])
+        return df
+
+    def temizle(self):
+        with self._kilit:
+            try:
+                os.remove(self.dosya)
+            except FileNotFoundError:
+                pass
+            self._satir_sayisi = 0
+
+
+performans_gecmisi = PerformansGecmisi()
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from planlama import optimizasyon
+from planlama.ayristirma import bagimsiz_bilesenleri_bul, bilesen_catismalari, catisan_gruplar
+from planlama.sentetik import sentetik_veri_uret
+
+PLAN_BASLANGIC = pd.Timestamp("2030-01-01")
+
+
+def _gorevler(satirlar):
+    # (proje, kaynak, tezgah, başlangıç günü, süre)
+    return pd.DataFrame([{
+        "adimid": f"{proje}-{i}", "projeadi": proje, "kaynakadi": kaynak, "tezgahadi": tezgah, "suregun": sure,
+        "projebaslangictarihi": PLAN_BASLANGIC + pd.Timedelta(days=bas),
+        "projebitistarihi": PLAN_BASLANGIC + pd.Timedelta(days=bas + sure),
+    } for i, (proje, kaynak, tezgah, bas, sure) in enumerate(satirlar)])
+
+
+def _projeler(df, bilesenler):
+    return sorted(sorted(df.loc[b, "projeadi"].unique()) for b in bilesenler)
+
+
+def test_ortak_kaynak_tezgah_ve_grup_bilesenleri_birlestirir():
+    df = _gorevler([
+        ("A", "Montaj", None, 0, 10), ("B", "Montaj", None, 5, 10),
+        ("C", "Montaj", None, 400, 10),
+        ("D", "Freze", "F1, F2", 0, 5), ("E", "Torna", "F2", 0, 5),
+        ("G", "Boyahane", None, 0, 5), ("H", "Kaynakhane", None, 0, 5),
+    ])
+    bilesenler = bagimsiz_bilesenleri_bul(df, PLAN_BASLANGIC, pay_gun=0)
+    assert _projeler(df, bilesenler) == [["A", "B"], ["C"], ["D", "E"], ["G"], ["H"]]
+
+    bilesenler = bagimsiz_bilesenleri_bul(df, PLAN_BASLANGIC, manual_start_groups=[["G-5", "H-6"]], pay_gun=0)
+    assert ["G", "H"] in _projeler(df, bilesenler)
+
+
+def _plan(satirlar):
+    # (kaynak, tezgah, başlangıç günü, bitiş günü)
+    return pd.DataFrame([{
+        "Adım Adı": f"Adım {i}", "Kaynak": kaynak, "Tezgah": tezgah,
+        "Başlangıç": PLAN_BASLANGIC + pd.Timedelta(days=bas), "Bitiş": PLAN_BASLANGIC + pd.Timedelta(days=bit),
+    } for i, (kaynak, tezgah, bas, bit) in enumerate(satirlar)])
+
+
+def test_bilesen_catismalari_kapasite_ve_tezgah_ciftlerini_bulur():
+    kaynaklar = pd.DataFrame({"kaynakadi": ["Montaj", "Freze"], "kapasite": [1, 5]})
+    planlar = [
+        _plan([("Montaj", None, 0, 5)]),
+        _plan([("Montaj", None, 3, 8), ("Freze", "F1", 20, 25)]),
+        _plan([("Montaj", None, 8, 10), ("Freze", "F1", 24, 26)]),
+        _plan([("Freze", "F2", 20, 30)]),
+    ]
+    assert bilesen_catismalari(planlar, kaynaklar, [], PLAN_BASLANGIC) == {(0, 1), (1, 2)}
+
+    # Kapasiteyi artıran kural çakışmayı kaldırır
+    kural = {"kaynak_adi": "Montaj", "baslangic_tarihi": "2030-01-01", "bitis_tarihi": "2030-01-31", "yeni_kapasite": 2}
+    assert bilesen_catismalari(planlar, kaynaklar, [kural], PLAN_BASLANGIC) == {(1, 2)}
+
+
+def test_catisan_gruplar_zincirleri_birlestirir():
+    gruplar = catisan_gruplar(5, {(0, 1), (1, 3)})
+    assert [sorted(g) for g in gruplar] == [[0, 1, 3]]
+    assert catisan_gruplar(3, set()) == []
+
+
+def test_catisan_bilesenler_birlikte_yeniden_cozulur(monkeypatch):
+    v = sentetik_veri_uret(proje_sayisi=6, adim_sayisi=5, tohum=3, kural_sayisi=0)
+    gorevler = v["gorevler"].assign(projebaslangictarihi=pd.Timestamp.today().normalize())
+    kaynaklar = v["kaynaklar"].assign(kapasite=1)
+    # Aynı gün başlayan her proje ayrı bileşen sayılır; tek kapasiteli kaynaklar birleşik planda çakışır
+    monkeypatch.setattr(optimizasyon, "AYRISTIRMA_MIN_ADIM", 0)
+    monkeypatch.setattr(optimizasyon, "bagimsiz_bilesenleri_bul",
+                        lambda df, *_: [list(idx) for idx in df.groupby("projeadi").groups.values()])
+
+    olcumler = {}
+    plan_df, _, durum = optimizasyon.hesapla_ve_optimize_et(
+        gorevler, kaynaklar, v["tezgahlar"], olcumler=olcumler, onbellek=False, gecmise_kaydet=False,
+        toplu_pencere_gun=None, zaman_limiti=20, isci_sayisi=2)
+    assert durum in ("OPTIMAL", "FEASIBLE")
+    assert olcumler["catisan_bilesen_sayisi"] > 0
+    assert len(plan_df) == len(gorevler)
+
+    kapasite = dict(zip(kaynaklar["kaynakadi"], kaynaklar["kapasite"]))
+    bas = (plan_df["Başlangıç"] - plan_df["Başlangıç"].min()).dt.days
+    bit = (plan_df["Bitiş"] - plan_df["Başlangıç"].min()).dt.days
+    for kaynak, idx in plan_df.groupby("Kaynak").groups.items():
+        kullanim = np.zeros(int(bit.max()) + 1, dtype=int)
+        for b, s in zip(bas[idx], bit[idx]):
+            kullanim[b:s] += 1
+        assert kullanim.max() <= kapasite[kaynak]
@@ -0,0 +1,32 @@
+from planlama.cozucu_profilleri import OGRENME_MIN_KAYIT, profil_sec, sinif_ayarlari
+from planlama.sezgisel import SEZGISEL_DURUM
+from planlama.telemetri import PerformansGecmisi
+
+
+def _gecmis(tmp_path, kayitlar):
+    gecmis = PerformansGecmisi(dosya=str(tmp_path / "performans.jsonl"))
+    for profil, bosluk, durum in kayitlar:
+        for _ in range(OGRENME_MIN_KAYIT):
+            gecmis.ekle({"boyut_sinifi": "orta", "cozucu_profili": profil, "bosluk": bosluk, "cozum_sn": 10.0,
+                         "durum": durum})
+    return gecmis
+
+
+def test_en_kucuk_ortalama_bosluklu_profil_secilir(tmp_path):
+    gecmis = _gecmis(tmp_path, [("asamali", 0.30, "FEASIBLE"), ("dogrusal", 0.05, "FEASIBLE"),
+                                ("hafif", 0.10, "OPTIMAL")])
+    assert profil_sec("orta", gecmis=gecmis) == "dogrusal"
+
+
+def test_sezgisele_dusen_calistirmalar_sayilmaz(tmp_path):
+    gecmis = _gecmis(tmp_path, [("asamali", 0.30, "FEASIBLE"), ("hafif", 0.0, SEZGISEL_DURUM)])
+    assert profil_sec("orta", gecmis=gecmis) == "asamali"
+
+
+def test_yetersiz_kayitta_sinif_varsayilani(tmp_path):
+    gecmis = PerformansGecmisi(dosya=str(tmp_path / "performans.jsonl"))
+    for _ in range(OGRENME_MIN_KAYIT - 1):
+        gecmis.ekle({"boyut_sinifi": "orta", "cozucu_profili": "hafif", "bosluk": 0.0, "cozum_sn": 1.0,
+                     "durum": "OPTIMAL"})
+    assert profil_sec("orta", gecmis=gecmis) == sinif_ayarlari("orta")["profil"]
+    assert profil_sec("orta", "dogrusal", gecmis=gecmis) == "dogrusal"
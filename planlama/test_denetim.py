@@ -0,0 +1,53 @@
+import pandas as pd
+
+from planlama.denetim import AracBellegi, plan_ozeti, soru_odagi
+from planlama.optimizasyon import hizli_plan
+from planlama.sentetik import sentetik_veri_uret
+
+
+def _plan():
+    v = sentetik_veri_uret(proje_sayisi=6, adim_sayisi=5, tohum=3, kural_sayisi=0)
+    plan_df, _, _ = hizli_plan(v["gorevler"], v["kaynaklar"], v["tezgahlar"])
+    return plan_df, v
+
+
+def test_soru_odagi_adi_gecen_proje_ve_kaynaklari_bulur():
+    plan_df, _ = _plan()
+    proje = plan_df["Proje Adı"].iloc[0]
+    odak = soru_odagi(f"{proje.lower()} neden MONTAJ bekliyor?", plan_df)
+    assert odak == {"projeler": [proje], "kaynaklar": ["Montaj"]}
+    assert soru_odagi("genel durum nedir?", plan_df) == {"projeler": [], "kaynaklar": []}
+
+
+def test_odakli_ozet_soruya_daraltilir():
+    plan_df, v = _plan()
+    proje = plan_df["Proje Adı"].iloc[0]
+    ozet = plan_ozeti(plan_df, v["gorevler"], v["kaynaklar"], odak={"projeler": [proje], "kaynaklar": ["Montaj"]})
+    assert [p["proje"] for p in ozet["gecikmeli_projeler"]] == [proje]
+    assert ozet["gecikmeli_projeler"][0]["kritik_yol"]
+    assert "tolerans_asan_adimlar" in ozet["gecikmeli_projeler"][0]
+    assert [d["kaynak"] for d in ozet["darbogazlar"]] == ["Montaj"]
+    genel = plan_ozeti(plan_df, v["gorevler"], v["kaynaklar"])
+    assert ozet["gecikmeler"] == genel["gecikmeler"]
+
+
+def test_arac_bellegi_saklanabilir_ve_sinir():
+    bellek = AracBellegi(maks_kayit=2)
+    cagrilar = []
+
+    def coz(sonuc):
+        cagrilar.append(sonuc)
+        return sonuc
+
+    basarili = lambda s: s[2] != "SEZGISEL"
+    assert bellek.calistir("plan", {"girdi": "a"}, lambda: coz((None, 0, "SEZGISEL")), saklanabilir=basarili)[2] == "SEZGISEL"
+    bellek.calistir("plan", {"girdi": "a"}, lambda: coz((pd.DataFrame(), 1.0, "OPTIMAL")), saklanabilir=basarili)
+    assert len(cagrilar) == 2
+    assert bellek.calistir("plan", {"girdi": "a"}, lambda: coz(None))[2] == "OPTIMAL"
+    assert len(cagrilar) == 2
+
+    # Aynı araç farklı plan durumunda yeniden çalışır; sınır aşılınca en eski kayıt düşer
+    bellek.calistir("analiz", {"soru": "x"}, lambda: coz("eski"), durum="p1")
+    assert bellek.calistir("analiz", {"soru": "x"}, lambda: coz("yeni"), durum="p2") == "yeni"
+    assert bellek.calistir("plan", {"girdi": "a"}, lambda: coz("tekrar")) == "tekrar"
+    assert (bellek.cagri, bellek.isabet) == (6, 1)
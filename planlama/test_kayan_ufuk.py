@@ -0,0 +1,76 @@
+import pandas as pd
+
+from planlama.kayan_ufuk import donmus_adimlar, plan_gunleri, plan_tezgahlari, yakin_ufuk_adimlari
+from planlama.onbellek import plan_anahtari
+from planlama.optimizasyon import hesapla_ve_optimize_et
+from planlama.sentetik import sentetik_veri_uret
+from planlama.sezgisel import SEZGISEL_DURUM
+
+PLAN_BASLANGIC = pd.Timestamp("2030-01-10")
+
+
+def _onceki_plan():
+    return pd.DataFrame({
+        "Adım ID": ["a", "b", "b", "c", "d", None],
+        "Başlangıç": pd.to_datetime(["2030-01-05", "2030-01-09", "2030-01-09", "2030-01-10", None, "2030-01-01"]),
+        "Tezgah": ["T1", None, None, "T2", "T3", "T4"],
+    })
+
+
+def test_plan_gunleri_gecmisi_negatif_sayar():
+    assert plan_gunleri(_onceki_plan(), PLAN_BASLANGIC) == {"a": -5, "b": -1, "c": 0}
+    assert plan_gunleri(None, PLAN_BASLANGIC) == {}
+
+
+def test_donmus_adimlar_yalnizca_baslamis_adimlar():
+    assert donmus_adimlar(_onceki_plan(), PLAN_BASLANGIC) == {"a": -5, "b": -1}
+    # Görev tablosundan çıkarılmış adımlar dondurulmaz
+    assert donmus_adimlar(_onceki_plan(), PLAN_BASLANGIC, adimlar={"b", "c"}) == {"b": -1}
+
+
+def test_yakin_ufuk_dondurulmamis_yakin_adimlar():
+    taslak = {"a": -5, "b": 0, "c": 13, "d": 14, "e": 30}
+    assert yakin_ufuk_adimlari(taslak, {"a": -5}, hafta=2) == {"b", "c"}
+    assert yakin_ufuk_adimlari(taslak, {"a": -5}, hafta=0) == set()
+
+
+def test_plan_tezgahlari_bos_tezgahlari_atlar():
+    assert plan_tezgahlari(_onceki_plan(), {"a", "b", "c"}) == {"a": "T1", "c": "T2"}
+
+
+def test_kayan_ufukta_onceki_plan_anahtara_girer():
+    v = sentetik_veri_uret(proje_sayisi=3, adim_sayisi=3, tohum=1, kural_sayisi=0)
+    onceki = _onceki_plan()
+    baska = onceki.assign(Tezgah=onceki["Tezgah"].replace("T1", "T9"))
+
+    def anahtar(plan, hafta):
+        return plan_anahtari(v["gorevler"], v["kaynaklar"], v["tezgahlar"],
+                             cozucu_parametreleri={"kayan_ufuk_hafta": hafta}, onceki_plan_df=plan)
+
+    assert anahtar(onceki, 4) != anahtar(baska, 4)
+    # Tam yeniden planlamada önceki plan yalnızca ipucudur, sonucu değiştirmez
+    assert anahtar(onceki, None) == anahtar(baska, None)
+
+
+def test_baslamis_adimlar_yerinde_ve_tezgahinda_kalir():
+    v = sentetik_veri_uret(proje_sayisi=4, adim_sayisi=5, tohum=3, kural_sayisi=0)
+    ayarlar = {"onbellek": False, "gecmise_kaydet": False, "ayristir": False, "zaman_limiti": 20, "isci_sayisi": 2}
+    plan_df, _, _ = hesapla_ve_optimize_et(v["gorevler"], v["kaynaklar"], v["tezgahlar"], **ayarlar)
+    # Plan 20 gün önce yapılmış gibi kaydırılır; o güne kadar başlamış adımlar dondurulur
+    onceki = plan_df.assign(**{"Başlangıç": plan_df["Başlangıç"] - pd.Timedelta(days=20),
+                               "Bitiş": plan_df["Bitiş"] - pd.Timedelta(days=20)})
+    bugun = pd.Timestamp.today().normalize()
+    baslamis = onceki[onceki["Başlangıç"] < bugun].set_index("Adım ID")
+    assert not baslamis.empty
+
+    olcumler = {}
+    yeni_df, _, durum = hesapla_ve_optimize_et(v["gorevler"], v["kaynaklar"], v["tezgahlar"], onceki_plan_df=onceki,
+                                               kayan_ufuk_hafta=2, olcumler=olcumler, **ayarlar)
+    assert durum != SEZGISEL_DURUM
+    assert olcumler["donmus_adim_sayisi"] == len(baslamis)
+    assert set(yeni_df["Adım ID"]) == set(plan_df["Adım ID"])
+    yeni = yeni_df.set_index("Adım ID").loc[baslamis.index]
+    pd.testing.assert_series_equal(yeni["Başlangıç"], baslamis["Başlangıç"], check_dtype=False)
+    tezgahli = baslamis["Tezgah"].notna()
+    pd.testing.assert_series_equal(yeni.loc[tezgahli, "Tezgah"], baslamis.loc[tezgahli, "Tezgah"])
+    assert (yeni_df.loc[~yeni_df["Adım ID"].isin(baslamis.index), "Başlangıç"] >= bugun).all()
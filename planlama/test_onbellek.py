@@ -0,0 +1,61 @@
+import os
+
+import pandas as pd
+
+from planlama import optimizasyon
+from planlama.onbellek import PlanOnbellegi, plan_anahtari
+from planlama.sentetik import sentetik_veri_uret
+from planlama.sezgisel import SEZGISEL_DURUM
+
+
+def _veri():
+    return sentetik_veri_uret(proje_sayisi=4, adim_sayisi=5, tohum=3, kural_sayisi=0)
+
+
+def test_cozulen_plan_kaydedilip_geri_okunur(tmp_path, monkeypatch):
+    monkeypatch.setattr(optimizasyon, "plan_onbellegi", PlanOnbellegi(dizin=str(tmp_path)))
+    v = _veri()
+    ayarlar = {"ayristir": False, "gecmise_kaydet": False, "zaman_limiti": 20, "isci_sayisi": 2}
+
+    ilk_olcumler, ikinci_olcumler = {}, {}
+    plan_df, hedef, durum = optimizasyon.hesapla_ve_optimize_et(
+        v["gorevler"], v["kaynaklar"], v["tezgahlar"], olcumler=ilk_olcumler, **ayarlar)
+    assert durum != SEZGISEL_DURUM
+    assert ilk_olcumler["onbellek"] == "iskalama"
+
+    # Satır ve sütun sırası farklı aynı girdiler aynı kayda düşer
+    gorevler = v["gorevler"].sample(frac=1, random_state=0)
+    gorevler = gorevler[gorevler.columns[::-1]]
+    yeni_df, yeni_hedef, yeni_durum = optimizasyon.hesapla_ve_optimize_et(
+        gorevler, v["kaynaklar"], v["tezgahlar"], olcumler=ikinci_olcumler, **ayarlar)
+    assert ikinci_olcumler["onbellek"] == "isabet"
+    assert (yeni_hedef, yeni_durum) == (hedef, durum)
+    pd.testing.assert_frame_equal(yeni_df, plan_df)
+
+
+def test_anahtar_icerige_bagli():
+    v = _veri()
+    anahtar = plan_anahtari(v["gorevler"], v["kaynaklar"], v["tezgahlar"])
+    assert plan_anahtari(v["gorevler"].iloc[::-1], v["kaynaklar"], v["tezgahlar"]) == anahtar
+
+    gorevler = v["gorevler"].copy()
+    gorevler.loc[gorevler.index[0], "suregun"] += 1
+    assert plan_anahtari(gorevler, v["kaynaklar"], v["tezgahlar"]) != anahtar
+    assert plan_anahtari(v["gorevler"], v["kaynaklar"], v["tezgahlar"],
+                         cozucu_parametreleri={"zaman_limiti": 5}) != anahtar
+
+
+def test_sinir_asilinca_en_uzun_sure_kullanilmayan_silinir(tmp_path):
+    onbellek = PlanOnbellegi(dizin=str(tmp_path))
+    sonuc = (pd.DataFrame({"Adım ID": range(200)}), 1.0, "OPTIMAL")
+    for i, anahtar in enumerate("abc"):
+        onbellek.kaydet(anahtar, sonuc)
+        os.utime(onbellek._yol(anahtar), (1000 + i, 1000 + i))
+    boyut = os.path.getsize(onbellek._yol("a"))
+    assert onbellek.getir("a") is not None
+
+    onbellek.maks_bayt = 3 * boyut
+    onbellek.kaydet("d", sonuc)
+    assert onbellek.getir("b") is None
+    assert all(onbellek.getir(a) is not None for a in "acd")
+    assert onbellek.istatistikler()["kayit_sayisi"] == 3
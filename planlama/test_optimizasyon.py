@@ -0,0 +1,84 @@
+import pandas as pd
+
+from planlama.optimizasyon import etkilenen_adimlari_bul, hesapla_ve_optimize_et
+from planlama.sentetik import sentetik_veri_uret
+from planlama.sezgisel import SEZGISEL_DURUM
+
+AYARLAR = {"onbellek": False, "gecmise_kaydet": False, "ayristir": False, "zaman_limiti": 20, "isci_sayisi": 2}
+
+
+def _veri():
+    return sentetik_veri_uret(proje_sayisi=4, adim_sayisi=5, tohum=3, kural_sayisi=0)
+
+
+def _coz(v, gorevler=None, **kwargs):
+    olcumler = {}
+    sonuc = hesapla_ve_optimize_et(gorevler if gorevler is not None else v["gorevler"], v["kaynaklar"],
+                                   v["tezgahlar"], kaynak_kisitlari=v["kaynak_kisitlari"], olcumler=olcumler,
+                                   **AYARLAR, **kwargs)
+    return (*sonuc, olcumler)
+
+
+def _baslangiclar(plan_df):
+    return plan_df.set_index("Adım ID")["Başlangıç"]
+
+
+def test_model_tum_adimlari_kapsar():
+    v = _veri()
+    plan_df, _, durum, olcumler = _coz(v)
+    assert durum in ("OPTIMAL", "FEASIBLE")
+    assert olcumler["kapsanmayan_adim_sayisi"] == 0
+    assert set(plan_df["Adım ID"]) == set(v["gorevler"]["adimid"].astype(str))
+
+
+def test_artimli_cozum_degismeyen_baslangiclari_korur():
+    v = _veri()
+    plan_df, _, _, _ = _coz(v)
+    gorevler = v["gorevler"].copy()
+    degisen = str(gorevler["adimid"].iloc[-1])
+    gorevler.loc[gorevler["adimid"] == degisen, "suregun"] += 3
+    serbest = etkilenen_adimlari_bul(gorevler, degisen_adimlar=[degisen])
+
+    yeni_df, _, durum, olcumler = _coz(v, gorevler, onceki_plan_df=plan_df, serbest_adimlar=serbest)
+    assert durum != SEZGISEL_DURUM
+    assert olcumler["kapsanmayan_adim_sayisi"] == 0
+    eski, yeni = _baslangiclar(plan_df), _baslangiclar(yeni_df)
+    degismeyen = [a for a in eski.index if a not in serbest]
+    assert degismeyen
+    pd.testing.assert_series_equal(yeni[degismeyen], eski[degismeyen])
+
+
+def test_ipuculu_cozum_onceki_hedefi_korur():
+    v = _veri()
+    plan_df, hedef, _, _ = _coz(v)
+    _, yeni_hedef, durum, _ = _coz(v, onceki_plan_df=plan_df)
+    assert durum in ("OPTIMAL", "FEASIBLE")
+    assert yeni_hedef <= hedef
+
+
+def test_kapasite_takvimi_kapali_gunlerde_adim_koymaz():
+    v = _veri()
+    plan_df, _, _, _ = _coz(v)
+    montaj = plan_df[plan_df["Kaynak"] == "Montaj"]
+    kapali_bas = montaj["Başlangıç"].min() - pd.Timedelta(days=2)
+    kapali_bit = kapali_bas + pd.Timedelta(days=14)
+    kural = {"kaynak_adi": "montaj", "baslangic_tarihi": kapali_bas.strftime("%Y-%m-%d"),
+             "bitis_tarihi": kapali_bit.strftime("%Y-%m-%d"), "yeni_kapasite": 0}
+
+    olcumler = {}
+    yeni_df, _, durum = hesapla_ve_optimize_et(v["gorevler"], v["kaynaklar"], v["tezgahlar"],
+                                               kaynak_kisitlari=[kural], olcumler=olcumler, **AYARLAR)
+    assert durum in ("OPTIMAL", "FEASIBLE")
+    assert olcumler["kapsanmayan_adim_sayisi"] == 0
+    montaj = yeni_df[yeni_df["Kaynak"] == "Montaj"]
+    cakisan = (montaj["Başlangıç"] <= kapali_bit) & (montaj["Bitiş"] > kapali_bas)
+    assert not cakisan.any()
+
+
+def test_tezgah_cakismasi_olmaz():
+    v = sentetik_veri_uret(proje_sayisi=12, adim_sayisi=6, tohum=5, kural_sayisi=0)
+    plan_df, _, durum, _ = _coz(v)
+    assert durum in ("OPTIMAL", "FEASIBLE")
+    for _, isler in plan_df.dropna(subset=["Tezgah"]).groupby("Tezgah"):
+        isler = isler[isler["Bitiş"] > isler["Başlangıç"]].sort_values("Başlangıç")
+        assert (isler["Başlangıç"].iloc[1:].values >= isler["Bitiş"].iloc[:-1].values).all()
@@ -0,0 +1,95 @@
+from planlama.paylasim import PLAN_ALANI, OturumKatmani, PaylasilanVeri
+
+
+class _Depo:
+    def __init__(self, **kurallar):
+        self.kurallar = kurallar
+        self.okuma = 0
+        self.hata = False
+
+    def __call__(self):
+        self.okuma += 1
+        if self.hata:
+            raise RuntimeError("depo erişilemiyor")
+        return dict(self.kurallar)
+
+
+def test_ilk_okuma_bir_kez_yapilir_ve_kurallar_demettir():
+    depo = _Depo(manual_groups=[["a", "b"]])
+    paylasilan = PaylasilanVeri(depo, yenileme_sn=None)
+    goruntu = paylasilan.goruntu()
+    assert paylasilan.goruntu() is goruntu
+    assert depo.okuma == 1
+    assert goruntu["manual_groups"] == (["a", "b"],)
+    assert goruntu["kaynak_kisitlari"] == ()
+    assert goruntu[PLAN_ALANI] is None
+
+
+def test_duzenleme_oturuma_kopyalanir():
+    paylasilan = PaylasilanVeri(_Depo(manual_groups=[["a", "b"]]), yenileme_sn=None)
+    birinci, ikinci = OturumKatmani(paylasilan), OturumKatmani(paylasilan)
+    birinci.duzenle("manual_groups")[0].append("c")
+    assert birinci.oku("manual_groups") == [["a", "b", "c"]]
+    assert ikinci.oku("manual_groups") == (["a", "b"],)
+    assert birinci.ozel_alanlar() == {"manual_groups"}
+    birinci.birak("manual_groups")
+    assert birinci.oku("manual_groups") == (["a", "b"],)
+
+
+def test_baska_oturumun_yayini_eski_kopyayi_gecersiz_kilar():
+    paylasilan = PaylasilanVeri(_Depo(), yenileme_sn=None)
+    birinci, ikinci = OturumKatmani(paylasilan), OturumKatmani(paylasilan)
+    birinci.duzenle("manual_groups").append(["x"])
+    birinci.ayarla(PLAN_ALANI, "oturum plani")
+
+    surum = ikinci.yayinla("manual_groups", [["y"]])
+    assert surum == ikinci.surum
+    assert birinci.oku("manual_groups") == (["y"],)
+    # Oturuma özel plan kural değişse de korunur
+    assert birinci.oku(PLAN_ALANI) == "oturum plani"
+    assert birinci.ozel_alanlar() == {PLAN_ALANI}
+
+
+def test_plan_dayanagindan_sonra_kural_degistiyse_yayinlanmaz():
+    paylasilan = PaylasilanVeri(_Depo(), yenileme_sn=None)
+    oturum = OturumKatmani(paylasilan)
+    oturum.oku(PLAN_ALANI)
+    dayanak = oturum.surum
+    assert oturum.yayinla(PLAN_ALANI, "plan", dayanak) is not None
+
+    dayanak = oturum.surum
+    paylasilan.yayinla({"kaynak_kisitlari": [{"kaynak_adi": "Montaj"}]})
+    assert oturum.yayinla(PLAN_ALANI, "eski girdili plan", dayanak) is None
+    assert oturum.oku(PLAN_ALANI) == "plan"
+
+
+def test_yenilemede_yalnizca_degisen_kurallar_yeni_surum_alir():
+    depo = _Depo(manual_groups=[["a"]], kaynak_kisitlari=[])
+    paylasilan = PaylasilanVeri(depo, yenileme_sn=0)
+    ilk = paylasilan.goruntu()
+    assert paylasilan.goruntu().surum == ilk.surum
+
+    depo.kurallar["kaynak_kisitlari"] = [{"kaynak_adi": "Montaj", "yeni_kapasite": 0}]
+    yeni = paylasilan.goruntu()
+    assert yeni.surum == ilk.surum + 1
+    assert yeni.alan_surumleri["kaynak_kisitlari"] == yeni.surum
+    assert yeni.alan_surumleri["manual_groups"] == ilk.alan_surumleri["manual_groups"]
+
+    depo.hata = True
+    assert paylasilan.goruntu() is yeni
+
+
+def test_okuma_surerken_yayinlanan_alan_ezilmez():
+    depo = _Depo(manual_groups=[["eski"]])
+    paylasilan = PaylasilanVeri(depo, yenileme_sn=0)
+    paylasilan.goruntu()
+
+    def yavas_okuma():
+        # Depo okunurken bu süreçte daha yeni bir değer yayınlanır
+        kurallar = depo()
+        paylasilan.yayinla({"manual_groups": [["yeni"]]})
+        return kurallar
+
+    paylasilan._yukleyici = yavas_okuma
+    depo.kurallar["manual_groups"] = [["depodaki"]]
+    assert paylasilan.goruntu()["manual_groups"] == (["yeni"],)
@@ -0,0 +1,60 @@
+import logging
+
+import pandas as pd
+
+from planlama.sezgisel import liste_cizelgele
+
+PLAN_BASLANGIC = pd.Timestamp("2030-01-01")
+KAYNAKLAR = pd.DataFrame({"kaynakadi": ["Montaj", "Kaynakhane", "Boyahane"], "kapasite": [2, 1, 1]})
+
+
+def _gorevler(satirlar):
+    # (adimid, proje, adım adı, öncül adı, kaynak, süre)
+    return pd.DataFrame([{
+        "adimid": a, "projeadi": proje, "AdimAdi": ad, "OncekiAdimAdi": onceki, "kaynakadi": kaynak, "suregun": sure,
+        "projebaslangictarihi": PLAN_BASLANGIC, "projebitistarihi": PLAN_BASLANGIC + pd.Timedelta(days=60),
+        "proje_onceligi": 1,
+    } for a, proje, ad, onceki, kaynak, sure in satirlar])
+
+
+GOREVLER = _gorevler([
+    ("A1", "A", "Montaj", None, "Montaj", 2),
+    ("B1", "B", "Kaynak", None, "Kaynakhane", 5),
+    ("B2", "B", "Montaj", "Kaynak", "Montaj", 3),
+    ("C1", "C", "Montaj", None, "Montaj", 4),
+])
+
+
+def test_grup_tum_uyeler_hazir_olunca_ortak_gune_yerlesir():
+    gunler = liste_cizelgele(GOREVLER, KAYNAKLAR, PLAN_BASLANGIC, manual_start_groups=[["A1", "B2"]])
+    assert gunler["A1"] == gunler["B2"] == 5
+    assert gunler["C1"] == 0
+
+
+def test_grup_tum_uyelerin_sigdigi_ilk_gune_kayar():
+    # Dondurulmuş C1 (4-8) ve C2 (4-10) Montaj'ı doldurur; iki Montaj üyesi birlikte ancak 10. gün sığar
+    gorevler = pd.concat([GOREVLER, _gorevler([("C2", "C", "Montaj 2", None, "Montaj", 6)])], ignore_index=True)
+    gunler = liste_cizelgele(gorevler, KAYNAKLAR, PLAN_BASLANGIC, manual_start_groups=[["A1", "B2"]],
+                             donmus_gunler={"C1": 4, "C2": 4})
+    assert gunler["A1"] == gunler["B2"] == 10
+
+
+def test_dondurulmus_uye_grubun_gununu_belirler():
+    gunler = liste_cizelgele(GOREVLER, KAYNAKLAR, PLAN_BASLANGIC, manual_start_groups=[["A1", "B2"]],
+                             donmus_gunler={"B2": 12})
+    assert gunler["A1"] == gunler["B2"] == 12
+
+
+def test_birbirine_bagli_uyeler_alt_sinira_duser(caplog):
+    with caplog.at_level(logging.WARNING, logger="planlama.sezgisel"):
+        gunler = liste_cizelgele(GOREVLER, KAYNAKLAR, PLAN_BASLANGIC, manual_start_groups=[["B1", "B2"]])
+    assert "birbirine bağlı" in caplog.text
+    assert (gunler["B1"], gunler["B2"]) == (0, 5)
+
+
+def test_tek_kapasiteyi_paylasan_uyeler_alt_sinira_duser(caplog):
+    gorevler = _gorevler([("K1", "K", "Kaynak", None, "Kaynakhane", 3), ("L1", "L", "Kaynak", None, "Kaynakhane", 2)])
+    with caplog.at_level(logging.WARNING, logger="planlama.sezgisel"):
+        gunler = liste_cizelgele(gorevler, KAYNAKLAR, PLAN_BASLANGIC, manual_start_groups=[["K1", "L1"]])
+    assert "aynı gün sığmıyor" in caplog.text
+    assert sorted(gunler.values()) == [0, 3]
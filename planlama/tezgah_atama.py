@@ -0,0 +1,146 @@
+"""
+Tezgah ataması: aday tezgah kümelerinin indekslenmesi ve eşdeğerlik sınıfları.
+
+Freze gibi adımlar tezgahadi sütununda virgüllü birden çok aday tezgah taşır. Tezgahlar,
+hangi adımların aday kümesinde yer aldıklarına göre eşdeğerlik sınıflarına ayrılır: aynı
+kümelerde geçen tezgahlar her adım için birbirinin yerine kullanılabilir. Modelde ve
+öncelik listesinde tezgah başına tek tezgah kısıtı yerine sınıf başına kapasitesi tezgah
+sayısı kadar olan tek bir kümülatif kısıt (listede doluluk) kullanılır; aday kümesi birden
+çok sınıfa yayılan adım için yalnızca sınıf seçilir. Somut tezgahlar çözümden sonra
+başlangıç sırasıyla açgözlü atanır; sınıf içinde aynı anda en fazla kapasite kadar iş
+olduğundan atama çakışmasızdır.
+"""
+import logging
+import math
+
+from planlama.takvim import KapasiteTakvimi, kullanimi_dus, kumulatif_kapasite_ekle
+
+logger = logging.getLogger(__name__)
+
+
+def tezgah_listesi(deger):
+    """Virgüllü tezgah listesi; adım bu tezgahlardan herhangi birinde yapılabilir."""
+    if deger is None or (isinstance(deger, float) and math.isnan(deger)):
+        return []
+    return [t.strip() for t in str(deger).split(",") if t.strip()]
+
+
+class TezgahIndeksi:
+    """
+    Satır başına aday tezgah sınıfları. siniflar[s] s sınıfının tezgahlarıdır;
+    satir_siniflari[i] i. satırın seçebileceği sınıflardır (tezgahı yoksa boş).
+    """
+
+    __slots__ = ("siniflar", "satir_siniflari", "adim_siniflari", "tezgah_sinifi")
+
+    def __init__(self, siniflar, satir_siniflari, adimidler):
+        self.siniflar = siniflar
+        self.satir_siniflari = satir_siniflari
+        self.adim_siniflari = {a: s for a, s in zip(adimidler, satir_siniflari) if s}
+        self.tezgah_sinifi = {t: s for s, tezgahlar in enumerate(siniflar) for t in tezgahlar}
+
+    @classmethod
+    def tablodan(cls, df):
+        adimidler = df['adimid'].astype(str).tolist()
+        if 'tezgahadi' not in df.columns:
+            return cls([], [() for _ in adimidler], adimidler)
+        # Aynı metin çok sayıda satırda tekrarlandığı için her farklı değer bir kez ayrıştırılır
+        kumeler = {}
+        satir_kumeleri = []
+        for deger in df['tezgahadi']:
+            anahtar = deger if isinstance(deger, str) else None
+            if anahtar not in kumeler:
+                kumeler[anahtar] = frozenset(tezgah_listesi(deger))
+            satir_kumeleri.append(kumeler[anahtar])
+
+        # Tezgahın imzası içinde geçtiği farklı aday kümeleridir; aynı imzalı tezgahlar bir sınıftır
+        farkli_kumeler = sorted({k for k in kumeler.values() if k}, key=sorted)
+        imzalar = {}
+        for k, kume in enumerate(farkli_kumeler):
+            for tezgah in kume:
+                imzalar.setdefault(tezgah, []).append(k)
+        sinif_tezgahlari = {}
+        for tezgah in sorted(imzalar):
+            sinif_tezgahlari.setdefault(tuple(imzalar[tezgah]), []).append(tezgah)
+        siniflar = [tuple(t) for t in sinif_tezgahlari.values()]
+        tezgah_sinifi = {t: s for s, tezgahlar in enumerate(siniflar) for t in tezgahlar}
+        kume_siniflari = {kume: tuple(sorted({tezgah_sinifi[t] for t in kume})) for kume in farkli_kumeler}
+        return cls(siniflar, [kume_siniflari.get(k, ()) for k in satir_kumeleri], adimidler)
+
+    def kapasite(self, sinif):
+        return len(self.siniflar[sinif])
+
+
+def tezgah_kisitlari_ekle(model, indeks, araliklar, ufuk, sabit_gunler=None, tercihler=None, ad="tezgah"):
+    """
+    Tezgahlı adımlara sınıf başına bir kümülatif kısıt ekler. araliklar: adimid ->
+    (başlangıç, süre, bitiş). Birden çok sınıfa yayılan adımlar için sınıf başına isteğe
+    bağlı aralık ve tam bir seçim kurulur; adimid -> [(sınıf, mantıksal değişken)] döndürür.
+    sabit_gunler'deki adımlar (adimid -> gün) kısıta girmez, tercihler'deki tezgahın sınıfında
+    (yoksa ilk sınıfta) kapasiteden düşülür; öncelik listesindeki gibi kapasiteyi aşabilirler.
+    """
+    sabit_gunler = sabit_gunler or {}
+    tercihler = tercihler or {}
+    sinif_araliklari = [[] for _ in indeks.siniflar]
+    sinif_kullanimi = [[] for _ in indeks.siniflar]
+    secimler = {}
+    for adimid, (bas, sure, bit) in araliklar.items():
+        siniflar = indeks.adim_siniflari.get(adimid)
+        if not siniflar:
+            continue
+        if adimid in sabit_gunler:
+            s = indeks.tezgah_sinifi.get(tercihler.get(adimid))
+            s = s if s in siniflar else siniflar[0]
+            sinif_kullanimi[s].append((sabit_gunler[adimid], sabit_gunler[adimid] + sure))
+            if len(siniflar) > 1:
+                secimler[adimid] = [(s, model.NewConstant(1))]
+            continue
+        if len(siniflar) == 1:
+            sinif_araliklari[siniflar[0]].append(model.NewIntervalVar(bas, sure, bit, f"{ad}_{adimid}"))
+            continue
+        secimler[adimid] = []
+        for s in siniflar:
+            secim = model.NewBoolVar(f"{ad}_{adimid}_s{s}")
+            sinif_araliklari[s].append(model.NewOptionalIntervalVar(bas, sure, bit, secim, f"{ad}_{adimid}_s{s}"))
+            secimler[adimid].append((s, secim))
+        model.AddExactlyOne(secim for _, secim in secimler[adimid])
+    for s, aralik_listesi in enumerate(sinif_araliklari):
+        if not aralik_listesi:
+            continue
+        if indeks.kapasite(s) == 1 and not sinif_kullanimi[s]:
+            model.AddNoOverlap(aralik_listesi)
+        else:
+            takvim = kullanimi_dus(KapasiteTakvimi(indeks.kapasite(s)), sinif_kullanimi[s], ufuk)
+            kumulatif_kapasite_ekle(model, takvim, aralik_listesi, [1] * len(aralik_listesi), ufuk, ad=f"{ad}_s{s}")
+    return secimler
+
+
+def tezgah_ata(indeks, gunler, sureler, secimler=None, tercihler=None):
+    """
+    Çizelgelenmiş adımlara somut tezgah atar; adimid -> tezgah döndürür. gunler başlangıç,
+    sureler süre günleridir; secimler adım için seçilmiş sınıfı verir, yoksa tezgahı en erken
+    boşalan sınıf seçilir. tercihler'deki tezgah (ör. sahada işin sürdüğü tezgah) boşsa korunur.
+    """
+    secimler = secimler or {}
+    tercihler = tercihler or {}
+    # Dondurulmuş adımlar geçmişte başlamış olabileceği için tezgahlar baştan boş kabul edilir
+    bos = [dict.fromkeys(tezgahlar, -math.inf) for tezgahlar in indeks.siniflar]
+    atamalar = {}
+    cakisma = 0
+    for adimid in sorted((a for a in indeks.adim_siniflari if a in gunler), key=lambda a: (gunler[a], a)):
+        bas, sure = gunler[adimid], sureler.get(adimid, 0)
+        siniflar = indeks.adim_siniflari[adimid]
+        s = secimler.get(adimid)
+        if s not in siniflar:
+            s = min(siniflar, key=lambda k: min(bos[k].values()))
+        tezgah = tercihler.get(adimid)
+        if tezgah not in bos[s] or bos[s][tezgah] > bas:
+            tezgah = min(bos[s], key=bos[s].get)
+        if bos[s][tezgah] > bas and sure > 0:
+            cakisma += 1
+        atamalar[adimid] = tezgah
+        if sure > 0:
+            bos[s][tezgah] = max(bos[s][tezgah], bas + sure)
+    if cakisma:
+        logger.warning("%d adım boş tezgah bulunamadığı için çakışan tezgaha atandı", cakisma)
+    return atamalar
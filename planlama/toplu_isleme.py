@@ -0,0 +1,227 @@
+"""
+Toplu işlenebilir adımların çözüm öncesi birleştirilmesi.
+
+BATCHABLE_KAYNAKLAR üzerindeki, STEP_GROUP_MAPPING ile aynı gruba düşen (ör. "Genel
+Satınalma") adımlar projeler arasında tek bir toplu adımda birleştirilir. Öncüllere göre
+en erken başlangıç günleri birbirine pencere_gun'den yakın olan, aynı kaynak ve
+tezgahtaki, farklı projelerin adımları aynı toplu adıma girer. Toplu adım üyelerin en
+uzun süresince kaynağı bir birim kullanır; üyelerin öncüllerinden sonra başlar,
+ardılları da ondan sonra başlar.
+Çözümden sonra toplu adımın başlangıç günü üyelere dağıtılır.
+"""
+import logging
+import re
+
+import pandas as pd
+
+from planlama.sabitler import BATCHABLE_KAYNAKLAR, STEP_GROUP_MAPPING
+from planlama.sezgisel import _onceki_adim_listesi, oncul_listeleri, topolojik_sira
+from planlama.tezgah_atama import tezgah_listesi
+
+logger = logging.getLogger(__name__)
+
+# Aynı toplu adıma girebilecek adımların öncüllere göre en erken başlangıç günleri arasındaki
+# en büyük fark (gün)
+TOPLU_PENCERE_GUN = 14
+TOPLU_ADIM_ONEKI = "TOPLU-"
+
+
+def adim_grubu(ad):
+    """Adım adının toplu işleme grubu; tekilleştirme için eklenen sıra numarası yok sayılır."""
+    if not isinstance(ad, str):
+        return None
+    return STEP_GROUP_MAPPING.get(ad) or STEP_GROUP_MAPPING.get(re.sub(r"\s+\d+$", "", ad))
+
+
+def _en_erken_gunler(df, plan_baslangic, sure, onculler, ardillar):
+    """Kaynak kısıtı olmadan, proje başlangıcı ve öncüllere göre en erken başlangıç günleri."""
+    topolojik, _ = topolojik_sira(onculler, ardillar)
+    proje_gunu = (pd.to_datetime(df['projebaslangictarihi'], errors='coerce') - plan_baslangic).dt.days
+    gun = proje_gunu.fillna(0).clip(lower=0).astype(int).tolist()
+    # Döngüdeki satırlar topolojik sırada yer almaz; proje başlangıcında kalırlar
+    for i in topolojik:
+        for j in ardillar[i]:
+            gun[j] = max(gun[j], gun[i] + sure[i])
+    return gun
+
+
+def _adaylar(df, plan_baslangic, haric, onculler, ardillar):
+    """Toplu adıma girebilecek satırlar; grup, kaynak, tezgah ve en erken güne göre sıralı."""
+    grup = df['AdimAdi'].map(adim_grubu)
+    sure = pd.to_numeric(df['suregun'], errors='coerce')
+    uygun = (df['kaynakadi'].isin(BATCHABLE_KAYNAKLAR) & grup.notna() & (sure > 0)
+             & ~df['adimid'].astype(str).isin(haric))
+    if uygun.sum() < 2:
+        return None
+    en_erken = _en_erken_gunler(df, plan_baslangic, sure.fillna(0).clip(lower=0).astype(int).tolist(),
+                                onculler, ardillar)
+    tezgah = df['tezgahadi'].map(lambda t: ",".join(sorted(tezgah_listesi(t)))) if 'tezgahadi' in df.columns else ""
+    return pd.DataFrame({
+        'konum': range(len(df)), 'grup': grup, 'kaynak': df['kaynakadi'], 'tezgah': tezgah,
+        'proje': df['projeadi'], 'gun': en_erken,
+    })[uygun.to_numpy()].sort_values(['grup', 'kaynak', 'tezgah', 'gun'], kind='mergesort')
+
+
+def _gruplari_olustur(adaylar, pencere_gun, haric):
+    gruplar = []
+    for _, aday in adaylar[~adaylar['konum'].isin(haric)].groupby(['grup', 'kaynak', 'tezgah'], sort=False):
+        # Pencere içinde açık gruplar; aynı projeden ikinci adım bir sonraki gruba girer
+        acik = []
+        for konum, proje, gun in zip(aday['konum'], aday['proje'], aday['gun']):
+            acik = [g for g in acik if gun - g['gun'] <= pencere_gun]
+            hedef = next((g for g in acik if proje not in g['projeler']), None)
+            if hedef is None:
+                hedef = {'gun': gun, 'projeler': set(), 'uyeler': []}
+                acik.append(hedef)
+                gruplar.append(hedef)
+            hedef['projeler'].add(proje)
+            hedef['uyeler'].append(konum)
+    return [g['uyeler'] for g in gruplar if len(g['uyeler']) > 1]
+
+
+def _birlesik_tablo(df, gruplar):
+    adimid = df['adimid'].astype(str).tolist()
+    projeler = df['projeadi'].tolist()
+    konum = {a: i for i, a in enumerate(adimid)}
+    ad_konum = {}
+    for i, (proje, ad) in enumerate(zip(projeler, df['AdimAdi'])):
+        ad_konum.setdefault((proje, ad), []).append(i)
+    toplu_id = {}
+    uyeler = {}
+    for k, konumlar in enumerate(gruplar):
+        tid = f"{TOPLU_ADIM_ONEKI}{k + 1:04d}"
+        uyeler[tid] = [adimid[i] for i in konumlar]
+        for i in konumlar:
+            toplu_id[i] = tid
+
+    # Üyelere ait ad referansları toplu adımın ID'sine çevrilir
+    onceki_ad, onceki_id = [], []
+    eski_id = df['OncekiAdimID'] if 'OncekiAdimID' in df.columns else [None] * len(df)
+    for i, (proje, onceki, idler) in enumerate(zip(projeler, df['OncekiAdimAdi'], eski_id)):
+        adlar, yeni_idler = [], [toplu_id.get(konum.get(a), a) for a in _onceki_adim_listesi(idler)]
+        for ad in _onceki_adim_listesi(onceki):
+            konumlar = ad_konum.get((proje, ad), [])
+            if any(j in toplu_id for j in konumlar):
+                yeni_idler += [toplu_id[j] if j in toplu_id else adimid[j] for j in konumlar]
+            else:
+                adlar.append(ad)
+        onceki_ad.append(adlar)
+        onceki_id.append(yeni_idler)
+
+    satirlar = []
+    for tid, konumlar in zip(uyeler, gruplar):
+        uye_df = df.iloc[konumlar]
+        # Toplu adım üyelerin proje içi öncüllerini ID ile taşır; kendi üyelerine bağlanmaz
+        oncul = []
+        for i in konumlar:
+            oncul += [adimid[j] for ad in onceki_ad[i] for j in ad_konum.get((projeler[i], ad), [])]
+            oncul += onceki_id[i]
+        oncul = sorted({a for a in oncul if a != tid})
+        satir = uye_df.iloc[0].to_dict()
+        satir.update({
+            'adimid': tid, 'projeadi': f"{tid} {adim_grubu(satir['AdimAdi'])}", 'AdimAdi': adim_grubu(satir['AdimAdi']),
+            'suregun': pd.to_numeric(uye_df['suregun'], errors='coerce').max(),
+            'OncekiAdimAdi': [], 'OncekiAdimID': oncul,
+            'projebaslangictarihi': pd.to_datetime(uye_df['projebaslangictarihi'], errors='coerce').max(),
+            'projebitistarihi': pd.to_datetime(uye_df['projebitistarihi'], errors='coerce').min(),
+        })
+        if 'toleransgun' in df.columns:
+            satir['toleransgun'] = pd.to_numeric(uye_df['toleransgun'], errors='coerce').min()
+        if 'proje_onceligi' in df.columns:
+            satir['proje_onceligi'] = pd.to_numeric(uye_df['proje_onceligi'], errors='coerce').min()
+        satirlar.append(satir)
+
+    kalan = [i for i in range(len(df)) if i not in toplu_id]
+    birlesik = df.iloc[kalan].assign(OncekiAdimAdi=[onceki_ad[i] for i in kalan],
+                                     OncekiAdimID=[onceki_id[i] for i in kalan])
+    return pd.concat([birlesik, pd.DataFrame(satirlar, columns=birlesik.columns)], ignore_index=True), uyeler
+
+
+def _dongudeki_bilesenler(ardillar):
+    """Birden çok satır içeren güçlü bağlı bileşenler (öncül döngüleri); yinelemeli Tarjan."""
+    n = len(ardillar)
+    sira, dusuk, yigin, yiginda = [None] * n, [0] * n, [], [False] * n
+    bilesenler, sayac = [], 0
+    for kok in range(n):
+        if sira[kok] is not None:
+            continue
+        cagri = [(kok, 0)]
+        while cagri:
+            i, k = cagri.pop()
+            if k == 0:
+                sira[i] = dusuk[i] = sayac
+                sayac += 1
+                yigin.append(i)
+                yiginda[i] = True
+            elif k <= len(ardillar[i]):
+                dusuk[i] = min(dusuk[i], dusuk[ardillar[i][k - 1]])
+            while k < len(ardillar[i]):
+                j = ardillar[i][k]
+                k += 1
+                if sira[j] is None:
+                    cagri += [(i, k), (j, 0)]
+                    break
+                if yiginda[j]:
+                    dusuk[i] = min(dusuk[i], sira[j])
+            else:
+                if dusuk[i] == sira[i]:
+                    bilesen = []
+                    while True:
+                        j = yigin.pop()
+                        yiginda[j] = False
+                        bilesen.append(j)
+                        if j == i:
+                            break
+                    if len(bilesen) > 1:
+                        bilesenler.append(bilesen)
+    return bilesenler
+
+
+def toplu_adimlari_birlestir(df, plan_baslangic, pencere_gun=TOPLU_PENCERE_GUN, haric=()):
+    """
+    Toplu işlenebilir adımları birleştirilmiş görev tablosunu ve toplu adım ID'si -> üye
+    adimid listesini döndürür. pencere_gun None ise tablo değiştirilmez. haric'teki adımlar
+    (ör. manuel grup ya da sabit başlangıç kuralı olanlar) birleştirilmez.
+    """
+    if pencere_gun is None or df.empty:
+        return df, {}
+    plan_baslangic = pd.Timestamp(plan_baslangic)
+    onculler, ardillar = oncul_listeleri(df)
+    adaylar = _adaylar(df, plan_baslangic, {str(a) for a in haric}, onculler, ardillar)
+    if adaylar is None:
+        return df, {}
+    dagitilan = set()
+    while True:
+        gruplar = _gruplari_olustur(adaylar, pencere_gun, dagitilan)
+        if not gruplar:
+            return df, {}
+        # Projeler arası birleştirme öncül döngüsü oluşturursa her döngüden en az üyeli
+        # toplu adım dağıtılır ve gruplar yeniden kurulur. Döngüler, üyeleri ilk üyeye
+        # indirgenmiş öncül grafiğinde aranır.
+        temsilci = list(range(len(df)))
+        for konumlar in gruplar:
+            for i in konumlar:
+                temsilci[i] = konumlar[0]
+        indirgenmis = [[] for _ in range(len(df))]
+        for i, ardil in enumerate(ardillar):
+            indirgenmis[temsilci[i]] += [temsilci[j] for j in ardil if temsilci[j] != temsilci[i]]
+        toplu = {konumlar[0]: konumlar for konumlar in gruplar}
+        dongudeki = []
+        for bilesen in _dongudeki_bilesenler(indirgenmis):
+            bilesen_toplulari = [toplu[i] for i in bilesen if i in toplu]
+            if bilesen_toplulari:
+                dongudeki.append(min(bilesen_toplulari, key=len))
+        if not dongudeki:
+            return _birlesik_tablo(df, gruplar)
+        logger.info("%d toplu adım öncül döngüsü oluşturduğu için dağıtıldı", len(dongudeki))
+        for konumlar in dongudeki:
+            dagitilan.update(konumlar)
+
+
+def gunleri_ac(gunler, uyeler):
+    """Toplu adımlara ait değerleri (başlangıç günü, tezgah) üye adımlara dağıtır."""
+    acik = {a: g for a, g in gunler.items() if a not in uyeler}
+    for tid, adimlar in uyeler.items():
+        if tid in gunler:
+            acik.update(dict.fromkeys(adimlar, gunler[tid]))
+    return acik
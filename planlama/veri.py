@@ -0,0 +1,83 @@
+"""
+Planlama girdilerinin veri deposundan okunması.
+
+Tablo adları, görev tablosunun tip dönüşümleri ve kural tablolarının optimizasyonun
+beklediği listelere çevrilmesi burada toplanır. Streamlit uygulaması tabloları kendi
+önbellekleri üzerinden okuyup aynı dönüştürücüleri kullanır; planlama_girdilerini_oku
+arayüz olmadan (gece işleri, komut satırı, benchmark) tüm girdileri tek seferde okur.
+"""
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Tablo adları (veri kümesi öneki veri deposu tarafından eklenir)
+GOREVLER_TABLE = "gorevler"
+KAYNAKLAR_TABLE = "kaynaklar"
+TEZGAHLAR_TABLE = "tezgahlar"
+SABLON_ANA_TABLE = "sablon_ana"
+SABLONLAR_TABLE = "uretim_sablonlari"
+KURALLAR_GRUP_TABLE = "kurallar_manuel_gruplar"
+KURALLAR_KISIT_TABLE = "kurallar_kaynak_kisitlari"
+KURALLAR_SABIT_BASLANGIC_TABLE = "kurallar_sabit_baslangic"
+
+
+def gorevleri_hazirla(df):
+    """Görev tablosunun tarih sütunlarını datetime'a çevirir."""
+    for col in ['projebaslangictarihi', 'projebitistarihi']:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+    return df
+
+
+def kaynak_kisitlari_listesi(df):
+    """Kaynak kısıtı tablosunu tarihleri YYYY-AA-GG metni olan kayıt listesine çevirir."""
+    if df.empty:
+        return []
+    df = df.copy()
+    df['baslangic_tarihi'] = pd.to_datetime(df['baslangic_tarihi']).dt.strftime('%Y-%m-%d')
+    df['bitis_tarihi'] = pd.to_datetime(df['bitis_tarihi']).dt.strftime('%Y-%m-%d')
+    return df.to_dict('records')
+
+
+def sabit_kurallar_listesi(df):
+    """Sabit başlangıç tablosunu tarihi YYYY-AA-GG metni olan kayıt listesine çevirir."""
+    if df.empty:
+        return []
+    df = df.copy()
+    df['sabit_baslangic_tarihi'] = pd.to_datetime(df['sabit_baslangic_tarihi']).dt.strftime('%Y-%m-%d')
+    return df.to_dict('records')
+
+
+def manuel_gruplar_listesi(df):
+    """Manuel grup tablosunu grup_id sırasıyla adım ID listelerine çevirir."""
+    if df.empty:
+        return []
+    return df.sort_values('grup_id').groupby('grup_id')['adim_id'].apply(list).tolist()
+
+
+def _oku(depo, tablo, sutunlar=None):
+    # Henüz oluşturulmamış tablolar (ör. hiç kural girilmemişse) boş okunur
+    try:
+        return depo.oku(tablo, sutunlar)
+    except Exception as e:
+        if "Not found" not in str(e):
+            raise
+        logger.info("Tablo bulunamadı, boş kabul ediliyor: %s", tablo)
+        return pd.DataFrame(columns=sutunlar or [])
+
+
+def planlama_girdilerini_oku(depo):
+    """
+    hesapla_ve_optimize_et'in ihtiyaç duyduğu tüm girdileri depodan okur. Anahtarlar:
+    gorevler_df, kaynaklar_df, tezgahlar_df, manual_groups, sabit_kurallar, kaynak_kisitlari.
+    """
+    return {
+        "gorevler_df": gorevleri_hazirla(_oku(depo, GOREVLER_TABLE)),
+        "kaynaklar_df": _oku(depo, KAYNAKLAR_TABLE, ['kaynakadi', 'kapasite']),
+        "tezgahlar_df": _oku(depo, TEZGAHLAR_TABLE, ['tezgahadi', 'kaynakadi']),
+        "manual_groups": manuel_gruplar_listesi(_oku(depo, KURALLAR_GRUP_TABLE)),
+        "sabit_kurallar": sabit_kurallar_listesi(_oku(depo, KURALLAR_SABIT_BASLANGIC_TABLE)),
+        "kaynak_kisitlari": kaynak_kisitlari_listesi(_oku(depo, KURALLAR_KISIT_TABLE)),
+    }